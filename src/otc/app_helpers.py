@@ -1,37 +1,158 @@
 import json, numpy as np, pandas as pd
-from .chain import ChainComplex, check_boundary_compat, check_transport_homology, pairing_value, check_support
+from .chain import ChainComplex
+from .planner import unit_checks
 from .checks import commutator_identity, triangle_coherence_identity
 from .towers import compose_maps, hash_certificate
-def load_complex(json_obj):
-    return ChainComplex(json_obj["boundaries"])
-def load_map_blocks(json_obj):
-    return {int(k): np.array(v, dtype=bool) for k, v in json_obj["blocks"].items()}
+from .gf2 import as_gf2
+from . import binfmt, ingest, zmod
+from .instrument import Recorder, span, block_stats
+def load_complex(json_obj, cache=None, shapes=None, engine="auto"):
+    """ChainComplex from a parsed complex document, validated in one pass (against `shapes` if given)."""
+    return ChainComplex(ingest.ingest_boundaries(json_obj, shapes), cache=cache, engine=engine)
+def load_map_blocks(json_obj, shapes=None, side="X"):
+    return ingest.ingest_blocks(json_obj, shapes, side)
+def load_reps(json_obj, shapes=None):
+    return ingest.ingest_reps(json_obj, shapes)
+def load_support(json_obj, shapes=None):
+    return ingest.ingest_support(json_obj, shapes)
+def load_triangle(json_obj, shapes=None):
+    return ingest.ingest_triangle(json_obj, shapes)
 def load_signed_blocks(json_obj):
-    return {int(k): np.array(v, dtype=int) for k, v in json_obj["blocks"].items()}
-def unit_test_generator(CX, CY, Cmap, reps, pairing=None, support=None, zlift=False, dX_signed=None, dY_signed=None, C_signed=None, B_signed=None):
-    boundary_ok, _ = check_boundary_compat(CX, CY, Cmap, zlift=zlift, dX_signed=dX_signed, dY_signed=dY_signed, C_signed=C_signed)
-    c3_ok, *_ = check_transport_homology(CX, CY, Cmap, reps["c3_dom"], reps["c3_cod"], k=reps["k3"])
-    c2_ok, *_ = check_transport_homology(CX, CY, Cmap, reps["c2_dom"], reps["c2_cod"], k=reps["k2"])
-    pair_before = pairing_value(reps["c3_dom"], reps["c2_dom"], pairing, zlift=zlift, B_signed=B_signed)
-    pair_after  = pairing_value(reps["c3_cod"], reps["c2_cod"], pairing, zlift=zlift, B_signed=B_signed)
-    pair_ok = (pair_before == pair_after)
-    support_ok = True
-    if support is not None:
-        support_ok = check_support(Cmap, support)
-    return dict(boundary=boundary_ok, transport_c3=c3_ok, transport_c2=c2_ok, pairing=pair_ok, support=support_ok)
-def overlap_test(C_overlap, C_m1, C_m2, H):
-    ok, res = commutator_identity(C_overlap, C_m1, C_m2, H); return ok, res
-def triangle_test(C_overlap, J):
-    ok, res = triangle_coherence_identity(C_overlap, J); return ok, res
-def run_tower(_, maps_seq, reps):
-    hashes = []
-    from .gf2 import to_bool, matmul_gf2
-    degs = sorted(maps_seq[0].keys())
-    cum = {k: to_bool(np.eye(maps_seq[0][k].shape[0], dtype=bool)) for k in degs}
-    for i, C in enumerate(maps_seq, 1):
-        for k in degs:
-            cum[k] = matmul_gf2(to_bool(C[k]), to_bool(cum[k]))
+    """{k: integer block}; int64 when the entries fit, Python ints (object dtype) otherwise."""
+    return {int(k): zmod.signed_array(v) for k, v in json_obj["blocks"].items()}
+def load_signed_reps(json_obj):
+    """Representatives for signed towers: integer vectors as in load_signed_blocks, negatives allowed."""
+    missing = {"k3", "k2", "c3_dom", "c3_cod", "c2_dom", "c2_cod"} - set(json_obj)
+    if missing:
+        raise ValueError(f"reps: missing {sorted(missing)}")
+    out = dict(json_obj, k3=int(json_obj["k3"]), k2=int(json_obj["k2"]))
+    for name in ("c3_dom", "c3_cod", "c2_dom", "c2_cod"):
+        out[name] = zmod.signed_array(json_obj[name]).ravel()
+    return out
+def load_complex_bin(path, cache=None, engine="auto"):
+    """ChainComplex over a binary container; boundaries are memory-mapped and decoded per degree on use."""
+    return ChainComplex(binfmt.open_blocks(path, "boundaries"), cache=cache, engine=engine)
+def load_map_blocks_bin(path):
+    return binfmt.open_blocks(path, "blocks")
+def load_signed_blocks_bin(path):
+    return binfmt.open_blocks(path, "blocks")
+def load_triangle_bin(path):
+    return binfmt.open_triangle(path)
+def load_reps_bin(path):
+    return binfmt.open_reps(path)
+def _profiled(profile, fn):
+    """Run fn() under a fresh Recorder when `profile`; returns (result, records or None)."""
+    if not profile:
+        return fn(), None
+    with Recorder() as rec:
+        out = fn()
+    return out, rec.records
+def unit_test_generator(CX, CY, Cmap, reps, pairing=None, support=None, zlift=False, dX_signed=None, dY_signed=None, C_signed=None, B_signed=None, rounds=None, profile=False, fail_fast=False, workers=None):
+    """Unit checks for one generator, run cheapest first (planner.unit_checks). With
+    fail_fast the checks after the first failure are skipped and reported as None.
+    `workers` threads the boundary check's degrees (default: engine.default_workers).
+    With profile=True the result also carries "profile": one instrumentation record
+    per check and per degree."""
+    def run():
+        res = dict(boundary=None, transport_c3=None, transport_c2=None, pairing=None, support=True if support is None else None)
+        for name, ok in unit_checks(CX, CY, Cmap, reps, pairing, support, zlift, dX_signed, dY_signed, C_signed, B_signed,
+                                    rounds=rounds, fail_fast=fail_fast, workers=workers):
+            res[name] = ok
+        return res
+    res, records = _profiled(profile, run)
+    if records is not None:
+        res["profile"] = records
+    return res
+def overlap_test(C_overlap, C_m1, C_m2, H, rounds=None, workers=None, fail_fast=False, profile=False):
+    """With profile=True (or under an active Recorder) every res[k] carries a "profile" record."""
+    (ok, res), _ = _profiled(profile, lambda: commutator_identity(C_overlap, C_m1, C_m2, H, rounds=rounds, workers=workers, fail_fast=fail_fast))
+    return ok, res
+def triangle_test(C_overlap, J, rounds=None, workers=None, fail_fast=False, profile=False):
+    (ok, res), _ = _profiled(profile, lambda: triangle_coherence_identity(C_overlap, J, rounds=rounds, workers=workers, fail_fast=fail_fast))
+    return ok, res
+def run_tower(_, maps_seq, reps, mode="matrix", profile=False, progress=None, checkpoints=None, processes=None):
+    """Per-step certificate hashes. mode="vectors" propagates only the representatives
+    (towers.propagate_reps) and yields the same hashes without composing full matrices.
+    mode="signed" takes signed (Z) move blocks and propagates the representatives
+    exactly over Z (towers.propagate_signed), hashing the integer vectors.
+    With profile=True each step also reports its seconds (and, in matrix mode, the
+    nonzeros of the composed maps). `progress(step, n_steps)` is called after each step.
+    With `checkpoints` (tower_store.TowerCheckpoints) the run resumes from the longest
+    stored prefix of this schedule and stores its state every `checkpoints.every` steps.
+    processes > 1 (matrix mode) computes the prefix products with compose.prefix_products
+    across a process pool; hashes are identical, profiles then carry no block stats."""
+    if mode not in ("matrix", "vectors", "signed"):
+        raise ValueError(f"run_tower: unknown mode {mode!r}")
+    S = len(maps_seq)
+    def run():
+        keys = None; start = 0; hashes = []; state = None
+        if checkpoints is not None:
+            from .tower_store import prefix_keys
+            keys = prefix_keys(maps_seq, reps, mode)
+            start, done, state = checkpoints.resume(keys, mode)
+            hashes = [dict(step=i, hash=h) for i, h in enumerate(done, 1)]
+            if progress is not None and start:
+                progress(start, S)
+        profs = [None] * start
+        last = [start]   # step of the previous checkpoint: each one stores only the hashes since
+        def saved(i, state):
+            if checkpoints is not None and checkpoints.due(i, S):
+                checkpoints.save(keys[i-1], mode, i, [h["hash"] for h in hashes[last[0]:i]], state, prev=last[0])
+                last[0] = i
+        if mode in ("vectors", "signed"):
+            from .towers import propagate_reps, propagate_signed, hash_vectors, hash_signed
+            steps = (propagate_reps if mode == "vectors" else propagate_signed)(maps_seq, reps, (start,) + state if state else None)
+            hash_ = hash_vectors if mode == "vectors" else hash_signed
+            for i in range(start + 1, S + 1):
+                with span("step", check="run_tower") as prof:
+                    _, v3, v2 = next(steps)
+                    h = hash_(v3, v2)
+                hashes.append(dict(step=i, hash=h)); profs.append(prof)
+                saved(i, (v3, v2))
+                if progress is not None:
+                    progress(i, S)
+            return hashes, profs
+        from .gf2 import matmul_gf2
         from .towers import hash_certificate
-        h = hash_certificate(cum, reps)
-        hashes.append(dict(step=i, hash=h))
+        degs = sorted(maps_seq[0].keys())
+        if processes is not None and int(processes) > 1 and S - start > 1:
+            from functools import partial
+            from .compose import prefix_products, tower_step
+            # prefix_products numbers the suffix from 1; keep the steps a checkpoint is due at
+            keep = frozenset(i - start for i in range(start + 1, S + 1) if checkpoints is not None and checkpoints.due(i, S))
+            steps = prefix_products(maps_seq[start:], processes, state, partial(tower_step, reps=reps, keep=keep))
+            try:
+                for i in range(start + 1, S + 1):
+                    with span("step", check="run_tower") as prof:
+                        h, cum = next(steps)
+                    hashes.append(dict(step=i, hash=h)); profs.append(prof)
+                    if cum is not None:
+                        saved(i, cum)
+                    if progress is not None:
+                        progress(i, S)
+            finally:
+                steps.close()
+            return hashes, profs
+        cum = dict(state or {})
+        for i in range(start + 1, S + 1):
+            C = maps_seq[i-1]
+            with span("step", check="run_tower") as prof:
+                for k in degs:
+                    cum[k] = as_gf2(C[k]) if i == 1 else matmul_gf2(C[k], cum[k])
+                h = hash_certificate(cum, reps)
+            if prof is not None:
+                prof["blocks"] = block_stats({f"cum_{k}": cum[k] for k in degs})
+            hashes.append(dict(step=i, hash=h)); profs.append(prof)
+            saved(i, cum)
+            if progress is not None:
+                progress(i, S)
+        return hashes, profs
+    (hashes, profs), _ = _profiled(profile, run)
+    for i, (h, prof) in enumerate(zip(hashes, profs), 1):
+        if prof is not None:
+            prof["step"] = i
+            if profile:
+                h["seconds"] = prof["seconds"]
+                if "blocks" in prof:
+                    h["nnz"] = sum(b["nnz"] for b in prof["blocks"].values())
     return hashes
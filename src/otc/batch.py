@@ -0,0 +1,167 @@
+
+"""Headless batch runner: GF(2) unit checks for many generators against one X/Y pair.
+
+The complexes are parsed once in the parent, the boundaries the transport
+checks query are eliminated there, and both are shipped to each worker when
+the pool starts. Generators are fanned out over the pool, and one
+JSON line per generator is appended to the output as soon as it finishes.
+Re-running with the same output skips generators whose id is already there.
+"""
+import glob, json, os, time
+from functools import partial
+from multiprocessing import Pool
+from .app_helpers import load_complex, load_complex_bin, load_map_blocks, load_reps, load_support, unit_test_generator
+from .chain import ChainComplex
+from .homology_cache import HomologyCache
+
+_CX = _CY = None
+
+def _load_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+def load_complex_any(path, cache=None):
+    """Complex from JSON or (fully materialized) from a binary container."""
+    if path.endswith(".otcb"):
+        C = load_complex_bin(path)
+        return ChainComplex({k: C.d(k) for k in C.boundaries}, cache=cache)
+    return load_complex(_load_json(path), cache=cache)
+
+def transport_degrees(entries):
+    """Degrees k3, k2 named by the entries' reps files (unreadable ones are left to check_entry)."""
+    degs = set()
+    for path in {e["reps"] for e in entries if e.get("reps")}:
+        try:
+            reps = _load_json(path)
+            degs.update((int(reps["k3"]), int(reps["k2"])))
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+    return sorted(degs)
+
+def prepare_complexes(x_path, y_path, cache=None, degrees=()):
+    """Parse X and Y once and warm the image tests of the transport checks in `degrees`:
+    d_{k+1} of Y is factored (from the on-disk HomologyCache when one is given), or, for
+    a complex on the sparse engine, reduced by column reduction instead."""
+    CX = load_complex_any(x_path, cache)
+    CY = CX if os.path.abspath(y_path) == os.path.abspath(x_path) else load_complex_any(y_path, cache)
+    for k in degrees:
+        if CY.dims.get(k, 0) == 0 or CY.dims.get(k+1, 0) == 0:
+            continue
+        if CY.sparse:
+            CY.sparse_homology().boundary_basis(k)
+        else:
+            CY.factor(k+1)
+    return CX, CY
+
+def manifest_entries(path):
+    """Generator entries from a JSON list or JSONL file of {id, map, reps, support?, pairing?}.
+    Relative paths are resolved against the manifest's directory."""
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path) as f:
+        text = f.read()
+    items = json.loads(text) if text.lstrip().startswith("[") else [json.loads(l) for l in text.splitlines() if l.strip()]
+    out = []
+    for it in items:
+        e = {k: (os.path.join(base, v) if k in ("map", "reps", "support", "pairing") and v else v) for k, v in it.items()}
+        e.setdefault("id", os.path.splitext(os.path.basename(e["map"]))[0])
+        out.append(e)
+    return out
+
+def glob_entries(pattern, reps=None, support=None, pairing=None):
+    """One entry per map file matching `pattern`. Sibling <stem>.reps.json /
+    <stem>.support.json files override the shared defaults."""
+    out = []
+    for p in sorted(glob.glob(pattern)):
+        stem = os.path.splitext(p)[0]
+        if stem.endswith((".reps", ".support", ".pairing")):
+            continue
+        e = dict(id=os.path.basename(stem), map=p, reps=reps, support=support, pairing=pairing)
+        for key in ("reps", "support", "pairing"):
+            if os.path.exists(f"{stem}.{key}.json"):
+                e[key] = f"{stem}.{key}.json"
+        out.append(e)
+    return out
+
+def completed_ids(out_path):
+    """Ids already present in a JSONL result file. A torn last line (from an
+    interrupted run) is cut off so appended results start on a fresh line."""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+    with open(out_path) as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+def _init(CX, CY):
+    global _CX, _CY
+    _CX, _CY = CX, CY
+
+def check_entry(entry, CX=None, CY=None, fail_fast=False):
+    """Run unit_test_generator for one entry; errors are reported in the result, not raised.
+    With fail_fast the checks after the first failure are skipped (reported as null)."""
+    CX = _CX if CX is None else CX; CY = _CY if CY is None else CY
+    t0 = time.perf_counter()
+    try:
+        if not entry.get("reps"):
+            raise ValueError("no reps file for generator")
+        Cmap = load_map_blocks(_load_json(entry["map"]))
+        reps = load_reps(_load_json(entry["reps"]))
+        support = load_support(_load_json(entry["support"])) if entry.get("support") else None
+        pairing = _load_json(entry["pairing"]) if entry.get("pairing") else None
+        # one generator per pool process: no degree threads on top of the pool
+        res = unit_test_generator(CX, CY, Cmap, reps, pairing, support, fail_fast=fail_fast, workers=1)
+        res = {k: None if v is None else bool(v) for k, v in res.items()}
+        return dict(id=entry["id"], ok=all(v is True for v in res.values()), checks=res, seconds=round(time.perf_counter() - t0, 6))
+    except Exception as e:
+        return dict(id=entry["id"], ok=False, error=f"{type(e).__name__}: {e}", seconds=round(time.perf_counter() - t0, 6))
+
+def run_batch(CX, CY, entries, processes=None, skip=(), fail_fast=False):
+    """Yield one result dict per entry (in completion order), skipping ids in `skip`."""
+    todo = [e for e in entries if e["id"] not in skip]
+    processes = processes or os.cpu_count() or 1
+    if processes <= 1 or len(todo) <= 1:
+        for e in todo:
+            yield check_entry(e, CX, CY, fail_fast)
+        return
+    with Pool(processes, initializer=_init, initargs=(CX, CY)) as pool:
+        yield from pool.imap_unordered(partial(check_entry, fail_fast=fail_fast), todo, chunksize=max(1, len(todo) // (16 * processes)))
+
+def main(argv=None):
+    """CLI: stream unit-check results for a catalogue of generators to JSONL."""
+    import argparse
+    ap = argparse.ArgumentParser(description="Batch GF(2) unit checks over many generators.")
+    ap.add_argument("--x", required=True, help="domain complex (JSON or .otcb)")
+    ap.add_argument("--y", required=True, help="codomain complex (JSON or .otcb)")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--manifest", help="JSON list / JSONL of {id, map, reps, support?, pairing?}")
+    src.add_argument("--glob", help="glob of map JSON files")
+    ap.add_argument("--reps", help="shared reps JSON (glob mode)")
+    ap.add_argument("--support", help="shared support JSON (glob mode)")
+    ap.add_argument("--pairing", help="shared pairing JSON (glob mode)")
+    ap.add_argument("-o", "--out", required=True, help="JSONL output; existing ids are skipped")
+    ap.add_argument("--processes", type=int, default=None)
+    ap.add_argument("--cache", help="directory of the shared on-disk homology cache")
+    ap.add_argument("--fail-fast", action="store_true", help="stop each generator's checks at its first failure")
+    args = ap.parse_args(argv)
+    entries = manifest_entries(args.manifest) if args.manifest else glob_entries(args.glob, args.reps, args.support, args.pairing)
+    skip = completed_ids(args.out)
+    cache = HomologyCache(args.cache) if args.cache else None
+    CX, CY = prepare_complexes(args.x, args.y, cache, transport_degrees([e for e in entries if e["id"] not in skip]))
+    n = failed = 0
+    with open(args.out, "a") as out:
+        for res in run_batch(CX, CY, entries, args.processes, skip, args.fail_fast):
+            out.write(json.dumps(res) + "\n"); out.flush()
+            n += 1; failed += not res["ok"]
+    print(f"{n} generator(s) checked, {failed} failed, {len(skip)} already done")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
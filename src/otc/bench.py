@@ -0,0 +1,207 @@
+
+"""Benchmark suite over synthetic workloads: time, peak memory and scaling per function.
+
+Each case builds its inputs from otc.synth at a given scale (outside the timed
+region). Timing is timeit-style: every sample calls the case back to back
+until at least `min_time` seconds have passed (hundreds of ms, so timer and
+scheduler noise stay small against the work) and the reported time per call
+is the median over `repeat` samples. Peak traced allocation comes from one
+extra run (tracemalloc sees numpy buffers). The scaling exponent is the
+log-log slope of time against the case's size metric across scales; the
+default scales span a 4x range of sizes up to ~15k cells.
+
+Baselines are machine-specific: generate one locally or in CI with
+--save-baseline and compare later runs on the same machine. A case is a
+regression when it is slower than tolerance x baseline and by more than the
+absolute floor `min_seconds`, or uses more than mem_tolerance x the baseline
+peak. A baseline recorded on a different machine (CPU count, architecture,
+Python or numpy version) is reported but never fails the run.
+"""
+import json, os, time, tracemalloc
+import numpy as np
+import pandas as pd
+from . import synth
+from .gf2 import matmul_gf2, gaussian_elim_rank, in_image, to_bool
+from .chain import ChainComplex, check_boundary_compat
+from .checks import commutator_identity, triangle_coherence_identity
+from .app_helpers import unit_test_generator, run_tower
+from .triangle_builder import build_triangle_template
+
+_WORKLOADS = {}
+
+def _workload(scale, n_moves=4):
+    key = (scale, n_moves)
+    if key not in _WORKLOADS:
+        w = synth.workload(n_vertices=12 + 8 * scale, n_top=40 * scale, dim=4, n_moves=n_moves, seed=scale)
+        w["complex"] = ChainComplex(w["boundaries"])
+        w["size"] = sum(w["complex"].dims.values())
+        _WORKLOADS[key] = w
+    return _WORKLOADS[key]
+
+def _dense(n, seed):
+    return np.random.default_rng(seed).random((n, n)) < 0.5
+
+def _case_matmul_dense(scale):
+    n = 128 * scale; A = _dense(n, 1); B = _dense(n, 2)
+    return (lambda: matmul_gf2(A, B)), n
+
+def _case_matmul_sparse(scale):
+    w = _workload(scale); C = w["moves"]; k = max(w["complex"].dims, key=w["complex"].dims.get)
+    return (lambda: matmul_gf2(C[0][k], C[1][k])), w["size"]
+
+def _case_rank(scale):
+    n = 128 * scale; A = _dense(n, 3)
+    return (lambda: gaussian_elim_rank(A)), n
+
+def _case_in_image(scale):
+    n = 128 * scale; B = _dense(n, 4)[:, : n // 2]; v = to_bool(matmul_gf2(B, _dense(n, 5)[: n // 2, :1]))
+    return (lambda: in_image(B, v)), n
+
+def _case_boundary_compat(scale):
+    w = _workload(scale); CX = w["complex"]
+    return (lambda: check_boundary_compat(CX, CX, w["moves"][0], workers=1)), w["size"]
+
+def _case_commutator(scale):
+    w = _workload(scale); CX = w["complex"]
+    return (lambda: commutator_identity(CX, w["moves"][0], w["moves"][1], w["H"], workers=1)), w["size"]
+
+def _case_triangle(scale):
+    w = _workload(scale); CX = w["complex"]
+    return (lambda: triangle_coherence_identity(CX, w["triangle"], workers=1)), w["size"]
+
+def _case_unit(scale):
+    w = _workload(scale); CX = w["complex"]
+    return (lambda: unit_test_generator(CX, CX, w["moves"][0], w["reps"])), w["size"]
+
+def _case_build_triangle(scale):
+    w = synth.workload(n_vertices=8 + scale, n_top=3 * scale, dim=4, seed=scale)
+    CX = ChainComplex(w["boundaries"]); C1, C2 = w["moves"][:2]
+    return (lambda: build_triangle_template(CX, C1, C2, workers=1)), sum(CX.dims.values())
+
+def _tower(scale, mode, steps):
+    w = _workload(scale); seq = (w["moves"] * steps)[:steps]
+    return (lambda: run_tower(None, seq, w["reps"], mode=mode)), w["size"] * len(seq)
+
+CASES = {
+    "matmul_gf2/dense": _case_matmul_dense,
+    "matmul_gf2/sparse": _case_matmul_sparse,
+    "gaussian_elim_rank": _case_rank,
+    "in_image": _case_in_image,
+    "check_boundary_compat": _case_boundary_compat,
+    "commutator_identity": _case_commutator,
+    "triangle_coherence_identity": _case_triangle,
+    "unit_test_generator": _case_unit,
+    "build_triangle_template": _case_build_triangle,
+    "run_tower/matrix": lambda s: _tower(s, "matrix", 4),         # composed maps fill in; keep it short
+    "run_tower/vectors": lambda s: _tower(s, "vectors", 16 * s),
+}
+
+DEFAULT_SCALES = (4, 8, 16)
+
+def measure(fn, repeat=5, min_time=0.2):
+    """(median seconds per call over `repeat` samples of >= min_time each, peak traced bytes of one run)."""
+    t0 = time.perf_counter(); fn(); first = time.perf_counter() - t0
+    calls = max(1, int(np.ceil(min_time / max(first, 1e-9))))
+    samples = []
+    for _ in range(max(1, int(repeat))):
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        samples.append((time.perf_counter() - t0) / calls)
+    tracemalloc.start()
+    try:
+        fn(); _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return float(np.median(samples)), peak
+
+def run(scales=DEFAULT_SCALES, repeat=5, only=None, min_time=0.2):
+    """DataFrame with one row per (case, scale): size, seconds, peak_bytes."""
+    rows = []
+    for name, setup in CASES.items():
+        if only and not any(o in name for o in only):
+            continue
+        for scale in scales:
+            fn, size = setup(scale)
+            sec, peak = measure(fn, repeat, min_time)
+            rows.append(dict(case=name, scale=int(scale), size=int(size), seconds=sec, peak_bytes=int(peak)))
+    return pd.DataFrame(rows, columns=["case", "scale", "size", "seconds", "peak_bytes"])
+
+def scaling(df):
+    """Per case: fitted exponent of seconds ~ size**e (NaN with fewer than two sizes)."""
+    out = {}
+    for name, g in df.groupby("case", sort=False):
+        g = g[(g["size"] > 0) & (g["seconds"] > 0)]
+        out[name] = float(np.polyfit(np.log(g["size"]), np.log(g["seconds"]), 1)[0]) if g["size"].nunique() > 1 else float("nan")
+    return out
+
+def machine_meta():
+    import platform
+    return dict(python=platform.python_version(), numpy=np.__version__, machine=platform.machine(), cpus=os.cpu_count())
+
+def same_machine(baseline):
+    """True when `baseline` was recorded with this machine's CPU count, architecture, Python and numpy."""
+    return baseline.get("meta") == machine_meta()
+
+def to_baseline(df):
+    return {"meta": machine_meta(), "cases": {name: {str(r.scale): dict(size=int(r.size), seconds=float(r.seconds), peak_bytes=int(r.peak_bytes))
+                             for r in g.itertuples()} for name, g in df.groupby("case", sort=False)}}
+
+def compare(df, baseline, tolerance=1.5, mem_tolerance=1.5, min_seconds=0.02):
+    """Rows of df annotated with baseline figures and a `regression` flag."""
+    rows = []
+    for r in df.itertuples(index=False):
+        b = baseline.get("cases", {}).get(r.case, {}).get(str(r.scale))
+        row = r._asdict()
+        if b is None:
+            row.update(base_seconds=np.nan, base_peak_bytes=np.nan, regression=False)
+        else:
+            slow = r.seconds > tolerance * b["seconds"] and r.seconds - b["seconds"] > min_seconds
+            fat = r.peak_bytes > mem_tolerance * b["peak_bytes"] and r.peak_bytes - b["peak_bytes"] > (1 << 20)
+            row.update(base_seconds=b["seconds"], base_peak_bytes=b["peak_bytes"], regression=bool(slow or fat))
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def main(argv=None):
+    """CLI: run the benchmark suite, optionally saving or checking a baseline."""
+    import argparse
+    ap = argparse.ArgumentParser(description="Benchmark OTC functions on synthetic workloads.")
+    ap.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    ap.add_argument("--repeat", type=int, default=5, help="samples per case (the median is reported)")
+    ap.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per sample")
+    ap.add_argument("--only", nargs="+", help="substrings selecting cases")
+    ap.add_argument("--baseline", help="baseline JSON to compare against")
+    ap.add_argument("--save-baseline", help="write this run as a baseline JSON")
+    ap.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown factor")
+    ap.add_argument("--mem-tolerance", type=float, default=1.5, help="allowed peak-memory growth factor")
+    ap.add_argument("--min-seconds", type=float, default=0.02, help="slowdowns below this many seconds per call never count")
+    ap.add_argument("-o", "--out", help="write the result table (.csv or .json)")
+    args = ap.parse_args(argv)
+    df = run(args.scales, args.repeat, args.only, args.min_time)
+    exps = scaling(df)
+    status = 0; foreign = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        df = compare(df, baseline, args.tolerance, args.mem_tolerance, args.min_seconds)
+        foreign = not same_machine(baseline)
+        status = int(bool(df["regression"].any()) and not foreign)
+    with pd.option_context("display.width", 160, "display.max_rows", None):
+        print(df.to_string(index=False))
+    print("\nscaling exponents (seconds ~ size^e):")
+    for name, e in exps.items():
+        print(f"  {name:32s} {e:6.2f}")
+    if args.out:
+        df.to_json(args.out, orient="records", indent=1) if args.out.endswith(".json") else df.to_csv(args.out, index=False)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(to_baseline(df), f, indent=1)
+    if foreign:
+        print(f"\n{args.baseline} was recorded on another machine ({baseline.get('meta')} vs {machine_meta()}); "
+              f"{int(df['regression'].sum())} flagged case(s) are informational only")
+    elif status:
+        print(f"\n{int(df['regression'].sum())} regression(s) against {args.baseline}")
+    return status
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,203 @@
+
+"""Packed-bit binary container for the objects described by schemas/*.schema.json.
+
+Layout (all integers little-endian):
+    b"OTCB" | u32 version | u64 manifest_len | u64 data_start | manifest JSON | blocks
+The manifest holds the JSON document with every matrix (and every reps vector)
+replaced by {"$block": name}, plus a table name -> {offset, rows, cols, dtype}.
+GF(2) blocks are PackedGF2 rows (uint64 words); signed blocks are row-major
+integers of the smallest width that fits. Blocks are 64-byte aligned so they can
+be viewed straight out of a memory map and are only materialized on access.
+"""
+import json, struct
+from collections.abc import Mapping
+import numpy as np
+from .gf2 import PackedGF2
+
+MAGIC = b"OTCB"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQQ")
+_ALIGN = 64
+SIGNED_KINDS = ("map_signed", "boundaries_signed")
+KINDS = ("complex", "map", "homotopy", "triangle", "reps", "support", "shapes") + SIGNED_KINDS
+
+def _align(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+def guess_kind(obj):
+    """Best-effort kind for a JSON document (GF(2) unless entries leave {0,1})."""
+    if "boundaries" in obj: return "complex"
+    if "degrees" in obj: return "shapes"
+    if "k3" in obj: return "reps"
+    if "blocks" in obj:
+        vals = [x for M in obj["blocks"].values() for row in M for x in row]
+        return "map_signed" if any(x not in (0, 1) for x in vals) else "map"
+    parts = list(obj.values())
+    if parts and all(isinstance(p, dict) and set(p) & {"A", "B", "J"} for p in parts): return "triangle"
+    return "support"
+
+def _is_matrix(x):
+    return isinstance(x, list) and (len(x) == 0 or isinstance(x[0], list))
+
+def _signed_dtype(M):
+    if M.size == 0: return np.dtype("<i1")
+    lo, hi = int(M.min()), int(M.max())
+    for dt in ("<i1", "<i2", "<i4", "<i8"):
+        info = np.iinfo(dt)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dt)
+    raise ValueError("signed block does not fit in int64")
+
+def dumps(obj, kind=None):
+    """Encode a JSON document (already parsed) as container bytes."""
+    kind = kind or guess_kind(obj)
+    if kind not in KINDS:
+        raise ValueError(f"unknown kind {kind!r}; expected one of {KINDS}")
+    signed = kind in SIGNED_KINDS
+    table, payload = {}, []
+    pos = 0
+
+    def add(name, arr, dtype, rows, cols):
+        nonlocal pos
+        buf = arr.tobytes()
+        table[name] = dict(offset=pos, rows=rows, cols=cols, dtype=dtype, nbytes=len(buf))
+        payload.append((pos, buf)); pos = _align(pos + len(buf))
+        return {"$block": name}
+
+    def walk(x, path):
+        if kind == "reps" and isinstance(x, list):
+            v = np.array(x, dtype=np.int64).reshape(1, len(x)) % 2
+            return add(path, PackedGF2.from_dense(v.astype(bool)).words.astype("<u8"), "gf2_vector", 1, len(x))
+        if _is_matrix(x):
+            M = np.array(x, dtype=np.int64)
+            if M.ndim != 2:
+                M = M.reshape(len(x), 0)
+            if signed:
+                dt = _signed_dtype(M)
+                return add(path, M.astype(dt), dt.str, *M.shape)
+            return add(path, PackedGF2.from_dense((M % 2).astype(bool)).words.astype("<u8"), "gf2", *M.shape)
+        if isinstance(x, dict):
+            return {k: walk(v, f"{path}/{k}" if path else str(k)) for k, v in x.items()}
+        return x
+
+    tree = walk(obj, "")
+    manifest = json.dumps(dict(kind=kind, tree=tree, blocks=table), separators=(",", ":")).encode("utf-8")
+    data_start = _align(_HEADER.size + len(manifest))
+    out = bytearray(data_start + pos)
+    out[:_HEADER.size] = _HEADER.pack(MAGIC, VERSION, len(manifest), data_start)
+    out[_HEADER.size:_HEADER.size + len(manifest)] = manifest
+    for off, buf in payload:
+        out[data_start + off:data_start + off + len(buf)] = buf
+    return bytes(out)
+
+def save(obj, path, kind=None):
+    with open(path, "wb") as f:
+        f.write(dumps(obj, kind))
+
+class CertificateFile:
+    """A memory-mapped container. Nothing past the manifest is read until a block is requested."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            head = f.read(_HEADER.size)
+            if len(head) < _HEADER.size:
+                raise ValueError(f"{path}: truncated header")
+            magic, version, mlen, data_start = _HEADER.unpack(head)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: not an OTC binary certificate")
+            if version != VERSION:
+                raise ValueError(f"{path}: unsupported container version {version}")
+            man = json.loads(f.read(mlen).decode("utf-8"))
+        self.kind = man["kind"]; self.tree = man["tree"]; self.table = man["blocks"]
+        self._data_start = data_start
+        self._mm = None
+
+    def _raw(self, name):
+        if self._mm is None:
+            self._mm = np.memmap(self.path, dtype=np.uint8, mode="r")
+        e = self.table[name]
+        start = self._data_start + e["offset"]
+        return self._mm[start:start + e["nbytes"]]
+
+    def shape(self, name):
+        e = self.table[name]; return (e["rows"], e["cols"])
+
+    def block(self, name):
+        """Materialize one block: PackedGF2 (GF(2) matrix), bool vector, or int64 matrix."""
+        e = self.table[name]; rows, cols = e["rows"], e["cols"]
+        raw = self._raw(name)
+        if e["dtype"] in ("gf2", "gf2_vector"):
+            words = raw.view("<u8").reshape(rows, (cols + 63) // 64)
+            P = PackedGF2(words, cols)
+            return P.to_dense().ravel() if e["dtype"] == "gf2_vector" else P
+        return raw.view(np.dtype(e["dtype"])).reshape(rows, cols).astype(np.int64)
+
+    def materialize(self, node=None):
+        """The JSON-shaped document with every block decoded to nested lists."""
+        node = self.tree if node is None else node
+        if isinstance(node, dict) and "$block" in node:
+            B = self.block(node["$block"])
+            if isinstance(B, PackedGF2): B = B.to_dense()
+            return B.astype(int).tolist()
+        if isinstance(node, dict):
+            return {k: self.materialize(v) for k, v in node.items()}
+        return node
+
+class LazyBlocks(Mapping):
+    """Read-only mapping key -> block that decodes each block on first access.
+    `shapes` is available without touching the data, which lets ChainComplex
+    size every degree while only materializing the boundaries a check uses."""
+    def __init__(self, cert, names):
+        self._cert = cert; self._names = dict(names); self._cache = {}
+        self.shapes = {k: tuple(cert.shape(n)) for k, n in self._names.items()}
+
+    def __getitem__(self, key):
+        if key not in self._cache:
+            self._cache[key] = self._cert.block(self._names[key])
+        return self._cache[key]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+def _refs(node):
+    return {k: v["$block"] for k, v in node.items() if isinstance(v, dict) and "$block" in v}
+
+def open_blocks(path, section):
+    """LazyBlocks over tree[section] ("boundaries" or "blocks"), keyed by int degree."""
+    cert = CertificateFile(path)
+    if section not in cert.tree:
+        raise ValueError(f"{path}: {cert.kind} container has no '{section}' section")
+    return LazyBlocks(cert, {int(k): n for k, n in _refs(cert.tree[section]).items()})
+
+def open_triangle(path):
+    """Triangle template as {k_str: LazyBlocks({"A", "B", "J"})}."""
+    cert = CertificateFile(path)
+    return {k: LazyBlocks(cert, _refs(part)) for k, part in cert.tree.items()}
+
+def open_reps(path):
+    cert = CertificateFile(path)
+    return {k: (cert.block(v["$block"]) if isinstance(v, dict) else v) for k, v in cert.tree.items()}
+
+def main(argv=None):
+    """CLI: convert certificates between JSON and the binary container."""
+    import argparse
+    ap = argparse.ArgumentParser(description="Convert OTC certificates between JSON and packed binary.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    a = sub.add_parser("to-bin"); a.add_argument("src"); a.add_argument("dst")
+    a.add_argument("--kind", choices=KINDS, help="schema kind (guessed from the document if omitted)")
+    b = sub.add_parser("to-json"); b.add_argument("src"); b.add_argument("dst")
+    args = ap.parse_args(argv)
+    if args.cmd == "to-bin":
+        with open(args.src) as f:
+            obj = json.load(f)
+        save(obj, args.dst, args.kind)
+    else:
+        with open(args.dst, "w") as f:
+            json.dump(CertificateFile(args.src).materialize(), f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
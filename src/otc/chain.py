@@ -1,57 +1,132 @@
 
 import numpy as np
-from .gf2 import to_bool, matmul_gf2, eq_gf2, in_image
+from .freivalds import identity_holds
+from . import zmod
+from .homology_cache import boundary_data, homology_projection
+from .reduction import SparseHomology
+from .engine import run_degrees, degree_rngs, fused_identity
+from .instrument import span
+from .gf2 import SparseGF2, as_gf2, to_bool, matmul_gf2, add_gf2, image_factor_gf2, in_image_factored
+
+SPARSE_MIN_CELLS = 20000   # engine="auto" switches to sparse column reduction from this many cells
 
 class ChainComplex:
-    def __init__(self, boundaries):
-        self.boundaries = {int(k): to_bool(v) for k, v in boundaries.items()}
-        self.maxdeg = max(self.boundaries.keys()) if self.boundaries else -1
+    def __init__(self, boundaries, cache=None, engine="auto"):
+        shapes = getattr(boundaries, "shapes", None)
+        if shapes is not None:
+            # lazy block mapping (binfmt.LazyBlocks): size degrees now, load blocks on first d(k)
+            self.boundaries = boundaries
+        else:
+            self.boundaries = {int(k): as_gf2(v) for k, v in boundaries.items()}
+            shapes = {k: d.shape for k, d in self.boundaries.items()}
+        self.maxdeg = max(shapes.keys()) if shapes else -1
         self.dims = {}
-        for k, d in self.boundaries.items():
-            self.dims[k] = d.shape[1]
-            self.dims[k-1] = d.shape[0]
+        for k, (rows, cols) in shapes.items():
+            self.dims[k] = cols
+            self.dims[k-1] = rows
+        self._factors = {}; self._homology = {}
+        self.cache = cache   # optional homology_cache.HomologyCache shared across runs/processes
+        if engine not in ("auto", "dense", "sparse"):
+            raise ValueError(f"ChainComplex: unknown engine {engine!r}")
+        self.engine = engine; self._sparse = None
+
+    @property
+    def sparse(self):
+        """True when image membership goes through sparse column reduction."""
+        return self.engine == "sparse" or (self.engine == "auto" and sum(self.dims.values()) >= SPARSE_MIN_CELLS)
+
+    def sparse_homology(self, cycles=False):
+        """reduction.SparseHomology of this complex, reduced lazily and kept (rebuilt once if
+        cycle bases are asked for after an image-only reduction)."""
+        if self._sparse is None or (cycles and not self._sparse.cycles):
+            self._sparse = SparseHomology(self, cycles=cycles)
+        return self._sparse
 
     def d(self, k):
-        return self.boundaries.get(k, np.zeros((self.dims.get(k-1,0), self.dims.get(k,0)), dtype=bool))
+        return self.boundaries.get(k, SparseGF2.zeros(self.dims.get(k-1,0), self.dims.get(k,0)))
 
-def check_boundary_compat(CX, CY, Cmap, zlift=False, dX_signed=None, dY_signed=None, C_signed=None):
-    ok = True; details = []
-    if not zlift:
-        degs = sorted(Cmap.keys())
-        for k in degs:
-            if (k-1) not in Cmap:
-                continue
-            Ck = to_bool(Cmap[k])
-            Ckm1 = to_bool(Cmap[k-1])
+    def has_factor(self, k):
+        """True when factor(k) has already been eliminated in this complex."""
+        return k in self._factors
+
+    def factor(self, k):
+        """Rank, pivots and cokernel check rows of d_k, eliminated once and cached."""
+        F = self._factors.get(k)
+        if F is None:
+            F = self._factors[k] = self.cache.boundary(self.d(k)) if self.cache is not None else image_factor_gf2(self.d(k))
+        return F
+
+    def homology(self, k):
+        """dict(betti, proj) for H_k: proj z = 0 iff the cycle z is a boundary (cached per degree)."""
+        H = self._homology.get(k)
+        if H is None:
+            if self.cache is not None:
+                H = self.cache.homology(self.d(k), self.d(k+1))
+            else:
+                H = homology_projection(boundary_data(self.d(k)), boundary_data(self.d(k+1)))
+            self._homology[k] = H
+        return H
+
+    def homology_coords(self, k, V):
+        """H_k coordinates (betti x s) of the cycles in the columns of V."""
+        V = to_bool(V)
+        return to_bool(matmul_gf2(self.homology(k)["proj"], V.reshape(V.shape[0], -1)))
+
+    def in_image_many(self, k, V):
+        """Bool vector: which columns of V (n_{k-1} x s) lie in im d_k."""
+        if self.sparse:
+            V = to_bool(V); V = V.reshape(V.shape[0], -1)
+            if V.shape[0] != self.dims.get(k-1, 0):
+                raise ValueError(f"in_image_many: {V.shape[0]} rows, im d_{k} lives in dimension {self.dims.get(k-1, 0)}")
+            S = self.sparse_homology()
+            return np.array([S.in_image(k-1, V[:, j]) for j in range(V.shape[1])], dtype=bool)
+        return in_image_factored(self.factor(k), V)
+
+def check_boundary_compat(CX, CY, Cmap, zlift=False, dX_signed=None, dY_signed=None, C_signed=None, rounds=None, seed=None,
+                          workers=None, fail_fast=False):
+    """Check dY_k C_k = C_{k-1} dX_k in every degree where both blocks exist.
+    With `rounds`, each degree is first screened by a Freivalds test (false-accept
+    probability <= 2**-rounds per degree) and only a mismatch is recomputed exactly.
+    Degrees run on a thread pool (engine.run_degrees); fail_fast stops at the first failure.
+    """
+    blocks_ = Cmap if not zlift else C_signed
+    degs = [k for k in sorted(blocks_.keys()) if (k-1) in blocks_]
+    rngs = degree_rngs(degs, seed) if rounds else {}
+    def exact(k):
+        if not zlift:
             dY = CY.d(k); dX = CX.d(k)
-            lhs = matmul_gf2(dY, Ck)
-            rhs = matmul_gf2(Ckm1, dX)
-            eq = eq_gf2(lhs, rhs)
-            ok &= eq; details.append((int(k), bool(eq)))
-        return ok, details
-    else:
-        degs = sorted(C_signed.keys())
-        for k in degs:
-            if (k-1) not in C_signed:
-                continue
-            Ck = C_signed[k]; Ckm1 = C_signed[k-1]
-            dY = dY_signed.get(k); dX = dX_signed.get(k)
-            lhs = dY @ Ck; rhs = Ckm1 @ dX
-            eq = (lhs.shape == rhs.shape) and (lhs == rhs).all()
-            ok &= eq; details.append((int(k), bool(eq)))
-        return ok, details
+            if rounds and identity_holds([(dY, Cmap[k])], [(Cmap[k-1], dX)], rounds, rngs[k]):
+                return True
+            return fused_identity([(dY, Cmap[k])], [(Cmap[k-1], dX)])
+        Ck = C_signed[k]; Ckm1 = C_signed[k-1]
+        dY = dY_signed.get(k); dX = dX_signed.get(k)
+        if rounds and identity_holds([(dY, Ck)], [(Ckm1, dX)], rounds, rngs[k], signed=True):
+            return True
+        return zmod.identity([(dY, Ck)], [(Ckm1, dX)])[0]
+    def one(k):
+        blocks = dict(C_k=blocks_[k], C_km1=blocks_[k-1]) if zlift else dict(dY_k=CY.d(k), dX_k=CX.d(k), C_k=Cmap[k], C_km1=Cmap[k-1])
+        with span("check_boundary_compat", degree=k, blocks=blocks) as prof:
+            eq = exact(k)
+        return eq, prof
+    done = run_degrees(one, degs, workers, fail_fast)
+    details = [(int(k), bool(done[k][0])) for k in degs if k in done]
+    return all(k in done and done[k][0] for k in degs), details
 
 def check_transport_homology(CX, CY, Cmap, c_dom, c_cod, k):
-    v_map = (to_bool(Cmap[k]) @ to_bool(c_dom).reshape(-1,1)) % 2
+    v_map = to_bool(matmul_gf2(Cmap[k], to_bool(c_dom).reshape(-1,1)))
     v_cod = to_bool(c_cod).reshape(-1,1)
-    diff = (v_map.astype(int) ^ v_cod.astype(int)) % 2
+    diff = add_gf2(v_map, v_cod)
     B = CY.d(k+1)
     # Safe handling at top degree
     if B.shape[0] == 0:
         in_im = np.all(diff == 0)
         return in_im, v_map, v_cod, diff
+    if CY.cache is not None and not CY.sparse and diff.shape[0] == CY.dims.get(k, -1) and not to_bool(matmul_gf2(CY.d(k), diff)).any():
+        # diff is a cycle: compare classes in cached H_k coordinates
+        in_im = not CY.homology_coords(k, diff).any()
+        return in_im, v_map, v_cod, diff
     try:
-        in_im = in_image(B, diff)
+        in_im = bool(CY.in_image_many(k+1, diff)[0])
     except ValueError as e:
         # Row mismatch indicates inconsistent dims; re-raise with more context
         raise ValueError(f"transport check at degree {k}: rows(dY_{k+1})={B.shape[0]}, len(diff)={diff.shape[0]} :: {e}")
@@ -61,20 +136,36 @@ def pairing_value(v_hi, v_lo, B=None, zlift=False, B_signed=None):
     if not zlift:
         v_hi = to_bool(v_hi).reshape(-1,1); v_lo = to_bool(v_lo).reshape(-1,1)
         if B is not None:
-            B = to_bool(B); return int((v_hi.T @ (B.astype(int)) @ v_lo) % 2)
-        n = min(v_hi.shape[0], v_lo.shape[0]); return int((v_hi[:n].T @ v_lo[:n]) % 2)
+            return int(to_bool(matmul_gf2(matmul_gf2(v_hi.T, B), v_lo))[0, 0])
+        n = min(v_hi.shape[0], v_lo.shape[0]); return int(matmul_gf2(v_hi[:n].T, v_lo[:n])[0, 0])
     else:
-        v_hi = np.array(v_hi, dtype=int).reshape(-1,1); v_lo = np.array(v_lo, dtype=int).reshape(-1,1)
-        if B_signed is not None: return int((v_hi.T @ B_signed @ v_lo).item())
-        n = min(v_hi.shape[0], v_lo.shape[0]); return int((v_hi[:n].T @ v_lo[:n]).item())
+        v_hi = zmod.signed_array(v_hi).reshape(-1,1); v_lo = zmod.signed_array(v_lo).reshape(-1,1)
+        if B_signed is not None: return int(zmod.product([v_hi.T, B_signed, v_lo])[0, 0])
+        n = min(v_hi.shape[0], v_lo.shape[0]); return int(zmod.matmul(v_hi[:n].T, v_lo[:n])[0, 0])
+
+def _allowed(n, idx):
+    """Mask of the listed indices in range(n); every index is allowed when the list is empty."""
+    if not len(idx):
+        return np.ones(n, dtype=bool)
+    idx = np.asarray(idx, dtype=np.int64); ok = np.zeros(n, dtype=bool)
+    ok[idx[(idx >= 0) & (idx < n)]] = True
+    return ok
 
 def check_support(Cmap, support_idx):
+    """True iff every nonzero of each C_k lies in the listed rows and columns of
+    support_idx[k] (a missing or empty list allows all). Tested as a mask over the
+    nonzeros of sparse blocks and over the disallowed rows/columns of dense ones."""
     for k, M in Cmap.items():
+        spec = (support_idx.get(str(k), {}), support_idx.get(k, {}))
+        rows = [i for s in spec for i in s.get("rows", [])]; cols = [i for s in spec for i in s.get("cols", [])]
+        if not rows and not cols:
+            continue
+        if isinstance(M, SparseGF2):
+            r, c = M.coo()
+            if not (_allowed(M.shape[0], rows)[r] & _allowed(M.shape[1], cols)[c]).all():
+                return False
+            continue
         M = to_bool(M)
-        rows = set(support_idx.get(str(k), {}).get("rows", [])) | set(support_idx.get(k, {}).get("rows", []))
-        cols = set(support_idx.get(str(k), {}).get("cols", [])) | set(support_idx.get(k, {}).get("cols", []))
-        nz = np.argwhere(M)
-        for r,c in nz:
-            if rows and r not in rows: return False
-            if cols and c not in cols: return False
+        if M[~_allowed(M.shape[0], rows)].any() or M[:, ~_allowed(M.shape[1], cols)].any():
+            return False
     return True
@@ -1,30 +1,73 @@
 
-import numpy as np
-from .gf2 import to_bool
+from .gf2 import SparseGF2, to_bool
+from .freivalds import identity_holds, error_bound
+from .engine import run_degrees, degree_rngs, fused_identity
+from .instrument import span
 
-def commutator_identity(CX, C_m1, C_m2, H):
-    ok = True; results = {}
-    degs = sorted(set(list(C_m1.keys()) + list(C_m2.keys())))
+def _screened(rounds, rng, lhs, rhs, results, k):
+    """Freivalds pre-check for the degree-k identity; records the mode used."""
+    if not rounds:
+        return False
+    passed = identity_holds(lhs, rhs, rounds, rng)
+    results[k]["mode"] = "freivalds" if passed else "exact"
+    if passed:
+        results[k]["error_bound"] = error_bound(rounds)
+    return passed
+
+def part_block(data, key, m, n):
+    """Block `key` of a template part, zeros(m, n) if absent. An empty block must
+    still be m x n unless that shape is itself empty ("[]" in JSON loses its columns)."""
+    M = data.get(key)
+    if M is not None and not hasattr(M, "shape"):
+        M = to_bool(M)
+    if M is None or (M.shape[0] * M.shape[1] == 0 and m * n == 0):
+        return SparseGF2.zeros(m, n)
+    return M
+
+def _check_degree(check, k, n_k, lhs, rhs, rounds, rng, blocks):
+    res = {k: dict(eq=True, n_k=int(n_k))}
+    with span(check, degree=k, blocks=blocks) as prof:
+        if not _screened(rounds, rng, lhs, rhs, res, k):
+            res[k]["eq"] = bool(fused_identity(lhs, rhs))
+    if prof is not None:
+        res[k]["profile"] = prof
+    return res[k]["eq"], res[k]
+
+def _collect(degs, done, n_k):
+    """(ok, results) in degree order; degrees cancelled by fail_fast are marked skipped."""
+    results = {}
     for k in degs:
+        if k in done:
+            results[k] = done[k][1]
+        else:
+            results[k] = dict(eq=None, n_k=int(n_k(k)), skipped=True)
+    return all(k in done and done[k][0] for k in degs), results
+
+def commutator_identity(CX, C_m1, C_m2, H, rounds=None, seed=None, workers=None, fail_fast=False):
+    """Check d_{k+1} H_k ⊕ H_{k-1} d_k = C2_k C1_k ⊕ C1_k C2_k degreewise over GF(2).
+    With `rounds`, degrees are screened by a Freivalds test and only mismatches
+    are recomputed exactly (results[k]["mode"] says which was used).
+    Degrees run in parallel on `workers` threads (default: one per degree, up to
+    the CPU count); fail_fast skips the remaining degrees after a failure.
+    """
+    degs = [int(k) for k in sorted(set(list(C_m1.keys()) + list(C_m2.keys())))]
+    rngs = degree_rngs(degs, seed) if rounds else {}
+    def one(k):
         n_k = CX.dims.get(k, 0)
         n_km1 = CX.dims.get(k-1, 0)
         n_kp1 = CX.dims.get(k+1, 0)
         d_k   = CX.d(k)
         d_kp1 = CX.d(k+1)
-        C1k = to_bool(C_m1.get(k, np.zeros((n_k, n_k), dtype=bool)))
-        C2k = to_bool(C_m2.get(k, np.zeros((n_k, n_k), dtype=bool)))
-        Hk  = to_bool(H.get(k,  np.zeros((n_kp1, n_k), dtype=bool)))
-        Hkm1= to_bool(H.get(k-1,np.zeros((n_k,   n_km1), dtype=bool)))
-        lhs = (d_kp1.astype(int) @ Hk.astype(int)) % 2
-        rhs_l = (Hkm1.astype(int) @ d_k.astype(int)) % 2
-        lhs = (lhs ^ rhs_l) % 2
-        rhs = ((C2k.astype(int) @ C1k.astype(int)) ^ (C1k.astype(int) @ C2k.astype(int))) % 2
-        eq = (lhs.shape == rhs.shape) and np.array_equal(lhs, rhs)
-        ok &= eq
-        results[int(k)] = dict(eq=bool(eq), n_k=int(n_k))
-    return ok, results
+        C1k = C_m1.get(k, SparseGF2.zeros(n_k, n_k))
+        C2k = C_m2.get(k, SparseGF2.zeros(n_k, n_k))
+        Hk = part_block(H, k, n_kp1, n_k)
+        Hkm1 = part_block(H, k-1, n_k, n_km1)
+        return _check_degree("commutator_identity", k, n_k, [(d_kp1, Hk), (Hkm1, d_k)], [(C2k, C1k), (C1k, C2k)],
+                             rounds, rngs.get(k), dict(d_k=d_k, d_kp1=d_kp1, C1_k=C1k, C2_k=C2k, H_k=Hk, H_km1=Hkm1))
+    done = run_degrees(one, degs, workers, fail_fast)
+    return _collect(degs, done, lambda k: CX.dims.get(k, 0))
 
-def triangle_coherence_identity(CX, J):
+def triangle_coherence_identity(CX, J, rounds=None, seed=None, workers=None, fail_fast=False):
     """Check degreewise:  d_{k+1} J_k  ⊕  J_{k-1} d_k  =  A_k ⊕ B_k  over GF(2).
     Shapes:
       d_k:    (n_{k-1} x n_k)
@@ -33,28 +76,26 @@ def triangle_coherence_identity(CX, J):
       A_k,B_k:(n_k x n_k)
     We only evaluate degrees k that appear in J (for A_k,B_k) and where shapes are consistent.
     Missing J blocks default to zeros of the appropriate shape.
+    With `rounds`, degrees are screened by a Freivalds test first; `workers` and
+    `fail_fast` schedule degrees as in commutator_identity.
     """
-    ok = True; results = {}
-    # keys where we have A_k/B_k expectations
-    for k_str, data in J.items():
-        k = int(k_str)
+    degs = [int(k) for k in J.keys()]
+    rngs = degree_rngs(degs, seed) if rounds else {}
+    def one(k):
+        data = J[str(k)] if str(k) in J else J[k]
         n_k = CX.dims.get(k, 0)
         n_km1 = CX.dims.get(k-1, 0)
         n_kp1 = CX.dims.get(k+1, 0)
         d_k   = CX.d(k)      # (n_{k-1} x n_k)
         d_kp1 = CX.d(k+1)    # (n_k x n_{k+1})
         # A,B,J_k provided at degree k
-        A = to_bool(data.get("A", np.zeros((n_k, n_k), dtype=bool)))
-        B = to_bool(data.get("B", np.zeros((n_k, n_k), dtype=bool)))
-        Jk= to_bool(data.get("J", np.zeros((n_kp1, n_k), dtype=bool)))
+        A = part_block(data, "A", n_k, n_k)
+        B = part_block(data, "B", n_k, n_k)
+        Jk = part_block(data, "J", n_kp1, n_k)
         # J_{k-1} may or may not be present; fetch from J dict if exists, else zero of correct shape
         data_km1 = J.get(str(k-1), {}) if isinstance(J, dict) else {}
-        Jkm1 = to_bool(data_km1.get("J", np.zeros((n_k, n_km1), dtype=bool)))
-        # Compute
-        term1 = (d_kp1.astype(int) @ Jk.astype(int)) % 2         # (n_k x n_k)
-        term2 = (Jkm1.astype(int) @ d_k.astype(int)) % 2         # (n_k x n_k)
-        lhs = (term1 ^ term2) % 2
-        rhs = (A.astype(int) ^ B.astype(int)) % 2
-        eq = (lhs.shape == rhs.shape) and np.array_equal(lhs, rhs)
-        ok &= eq; results[k] = dict(eq=bool(eq), n_k=int(n_k))
-    return ok, results
+        Jkm1 = part_block(data_km1, "J", n_k, n_km1)
+        return _check_degree("triangle_coherence_identity", k, n_k, [(d_kp1, Jk), (Jkm1, d_k)], [A, B],
+                             rounds, rngs.get(k), dict(d_k=d_k, d_kp1=d_kp1, A_k=A, B_k=B, J_k=Jk, J_km1=Jkm1))
+    done = run_degrees(one, degs, workers, fail_fast)
+    return _collect(degs, done, lambda k: CX.dims.get(k, 0))
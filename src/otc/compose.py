@@ -0,0 +1,156 @@
+
+"""Parallel composition of long move schedules (tree reduction and prefix scan).
+
+Composition is associative, so the schedule is cut into one contiguous chunk
+per worker. Each worker folds its chunk, the few chunk totals are combined
+pairwise as a balanced tree (log2(chunks) levels), and for the prefix scan the
+exclusive products of the chunk totals are formed in the parent, after which
+every worker re-walks its chunk starting from that offset. Depth is about
+S/processes + log2(processes) products instead of S.
+
+The move blocks are copied once into a single shared-memory segment; workers
+map them as read-only numpy views, so the schedule is never pickled. Only
+chunk totals, offsets and per-step results cross process boundaries.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from .gf2 import PackedGF2, SparseGF2, as_gf2, matmul_gf2, to_bool
+
+_ATTACHED = {}
+
+def share(seq):
+    """(SharedMemory, meta) holding every block of `seq`; the caller closes and unlinks it."""
+    parts = []; meta = []
+    for C in seq:
+        step = {}
+        for k, M in C.items():
+            if isinstance(M, SparseGF2):
+                arrs, tag = [M.indptr, M.indices], ("sparse", M.nrows)
+            elif isinstance(M, PackedGF2):
+                arrs, tag = [M.words], ("packed", M.ncols)
+            else:
+                arrs, tag = [np.ascontiguousarray(to_bool(M))], ("dense",)
+            step[k] = (tag, [(len(parts) + i, a.dtype.str, a.shape) for i, a in enumerate(arrs)])
+            parts += arrs
+        meta.append(step)
+    offsets = np.concatenate([[0], np.cumsum([a.nbytes for a in parts])]).astype(int)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(offsets[-1])))
+    for a, off in zip(parts, offsets):
+        shm.buf[off:off + a.nbytes] = a.tobytes()
+    meta = [{k: (tag, [(int(offsets[i]), dt, shape) for i, dt, shape in arrs]) for k, (tag, arrs) in step.items()}
+            for step in meta]
+    return shm, meta
+
+def _views(shm, meta):
+    def arr(off, dt, shape):
+        a = np.ndarray(shape, dtype=np.dtype(dt), buffer=shm.buf, offset=off)
+        a.flags.writeable = False
+        return a
+    seq = []
+    for step in meta:
+        C = {}
+        for k, (tag, arrs) in step.items():
+            a = [arr(*x) for x in arrs]
+            C[k] = SparseGF2(a[0], a[1], tag[1]) if tag[0] == "sparse" else PackedGF2(a[0], tag[1]) if tag[0] == "packed" else a[0]
+        seq.append(C)
+    return seq
+
+def _attach(name, meta):
+    """The shared schedule in a worker (attached once per process)."""
+    seq = _ATTACHED.get(name)
+    if seq is None:
+        # workers share the parent's resource tracker, which the parent's unlink() clears
+        shm = shared_memory.SharedMemory(name=name)
+        seq = _ATTACHED[name] = _views(shm, meta)
+        _ATTACHED[name + "/shm"] = shm
+    return seq
+
+def _fold(seq, lo, hi, degs, cum=None):
+    """C_{hi-1} ... C_lo (applied after `cum` when given)."""
+    for i in range(lo, hi):
+        C = seq[i]
+        cum = {k: as_gf2(C[k]) for k in degs} if cum is None else {k: matmul_gf2(C[k], cum[k]) for k in degs}
+    return cum
+
+def _combine(later, earlier):
+    if earlier is None:
+        return later
+    return {k: matmul_gf2(later[k], earlier[k]) for k in later}
+
+def _total_task(args):
+    name, meta, lo, hi, degs = args
+    return _fold(_attach(name, meta), lo, hi, degs)
+
+def _combine_task(args):
+    return _combine(*args)
+
+def _scan_task(args):
+    name, meta, lo, hi, degs, cum, each = args
+    seq = _attach(name, meta); out = []
+    for i in range(lo, hi):
+        cum = _fold(seq, i, i + 1, degs, cum)
+        out.append(cum if each is None else each(i + 1, cum))
+    return out
+
+def _chunks(S, n):
+    bounds = np.linspace(0, S, n + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+def _workers(processes, S):
+    return max(1, min(int(processes or os.cpu_count() or 1), S))
+
+def compose_parallel(seq, processes=None):
+    """Same `total` as towers.compose_maps(seq), by chunk folds and a balanced tree of products."""
+    if not seq:
+        return {}
+    degs = sorted(seq[0].keys())
+    n = _workers(processes, len(seq))
+    if n == 1:
+        return _fold(seq, 0, len(seq), degs)
+    shm, meta = share(seq)
+    try:
+        with ProcessPoolExecutor(max_workers=n) as ex:
+            level = list(ex.map(_total_task, [(shm.name, meta, lo, hi, degs) for lo, hi in _chunks(len(seq), n)]))
+            while len(level) > 1:
+                pairs = [(level[i+1], level[i]) for i in range(0, len(level) - 1, 2)]
+                nxt = list(ex.map(_combine_task, pairs))
+                level = nxt + ([level[-1]] if len(level) % 2 else [])
+        return level[0]
+    finally:
+        shm.close(); shm.unlink()
+
+def prefix_products(seq, processes=None, start=None, each=None):
+    """Yield, in order, each(i, P_i) for i = 1..len(seq) where P_i = C_i ... C_1 (applied
+    after `start` when given), or P_i itself when `each` is None. `each` runs in the
+    workers, so passing a (picklable) reducer such as a hash keeps results small."""
+    if not seq:
+        return
+    degs = sorted(seq[0].keys())
+    n = _workers(processes, len(seq))
+    if n == 1:
+        cum = start
+        for i in range(len(seq)):
+            cum = _fold(seq, i, i + 1, degs, cum)
+            yield cum if each is None else each(i + 1, cum)
+        return
+    chunks = _chunks(len(seq), n)
+    shm, meta = share(seq)
+    try:
+        with ProcessPoolExecutor(max_workers=n) as ex:
+            totals = list(ex.map(_total_task, [(shm.name, meta, lo, hi, degs) for lo, hi in chunks[:-1]]))
+            offsets = [start]
+            for T in totals:
+                offsets.append(_combine(T, offsets[-1]))
+            tasks = [(shm.name, meta, lo, hi, degs, off, each) for (lo, hi), off in zip(chunks, offsets)]
+            for part in ex.map(_scan_task, tasks):
+                yield from part
+    finally:
+        shm.close(); shm.unlink()
+
+def tower_step(i, cum, reps, keep=()):
+    """(hash_certificate(cum, reps), cum if step i is in `keep` else None): the per-step
+    reducer run_tower hands to prefix_products, so only checkpointed maps come back."""
+    from .towers import hash_certificate
+    return hash_certificate(cum, reps), (cum if i in keep else None)
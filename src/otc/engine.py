@@ -0,0 +1,114 @@
+
+"""Degree-parallel execution of per-degree checks.
+
+Degrees are independent, so each one is a task on a thread pool: the GF(2)
+kernels spend their time in numpy (integer matmul, packed XOR/AND, sorting
+sparse coordinates), which releases the GIL. With fail_fast the first failing
+degree cancels every degree that has not started yet.
+
+fused_identity evaluates sum(prod(lhs)) == sum(prod(rhs)) by XOR-ing every
+product into one accumulator in place, instead of materializing lhs, rhs and
+their comparison separately.
+"""
+import contextvars, multiprocessing, os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+from .gf2 import PackedGF2, SparseGF2, matmul_gf2, to_bool
+
+def default_workers(n_tasks):
+    """Threads for n_tasks degrees: one per degree up to the CPU count, but 1 inside a
+    worker process (batch pool, job server, compose), whose pool already fills the cores."""
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return max(1, min(int(n_tasks), os.cpu_count() or 1))
+
+def run_degrees(fn, degs, workers=None, fail_fast=False, progress=None):
+    """Run fn(k) for every degree; fn returns (passed, payload).
+    Returns {k: (passed, payload)} for the degrees that ran; with fail_fast,
+    degrees cancelled after the first failure are absent. `progress(done, total)`
+    is called from the calling thread as degrees finish; an exception it raises
+    cancels the degrees that have not started and propagates."""
+    degs = list(degs)
+    workers = default_workers(len(degs)) if workers is None else max(1, int(workers))
+    out = {}
+    if workers == 1 or len(degs) <= 1:
+        for k in degs:
+            out[k] = fn(k)
+            if progress is not None:
+                progress(len(out), len(degs))
+            if fail_fast and not out[k][0]:
+                break
+        return out
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        # each degree runs in a copy of the caller's context, so its spans reach the caller's recorder
+        pending = {ex.submit(contextvars.copy_context().run, fn, k): k for k in degs}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            failed = False
+            for f in done:
+                k = pending.pop(f)
+                out[k] = f.result()
+                failed |= not out[k][0]
+            if progress is not None:
+                try:
+                    progress(len(out), len(degs))
+                except BaseException:
+                    for f in pending:
+                        f.cancel()
+                    raise
+            if fail_fast and failed:
+                for f in pending:
+                    f.cancel()
+                for f, k in pending.items():
+                    if not f.cancelled():
+                        out[k] = f.result()
+                break
+    return out
+
+def degree_rngs(degs, seed):
+    """Independent per-degree generators, so screened checks are reproducible under threading."""
+    degs = list(degs)
+    return dict(zip(degs, (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(degs)))))
+
+def _product(chain):
+    chain = chain if isinstance(chain, (tuple, list)) else (chain,)
+    P = chain[0]
+    for M in chain[1:]:
+        P = matmul_gf2(P, M)
+    return P
+
+def fused_identity(lhs, rhs):
+    """Exact GF(2) test of sum(prod(c) for c in lhs) == sum(prod(c) for c in rhs).
+    Sparse products are merged by coordinate parity, packed and dense ones are
+    XOR-ed into a single buffer; mismatched shapes make the identity fail."""
+    shape = None; dense = None; packed = None; rows = []; cols = []
+    for c in list(lhs) + list(rhs):
+        P = _product(c)
+        if shape is None:
+            shape = P.shape
+        elif P.shape != shape:
+            return False
+        if isinstance(P, SparseGF2):
+            r, q = P.coo(); rows.append(r); cols.append(q)
+        elif isinstance(P, PackedGF2):
+            if packed is None:
+                packed = P.words.copy()
+            else:
+                packed ^= P.words
+        elif dense is None:
+            dense = np.array(to_bool(P), dtype=bool)
+        else:
+            np.logical_xor(dense, to_bool(P), out=dense)
+    if shape is None:
+        return True
+    if packed is not None and dense is None and not rows:
+        return not packed.any()
+    if dense is None:
+        if packed is None:
+            return SparseGF2.from_coo(np.concatenate(rows), np.concatenate(cols), shape).nnz == 0
+        dense = np.zeros(shape, dtype=bool)
+    if packed is not None:
+        np.logical_xor(dense, PackedGF2(packed, shape[1]).to_dense(), out=dense)
+    if rows:
+        np.bitwise_xor.at(dense, (np.concatenate(rows), np.concatenate(cols)), True)
+    return not dense.any()
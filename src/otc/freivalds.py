@@ -0,0 +1,55 @@
+
+"""Freivalds-style randomized checks of matrix-product identities.
+
+sum_i prod(lhs_i) == sum_j prod(rhs_j) is tested by applying both sides to a
+block of `rounds` random 0/1 vectors, evaluating every product right to left,
+so each check costs O(rounds * n^2) instead of O(n^3). A reported mismatch is
+always genuine; a reported match is wrong with probability at most
+2**-rounds (each round catches a nonzero difference with probability >= 1/2,
+over GF(2) and over Z alike).
+"""
+import numpy as np
+from .gf2 import matmul_gf2, to_bool
+from . import zmod
+
+def error_bound(rounds):
+    """Upper bound on the probability that `rounds` rounds accept a false identity."""
+    return 2.0 ** -int(rounds)
+
+def _chain(c, signed):
+    c = c if isinstance(c, (tuple, list)) else (c,)
+    if signed:
+        return [zmod.signed_array(M) for M in c]
+    return [M if hasattr(M, "shape") else to_bool(M) for M in c]
+
+def _apply(chain, R, signed):
+    V = R
+    for M in reversed(chain):
+        V = zmod.matmul(M, V) if signed else to_bool(matmul_gf2(M, V))
+    return V
+
+def identity_holds(lhs, rhs, rounds, rng=None, signed=False):
+    """Randomized test of sum(prod(c) for c in lhs) == sum(prod(c) for c in rhs).
+    Each term is a matrix or a tuple of matrices multiplied left to right;
+    sums are XOR over GF(2) (signed=False) or integer sums (signed=True).
+    Inconsistent shapes count as a mismatch so callers fall back to the exact check.
+    """
+    lhs = [_chain(c, signed) for c in lhs]; rhs = [_chain(c, signed) for c in rhs]
+    shapes = set()
+    for chain in lhs + rhs:
+        if any(A.shape[1] != B.shape[0] for A, B in zip(chain, chain[1:])):
+            return False
+        shapes.add((chain[0].shape[0], chain[-1].shape[1]))
+    if len(shapes) != 1:
+        return False
+    m, n = shapes.pop()
+    rng = np.random.default_rng() if rng is None else rng
+    R = rng.integers(0, 2, size=(n, int(rounds)))
+    if signed:
+        # exact (zmod): sums of large signed products would wrap in int64
+        return zmod.identity([_apply(c, R, True) for c in lhs], [_apply(c, R, True) for c in rhs])[0]
+    R = R.astype(bool)
+    acc = np.zeros((m, R.shape[1]), dtype=bool)
+    for c in lhs + rhs:
+        acc ^= _apply(c, R, False)
+    return not acc.any()
@@ -1,50 +1,398 @@
 
 import numpy as np
+
+_WORD = 64
+# Dense int64 products below this many multiply-adds are cheaper than packing.
+_PACK_THRESHOLD = 1 << 18
+# Cap on the (rows x cols x words) temporary used by the AND/popcount kernel.
+_POPCOUNT_CHUNK = 1 << 22
+# as_gf2 stores a matrix sparsely below this density (and above a minimum size).
+_SPARSE_DENSITY = 0.05
+_SPARSE_MIN_SIZE = 1 << 12
+
 def to_bool(A):
-    A = np.array(A)
+    """Dense bool view of a GF(2) array. Bool ndarrays are already canonical and
+    are returned as-is (no copy), so treat the result as read-only."""
+    if isinstance(A, np.ndarray) and A.dtype == bool and (A.size or A.ndim >= 2):
+        return A
+    if isinstance(A, (PackedGF2, SparseGF2)):
+        return A.to_dense()
+    A = np.asarray(A)
+    if A.ndim == 0:
+        return np.array([[bool(A % 2)]])
     if A.size == 0:
         return np.zeros((0,0), dtype=bool) if A.ndim <= 1 else A.astype(bool)
-    if A.ndim == 1:
-        return (A.astype(np.int64) % 2).astype(bool)
+    if A.dtype.kind in "biu":
+        return (A & 1).astype(bool)
     return (A.astype(np.int64) % 2).astype(bool)
+
+def _parity(words, axis=-1):
+    """Parity of the popcount of `words` along `axis` (XOR-reduce, then fold)."""
+    x = np.bitwise_xor.reduce(words, axis=axis)
+    for s in (32, 16, 8, 4, 2, 1):
+        x = x ^ (x >> np.uint64(s))
+    return (x & np.uint64(1)).astype(bool)
+
+class PackedGF2:
+    """GF(2) matrix with each row bit-packed into little-endian uint64 words.
+    Bit j of row i lives in words[i, j // 64] at position j % 64; padding bits
+    past `ncols` are always zero so word-level equality is exact.
+    Accepted directly by matmul_gf2, add_gf2, eq_gf2 and ChainComplex.
+    """
+    __slots__ = ("words", "ncols")
+    __array_ufunc__ = None   # make `ndarray @ PackedGF2` defer to __rmatmul__
+
+    def __init__(self, words, ncols):
+        words = np.ascontiguousarray(words, dtype=np.uint64)
+        if words.ndim != 2 or words.shape[1] != (int(ncols) + _WORD - 1) // _WORD:
+            raise ValueError(f"PackedGF2: words shape {words.shape} does not fit {ncols} columns")
+        self.words = words; self.ncols = int(ncols)
+
+    @classmethod
+    def from_dense(cls, A):
+        A = to_bool(A)
+        if A.ndim == 1:
+            A = A.reshape(1, -1)
+        m, n = A.shape
+        nw = (n + _WORD - 1) // _WORD
+        if n % _WORD:
+            P = np.zeros((m, nw * _WORD), dtype=bool); P[:, :n] = A
+        else:
+            P = np.ascontiguousarray(A)
+        b = np.packbits(P, axis=1, bitorder="little")
+        return cls(b.view("<u8").astype(np.uint64, copy=False).reshape(m, nw), n)
+
+    @classmethod
+    def coerce(cls, A):
+        return A if isinstance(A, cls) else cls.from_dense(A)
+
+    @classmethod
+    def zeros(cls, m, n):
+        return cls(np.zeros((m, (n + _WORD - 1) // _WORD), dtype=np.uint64), n)
+
+    @classmethod
+    def eye(cls, n):
+        P = cls.zeros(n, n); i = np.arange(n)
+        P.words[i, i // _WORD] = np.uint64(1) << (i % _WORD).astype(np.uint64)
+        return P
+
+    @property
+    def shape(self):
+        return (self.words.shape[0], self.ncols)
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def T(self):
+        return PackedGF2.from_dense(self.to_dense().T)
+
+    @property
+    def nnz(self):
+        return int(np.bitwise_count(self.words).sum()) if hasattr(np, "bitwise_count") \
+            else int(np.unpackbits(self.words.view(np.uint8)).sum())
+
+    def to_dense(self):
+        m, nw = self.words.shape
+        b = self.words.astype("<u8", copy=False).view(np.uint8).reshape(m, nw * 8)
+        return np.unpackbits(b, axis=1, bitorder="little", count=self.ncols).astype(bool)
+
+    def copy(self):
+        return PackedGF2(self.words.copy(), self.ncols)
+
+    def __array__(self, dtype=None, copy=None):
+        D = self.to_dense()
+        return D if dtype is None else D.astype(dtype)
+
+    def __matmul__(self, other):
+        return matmul_gf2(self, other)
+
+    def __rmatmul__(self, other):
+        return matmul_gf2(other, self)
+
+    def __xor__(self, other):
+        return add_gf2(self, other)
+    __rxor__ = __add__ = __radd__ = __xor__
+
+    def __repr__(self):
+        return f"PackedGF2(shape={self.shape})"
+
+class SparseGF2:
+    """GF(2) matrix in compressed-sparse-column form: the rows of column j are
+    indices[indptr[j]:indptr[j+1]], sorted and without repeats, so equal matrices
+    have equal arrays. Sums and products XOR-accumulate (keep odd multiplicities),
+    so cost scales with nonzeros. Accepted wherever PackedGF2 is.
+    """
+    __slots__ = ("indptr", "indices", "nrows")
+    __array_ufunc__ = None
+
+    def __init__(self, indptr, indices, nrows):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.nrows = int(nrows)
+
+    @classmethod
+    def from_coo(cls, rows, cols, shape):
+        """Build from (row, col) pairs; pairs that occur an even number of times cancel."""
+        m, n = shape
+        key = np.asarray(cols, dtype=np.int64) * max(m, 1) + np.asarray(rows, dtype=np.int64)
+        key, cnt = np.unique(key, return_counts=True)
+        key = key[cnt % 2 == 1]
+        cols = key // max(m, 1)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=n), out=indptr[1:])
+        return cls(indptr, key % max(m, 1), m)
+
+    @classmethod
+    def from_dense(cls, A):
+        A = to_bool(A)
+        if A.ndim == 1:
+            A = A.reshape(1, -1)
+        cols, rows = np.nonzero(A.T)
+        indptr = np.zeros(A.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=A.shape[1]), out=indptr[1:])
+        return cls(indptr, rows, A.shape[0])
+
+    @classmethod
+    def zeros(cls, m, n):
+        return cls(np.zeros(n + 1, dtype=np.int64), np.zeros(0, dtype=np.int64), m)
+
+    @classmethod
+    def eye(cls, n):
+        return cls(np.arange(n + 1), np.arange(n), n)
+
+    @property
+    def shape(self):
+        return (self.nrows, len(self.indptr) - 1)
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def nnz(self):
+        return int(len(self.indices))
+
+    def coo(self):
+        """(rows, cols) of the nonzeros, column-major."""
+        return self.indices, np.repeat(np.arange(self.shape[1]), np.diff(self.indptr))
+
+    @property
+    def T(self):
+        rows, cols = self.coo()
+        return SparseGF2.from_coo(cols, rows, self.shape[::-1])
+
+    def to_dense(self):
+        D = np.zeros(self.shape, dtype=bool)
+        rows, cols = self.coo()
+        D[rows, cols] = True
+        return D
+
+    def copy(self):
+        return SparseGF2(self.indptr.copy(), self.indices.copy(), self.nrows)
+
+    def __array__(self, dtype=None, copy=None):
+        D = self.to_dense()
+        return D if dtype is None else D.astype(dtype)
+
+    def __matmul__(self, other):
+        return matmul_gf2(self, other)
+
+    def __rmatmul__(self, other):
+        return matmul_gf2(other, self)
+
+    def __xor__(self, other):
+        return add_gf2(self, other)
+    __rxor__ = __add__ = __radd__ = __xor__
+
+    def __repr__(self):
+        return f"SparseGF2(shape={self.shape}, nnz={self.nnz})"
+
+def as_gf2(A):
+    """Canonical GF(2) storage chosen by density: SparseGF2 for large sparse
+    matrices, dense bool otherwise. PackedGF2/SparseGF2 inputs pass through."""
+    if isinstance(A, (PackedGF2, SparseGF2)):
+        return A
+    A = to_bool(A)
+    if A.ndim == 2 and A.size >= _SPARSE_MIN_SIZE and np.count_nonzero(A) <= _SPARSE_DENSITY * A.size:
+        return SparseGF2.from_dense(A)
+    return A
+
+def _sparse_matmul(A, B):
+    if isinstance(A, np.ndarray) and A.ndim == 1:
+        # row vector times matrix, 1-D in and out like the dense path
+        return to_bool(_sparse_matmul(A.reshape(1, -1), B)).ravel()
+    if A.shape[1] != B.shape[0]:
+        raise ValueError(f"matmul_gf2 shape mismatch: {A.shape} @ {B.shape}")
+    if isinstance(A, SparseGF2) and isinstance(B, SparseGF2):
+        # column j of A B is the XOR of A's columns i over the nonzeros (i, j) of B
+        bi, bj = B.coo()
+        cnt = A.indptr[bi+1] - A.indptr[bi]
+        start = np.repeat(A.indptr[bi] - np.cumsum(cnt) + cnt, cnt)
+        rows = A.indices[start + np.arange(int(cnt.sum()))]
+        return SparseGF2.from_coo(rows, np.repeat(bj, cnt), (A.shape[0], B.shape[1]))
+    if isinstance(A, SparseGF2):
+        # row r of A B accumulates row i of B for each nonzero (r, i) of A
+        vec = isinstance(B, np.ndarray) and B.ndim == 1
+        Bp = PackedGF2.coerce(B.reshape(-1, 1) if vec else B)
+        C = np.zeros((A.shape[0], Bp.words.shape[1]), dtype=np.uint64)
+        rows, cols = A.coo()
+        np.bitwise_xor.at(C, rows, Bp.words[cols])
+        C = PackedGF2(C, Bp.ncols)
+        if isinstance(B, PackedGF2):
+            return C
+        return C.to_dense().ravel() if vec else C.to_dense()
+    # (A B)^T row j accumulates row i of A^T for each nonzero (i, j) of B
+    At = A.T if isinstance(A, PackedGF2) else PackedGF2.from_dense(to_bool(A).T)
+    Ct = np.zeros((B.shape[1], At.words.shape[1]), dtype=np.uint64)
+    rows, cols = B.coo()
+    np.bitwise_xor.at(Ct, cols, At.words[rows])
+    Ct = PackedGF2(Ct, At.ncols)
+    return Ct.T if isinstance(A, PackedGF2) else Ct.to_dense().T
+
+def _mul_popcount(A, BT):
+    """C[i,j] = parity(popcount(A[i] & BT[j])); A is m x k, BT is n x k (both packed)."""
+    m, n = A.words.shape[0], BT.words.shape[0]
+    nw = A.words.shape[1]
+    C = np.zeros((m, n), dtype=bool)
+    step = max(1, _POPCOUNT_CHUNK // max(1, n * nw))
+    for i in range(0, m, step):
+        blk = A.words[i:i+step, None, :] & BT.words[None, :, :]
+        C[i:i+step] = _parity(blk, axis=2)
+    return PackedGF2.from_dense(C)
+
+def _mul_m4r(A, B):
+    """Method of Four Russians: for each 8-column slice of A, tabulate all 256
+    XOR-combinations of the matching 8 rows of B and gather one table row per row of A."""
+    m, k = A.shape
+    nwB = B.words.shape[1]
+    C = np.zeros((m, nwB), dtype=np.uint64)
+    if m == 0 or k == 0 or nwB == 0:
+        return PackedGF2(C, B.ncols)
+    Abytes = A.words.astype("<u8", copy=False).view(np.uint8).reshape(m, A.words.shape[1] * 8)
+    T = np.zeros((256, nwB), dtype=np.uint64)
+    tmp = np.empty((m, nwB), dtype=np.uint64)
+    for c in range((k + 7) // 8):
+        rows = B.words[8*c:8*c+8]
+        for b in range(rows.shape[0]):
+            np.bitwise_xor(T[:1 << b], rows[b], out=T[1 << b:2 << b])
+        T[1 << rows.shape[0]:] = 0
+        np.take(T, Abytes[:, c], axis=0, out=tmp)
+        np.bitwise_xor(C, tmp, out=C)
+    return PackedGF2(C, B.ncols)
+
+def _packed_matmul(A, B):
+    m, k = A.shape; k2, n = B.shape
+    if k != k2:
+        raise ValueError(f"matmul_gf2 shape mismatch: {A.shape} @ {B.shape}")
+    nwA = A.words.shape[1]; nwB = B.words.shape[1]
+    cost_pop = m * n * nwA
+    cost_m4r = ((k + 7) // 8) * (256 + m) * nwB
+    if cost_pop <= cost_m4r:
+        return _mul_popcount(A, B.T)
+    return _mul_m4r(A, B)
+
 def matmul_gf2(A, B):
+    if not isinstance(A, (np.ndarray, PackedGF2, SparseGF2)): A = to_bool(A)
+    if not isinstance(B, (np.ndarray, PackedGF2, SparseGF2)): B = to_bool(B)
+    if isinstance(A, SparseGF2) or isinstance(B, SparseGF2):
+        return _sparse_matmul(A, B)
+    if isinstance(A, PackedGF2) or isinstance(B, PackedGF2):
+        if isinstance(B, np.ndarray) and B.ndim == 1:
+            return _packed_matmul(A, PackedGF2.from_dense(B.reshape(-1, 1))).to_dense().ravel()
+        if isinstance(A, np.ndarray) and A.ndim == 1:
+            return _packed_matmul(PackedGF2.from_dense(A.reshape(1, -1)), B).to_dense().ravel()
+        return _packed_matmul(PackedGF2.coerce(A), PackedGF2.coerce(B))
     A = to_bool(A); B = to_bool(B)
+    if A.ndim == 2 and B.ndim == 2 and A.shape[0] * A.shape[1] * B.shape[1] >= _PACK_THRESHOLD:
+        return _packed_matmul(PackedGF2.from_dense(A), PackedGF2.from_dense(B)).to_dense()
     C = (A.astype(np.int64) @ B.astype(np.int64)) % 2
     return C.astype(bool)
 def add_gf2(A, B):
+    if isinstance(A, SparseGF2) and isinstance(B, SparseGF2):
+        if A.shape != B.shape:
+            raise ValueError(f"add_gf2 shape mismatch: {A.shape} vs {B.shape}")
+        (ra, ca), (rb, cb) = A.coo(), B.coo()
+        return SparseGF2.from_coo(np.concatenate([ra, rb]), np.concatenate([ca, cb]), A.shape)
+    if isinstance(A, PackedGF2) or isinstance(B, PackedGF2):
+        A = PackedGF2.coerce(A); B = PackedGF2.coerce(B)
+        if A.shape != B.shape:
+            raise ValueError(f"add_gf2 shape mismatch: {A.shape} vs {B.shape}")
+        return PackedGF2(A.words ^ B.words, A.ncols)
     A = to_bool(A); B = to_bool(B)
     return np.logical_xor(A, B)
 def eq_gf2(A, B):
+    if isinstance(A, SparseGF2) and isinstance(B, SparseGF2):
+        return A.shape == B.shape and np.array_equal(A.indptr, B.indptr) and np.array_equal(A.indices, B.indices)
+    if isinstance(A, PackedGF2) or isinstance(B, PackedGF2):
+        A = PackedGF2.coerce(A); B = PackedGF2.coerce(B)
+        return A.shape == B.shape and np.array_equal(A.words, B.words)
     A = to_bool(A); B = to_bool(B)
     return A.shape == B.shape and np.array_equal(A, B)
-def gaussian_elim_rank(A):
-    A = to_bool(A).astype(np.int8)
-    if A.ndim == 1:
-        A = A.reshape(1,-1)
-    m, n = A.shape
-    R = A.copy()
-    rank = 0
+def rref_gf2(A, ncols=None):
+    """Reduced row echelon form over GF(2), eliminating on bit-packed rows.
+    Pivots are searched only in the first `ncols` columns (default: all), so
+    augmented blocks [A | b] are carried along by the same row operations.
+    Every pivot clears its column in all other rows with one masked XOR.
+    Returns (rank, pivots, R) with R a PackedGF2 the shape of A.
+    """
+    R = A.copy() if isinstance(A, PackedGF2) else PackedGF2.from_dense(A)
+    W = R.words
+    m, n = R.shape
+    ncols = n if ncols is None else int(ncols)
+    pivots = []
     row = 0
-    for col in range(n):
-        pivot = None
-        for r in range(row, m):
-            if R[r, col] & 1:
-                pivot = r; break
-        if pivot is None:
-            continue
-        if pivot != row:
-            R[[row, pivot]] = R[[pivot, row]]
-        for r in range(m):
-            if r != row and (R[r, col] & 1):
-                R[r, :] ^= R[row, :]
-        rank += 1
-        row += 1
+    for col in range(ncols):
         if row == m:
             break
-    return rank, (R % 2).astype(bool)
+        w = col // _WORD; bit = np.uint64(1) << np.uint64(col % _WORD)
+        hits = (W[row:, w] & bit) != 0
+        if not hits.any():
+            continue
+        p = row + int(np.argmax(hits))
+        if p != row:
+            W[[row, p]] = W[[p, row]]
+        mask = (W[:, w] & bit) != 0
+        mask[row] = False
+        W[mask, w:] ^= W[row, w:]
+        pivots.append(col)
+        row += 1
+    return row, pivots, R
+def gf2_column(R, j):
+    """Column j of a PackedGF2 as a bool vector."""
+    return (R.words[:, j // _WORD] >> np.uint64(j % _WORD) & np.uint64(1)).astype(bool)
+def image_factor_gf2(B):
+    """Factor B (m x n) once for repeated image-membership tests.
+    Eliminating [B | I_m] yields the row transform E with E B = RREF(B); the rows
+    of E past the rank (`coker`) vanish exactly on im B, so v is in the image
+    iff coker @ v == 0. Returns dict(rank, pivots, coker) with coker packed.
+    """
+    B = to_bool(B)
+    if B.ndim == 1:
+        B = B.reshape(B.shape[0], 1)
+    m, n = B.shape
+    rank, pivots, R = rref_gf2(np.hstack([B, np.eye(m, dtype=bool)]), ncols=n)
+    coker = PackedGF2.from_dense(R.to_dense()[rank:, n:])
+    return dict(rank=rank, pivots=pivots, coker=coker)
+def in_image_factored(F, V):
+    """Which columns of V (m x s, or a length-m vector) lie in im B, given F = image_factor_gf2(B)."""
+    V = to_bool(V)
+    if V.ndim == 1:
+        V = V.reshape(-1, 1)
+    m = F["coker"].shape[1]
+    if V.shape[0] != m:
+        raise ValueError(f"in_image row mismatch: rows(B)={m}, len(v)={V.shape[0]}")
+    return ~to_bool(matmul_gf2(F["coker"], V)).any(axis=0)
+def gaussian_elim_rank(A):
+    A = to_bool(A)
+    if A.ndim == 1:
+        A = A.reshape(1,-1)
+    rank, _, R = rref_gf2(A)
+    return rank, R.to_dense()
 def in_image(B, v):
-    B = to_bool(B).astype(np.int8)
-    v = to_bool(v).astype(np.int8).reshape(-1, 1)
+    B = to_bool(B)
+    v = to_bool(v).reshape(-1, 1)
     if B.ndim == 1:
         B = B.reshape(B.shape[0], 1)
     m = B.shape[0]
@@ -54,23 +402,6 @@ def in_image(B, v):
     if v.shape[0] != m:
         raise ValueError(f"in_image row mismatch: rows(B)={m}, len(v)={v.shape[0]}")
     n = B.shape[1]
-    A = np.hstack([B, v]).astype(np.int8)
-    row = 0
-    for col in range(n):
-        pivot = None
-        for r in range(row, m):
-            if A[r, col] & 1:
-                pivot = r; break
-        if pivot is None:
-            continue
-        if pivot != row:
-            A[[row, pivot]] = A[[pivot, row]]
-        for r in range(m):
-            if r != row and (A[r, col] & 1):
-                A[r, :] ^= A[row, :]
-        row += 1
-        if row == m: break
-    for r in range(m):
-        if np.all(A[r, :n] % 2 == 0) and (A[r, n] % 2 != 0):
-            return False
-    return True
+    rank, _, R = rref_gf2(np.hstack([B, v]), ncols=n)
+    # rows past the rank are zero on B's columns; a 1 in the v column is inconsistent
+    return not gf2_column(R, n)[rank:].any()
@@ -1,11 +1,6 @@
 
 import numpy as np
-
-def to_bool(A):
-    A = np.array(A)
-    if A.ndim == 0:
-        return np.array([[bool(A % 2)]])
-    return (A.astype(np.int8) % 2).astype(bool)
+from .gf2 import rref_gf2, gf2_column, matmul_gf2, to_bool
 
 def kron_gf2(A, B):
     A = to_bool(A).astype(np.int8); B = to_bool(B).astype(np.int8)
@@ -23,43 +18,70 @@ def solve_gf2(A, b):
     """Solve A x = b over GF(2) (least one solution).
     Returns one solution x (n x 1) if consistent, else raises ValueError.
     """
-    A = (np.array(A).astype(np.int8) % 2)
-    b = (np.array(b).astype(np.int8) % 2).reshape(-1,1)
+    A = to_bool(A)
+    b = to_bool(b).reshape(-1,1)
     m, n = A.shape
-    # Augment
-    M = np.hstack([A, b]).astype(np.int8)
-    row = 0
-    pivots = []
-    for col in range(n):
-        # find pivot
-        pivot = None
-        for r in range(row, m):
-            if M[r, col] & 1:
-                pivot = r; break
-        if pivot is None:
-            continue
-        if pivot != row:
-            M[[row, pivot]] = M[[pivot, row]]
-        # eliminate other rows
-        for r in range(m):
-            if r != row and (M[r, col] & 1):
-                M[r, :] ^= M[row, :]
-        pivots.append(col)
-        row += 1
-        if row == m: break
+    rank, pivots, R = rref_gf2(np.hstack([A, b]), ncols=n)
     # Check consistency (row of zeros with RHS 1)
-    for r in range(row, m):
-        if (M[r, :n] % 2 == 0).all() and (M[r, n] & 1):
-            raise ValueError("Inconsistent system over GF(2).")
-    # Back-substitute for a basic solution
+    rhs = gf2_column(R, n)
+    if rhs[rank:].any():
+        raise ValueError("Inconsistent system over GF(2).")
+    # R is fully reduced, so the basic solution (free variables = 0) is read off directly
     x = np.zeros((n,1), dtype=np.int8)
-    # Work backwards
-    for r in range(min(row, len(pivots))-1, -1, -1):
-        c = pivots[r]
-        # sum over known vars
-        s = 0
-        for j in range(c+1, n):
-            if M[r, j] & 1:
-                s ^= int(x[j,0])
-        x[c,0] = (M[r, n] ^ s) & 1
-    return x % 2
+    x[pivots, 0] = rhs[:rank]
+    return x
+
+def _inverse_gf2(M):
+    n = M.shape[0]
+    rank, _, R = rref_gf2(np.hstack([M, np.eye(n, dtype=bool)]), ncols=n)
+    if rank != n:
+        raise ValueError("Matrix is singular over GF(2).")
+    return R.to_dense()[:, n:]
+
+def factor_two_sided_gf2(A, B):
+    """Factor the operator (X, Y) -> A X ⊕ Y B over GF(2), A: n x p, B: q x c.
+    Row-reduces A (P A = [R_A; 0], rank r) and column-reduces B
+    (B Q = [R_B^T | 0], rank s) with invertible transforms P, Q. In those
+    coordinates the image of the operator is every n x c matrix whose
+    bottom-right (n-r) x (c-s) block vanishes. Memory is O(n^2), no Kronecker products.
+    """
+    A = to_bool(A); B = to_bool(B)
+    n, p = A.shape; q, c = B.shape
+    r, pivA, RA = rref_gf2(np.hstack([A, np.eye(n, dtype=bool)]), ncols=p)
+    P = RA.to_dense()[:, p:]
+    s, pivB, RB = rref_gf2(np.hstack([B.T, np.eye(c, dtype=bool)]), ncols=q)
+    F = RB.to_dense()[:, q:]                        # F B^T = [R_B; 0], Q = F^T
+    return dict(shape=(n, p, q, c), r=r, s=s, pivA=pivA, pivB=pivB,
+                P=P, Pinv=_inverse_gf2(P), Q=F.T, Qinv=_inverse_gf2(F).T)
+
+def solve_factored_two_sided_many(F, Ds):
+    """Solve A X ⊕ Y B = D for every D in `Ds` as one multi-RHS batch, given
+    F = factor_two_sided_gf2(A, B). The transforms are applied to all right-hand
+    sides stacked together. Returns a list of (X, Y), with None for inconsistent systems.
+    """
+    n, p, q, c = F["shape"]; r, s = F["r"], F["s"]
+    N = len(Ds)
+    if N == 0:
+        return []
+    D = np.hstack([to_bool(Di).reshape(n, c) for Di in Ds])                # n x N*c
+    PD = matmul_gf2(F["P"], D)
+    E = matmul_gf2(PD.reshape(n, N, c).transpose(1, 0, 2).reshape(N*n, c), F["Q"]).reshape(N, n, c)
+    ok = ~E[:, r:, s:].reshape(N, -1).any(axis=1)
+    Xp = np.zeros((N, p, c), dtype=bool); Xp[:, F["pivA"], :] = E[:, :r, :]
+    Yp = np.zeros((N, n, q), dtype=bool); Yp[:, r:, F["pivB"]] = E[:, r:, :s]
+    X = matmul_gf2(Xp.reshape(N*p, c), F["Qinv"]).reshape(N, p, c)
+    Y = matmul_gf2(F["Pinv"], Yp.transpose(1, 0, 2).reshape(n, N*q)).reshape(n, N, q).transpose(1, 0, 2)
+    return [(X[i], Y[i]) if ok[i] else None for i in range(N)]
+
+def solve_factored_two_sided(F, D):
+    """One solution (X, Y) of A X ⊕ Y B = D given F = factor_two_sided_gf2(A, B).
+    Raises ValueError if the system is inconsistent.
+    """
+    sol = solve_factored_two_sided_many(F, [D])[0]
+    if sol is None:
+        raise ValueError("Inconsistent system over GF(2).")
+    return sol
+
+def solve_two_sided_gf2(A, B, D):
+    """Solve A X ⊕ Y B = D over GF(2) for (X, Y); see factor_two_sided_gf2."""
+    return solve_factored_two_sided(factor_two_sided_gf2(A, B), D)
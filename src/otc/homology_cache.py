@@ -0,0 +1,139 @@
+
+"""Content-addressed on-disk cache of per-degree homology data.
+
+Entries are keyed by a blake2b digest of the boundary block contents (the same
+hash family as towers.hash_certificate), so re-uploading an identical complex
+hits the cache regardless of file names. Each entry is one .npz file written
+atomically (temp file + os.replace); the directory is kept under `max_bytes`
+by evicting least-recently-used files (reads refresh the mtime) while holding
+an advisory lock, so several worker processes can share one cache directory.
+"""
+import os, tempfile
+from hashlib import blake2b
+import numpy as np
+from .gf2 import PackedGF2, to_bool, matmul_gf2, rref_gf2
+
+try:
+    import fcntl
+except ImportError:          # non-POSIX: eviction runs unlocked, which is still safe for readers
+    fcntl = None
+
+def block_key(M):
+    """Content hash of a GF(2) block (independent of dense/packed/sparse storage)."""
+    P = PackedGF2.coerce(M)
+    h = blake2b(digest_size=16)
+    h.update(np.array(P.shape, dtype="<i8").tobytes())
+    h.update(P.words.astype("<u8", copy=False).tobytes())
+    return h.hexdigest()
+
+def boundary_data(d):
+    """Everything derived from one boundary block d (m x n) by a single elimination of [d | I]:
+    rank, pivots (image basis = those columns of d), coker rows (v in im d iff coker v = 0)
+    and a kernel basis (n x (n - rank), one column per free variable)."""
+    d = to_bool(d)
+    m, n = d.shape
+    rank, pivots, R = rref_gf2(np.hstack([d, np.eye(m, dtype=bool)]), ncols=n)
+    R = R.to_dense()
+    free = np.setdiff1d(np.arange(n), pivots)
+    K = np.zeros((n, len(free)), dtype=bool)
+    K[free, np.arange(len(free))] = True
+    K[pivots, :] = R[:rank, free]
+    return dict(rank=rank, pivots=list(pivots), coker=PackedGF2.from_dense(R[rank:, n:]),
+                kernel=PackedGF2.from_dense(K))
+
+def homology_projection(dk_data, dkp1_data):
+    """Projection onto H_k coordinates: proj (betti x n_k) with proj z = 0 iff the
+    cycle z is a boundary. Built from ker d_k and the cokernel rows of d_{k+1}."""
+    E = dkp1_data["coker"]; Z = dk_data["kernel"]
+    W = to_bool(matmul_gf2(E, Z))                       # classes of the cycle basis in C_k / B_k
+    _, rows, _ = rref_gf2(W.T)                          # independent rows of W
+    proj = PackedGF2.from_dense(E.to_dense()[rows, :]) if rows else PackedGF2.zeros(0, E.shape[1])
+    return dict(betti=len(rows), proj=proj)
+
+def _pack(data):
+    out = {}
+    for k, v in data.items():
+        if isinstance(v, PackedGF2):
+            out[k + "__words"] = v.words; out[k + "__ncols"] = np.int64(v.ncols)
+        else:
+            out[k] = np.asarray(v)
+    return out
+
+def _unpack(npz):
+    data = {}
+    for k in npz.files:
+        if k.endswith("__ncols"):
+            continue
+        if k.endswith("__words"):
+            name = k[:-7]
+            data[name] = PackedGF2(npz[k], int(npz[name + "__ncols"]))
+        else:
+            v = npz[k]
+            data[k] = v.item() if v.ndim == 0 else v
+    return data
+
+class HomologyCache:
+    """Directory of content-addressed .npz entries with size-bounded LRU eviction."""
+    def __init__(self, root, max_bytes=1 << 30):
+        self.root = root; self.max_bytes = int(max_bytes)
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key + ".npz")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with np.load(path) as npz:
+                data = _unpack(npz)
+            os.utime(path)
+            return data
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key, data):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **_pack(data))
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._evict()
+
+    def get_or_compute(self, key, fn):
+        data = self.get(key)
+        if data is None:
+            data = fn(); self.put(key, data)
+        return data
+
+    def _evict(self):
+        with open(os.path.join(self.root, ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = []
+            for name in os.listdir(self.root):
+                if not name.endswith(".npz"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+            total = sum(e[1] for e in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.root, name)); total -= size
+                except FileNotFoundError:
+                    pass
+
+    def boundary(self, d):
+        return self.get_or_compute("d-" + block_key(d), lambda: boundary_data(d))
+
+    def homology(self, dk, dkp1):
+        key = "h-" + blake2b((block_key(dk) + block_key(dkp1)).encode(), digest_size=16).hexdigest()
+        return self.get_or_compute(key, lambda: homology_projection(self.boundary(dk), self.boundary(dkp1)))
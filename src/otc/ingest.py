@@ -0,0 +1,121 @@
+
+"""Parse-once ingestion of JSON certificates into canonical GF(2) arrays.
+
+Every matrix goes through a single np.asarray call, which also rejects ragged
+rows. The same pass checks each entry against the schema ({0,1}) and, when a
+shape manifest is given, against the manifest dims and support bounds. The
+result is a frozen bool array (writeable=False), or a SparseGF2 via as_gf2.
+gf2.to_bool returns bool arrays unchanged, so code downstream of ingestion
+uses these arrays directly and the check loops make no extra copies.
+"""
+import numpy as np
+from .gf2 import SparseGF2, as_gf2
+
+def freeze(A):
+    """Mark a canonical GF(2) block read-only (in place) and return it."""
+    if isinstance(A, SparseGF2):
+        A.indptr.flags.writeable = False; A.indices.flags.writeable = False
+    elif isinstance(A, np.ndarray):
+        A.flags.writeable = False
+    return A
+
+def _degree(manifest, k):
+    try:
+        return manifest["degrees"][str(k)]
+    except KeyError:
+        raise ValueError(f"degree {k} missing from shape manifest") from None
+
+def _array(x, what, ndim):
+    try:
+        A = np.asarray(x, dtype=np.int64)
+    except (ValueError, TypeError):
+        raise ValueError(f"{what}: ragged matrix row lengths or non-integer entries.") from None
+    if A.ndim == 1 and A.size == 0 and ndim == 2:
+        A = A.reshape(0, 0)
+    if A.ndim != ndim:
+        raise ValueError(f"{what}: expected a {ndim}-d array, got {A.ndim}-d")
+    if A.size and (A.min() < 0 or A.max() > 1):
+        raise ValueError(f"{what}: GF(2) entries must be 0 or 1")
+    return A.astype(bool)
+
+def gf2_matrix(x, what="matrix"):
+    """One JSON matrix (nested lists) as a frozen canonical GF(2) block."""
+    return freeze(as_gf2(_array(x, what, 2)))
+
+def gf2_vector(x, what="vector"):
+    return freeze(_array(x, what, 1))
+
+def _blocks(items, label):
+    out = {}
+    for k, v in items:
+        if not str(k).isdigit():
+            raise ValueError(f"{label}: degree key {k!r} is not a non-negative integer")
+        out[int(k)] = gf2_matrix(v, f"{label}_{k}")
+    return out
+
+def ingest_boundaries(obj, manifest=None):
+    """{k: d_k} from a complex document; d_k must be dim_k_minus_1 x dim_k under `manifest`."""
+    if "boundaries" not in obj:
+        raise ValueError("complex: missing 'boundaries'")
+    out = _blocks(obj["boundaries"].items(), "d")
+    if manifest is not None:
+        for k, D in out.items():
+            deg = _degree(manifest, k)
+            want = (deg["dim_k_minus_1"], deg["dim_k"])
+            if D.shape != want:
+                raise ValueError(f"d_{k} shape {D.shape[0]}x{D.shape[1]} != {want[0]}x{want[1]}")
+    return out
+
+def ingest_blocks(obj, manifest=None, side="X"):
+    """{k: C_k} from a map/homotopy document; C_k must have dim_k columns under `manifest`."""
+    if "blocks" not in obj:
+        raise ValueError("map: missing 'blocks'")
+    out = _blocks(obj["blocks"].items(), "C")
+    if manifest is not None:
+        for k, C in out.items():
+            want = _degree(manifest, k)["dim_k"]
+            if C.shape == (0, 0):          # "[]" cannot carry its column count
+                C = out[k] = freeze(np.zeros((0, want), dtype=bool))
+            if C.shape[1] != want:
+                raise ValueError(f"C_{k} cols {C.shape[1]} != dim_k({side}) {want}")
+    return out
+
+def ingest_triangle(obj, manifest=None):
+    """{k_str: {"A", "B", "J"}} with every part validated as a degree-k block."""
+    out = {}
+    for k, part in obj.items():
+        out[k] = {key: ingest_blocks({"blocks": {k: part[key]}}, manifest)[int(k)] for key in ("A", "B", "J") if key in part}
+    return out
+
+def ingest_reps(obj, manifest=None):
+    """Representatives with frozen bool vectors; lengths must equal dim_k under `manifest`."""
+    missing = {"k3", "k2", "c3_dom", "c3_cod", "c2_dom", "c2_cod"} - set(obj)
+    if missing:
+        raise ValueError(f"reps: missing {sorted(missing)}")
+    out = dict(obj, k3=int(obj["k3"]), k2=int(obj["k2"]))
+    for name in ("c3_dom", "c3_cod", "c2_dom", "c2_cod"):
+        out[name] = gf2_vector(obj[name], name)
+        if manifest is not None:
+            k = out["k3"] if name.startswith("c3") else out["k2"]
+            if len(out[name]) != _degree(manifest, k)["dim_k"]:
+                raise ValueError(f"{name} length mismatch")
+    return out
+
+def ingest_support(obj, manifest=None):
+    """Support spec {k_str: {rows, cols}} with integer indices inside [0, dim_k) under `manifest`."""
+    out = {}
+    for k, spec in obj.items():
+        extra = set(spec) - {"rows", "cols"}
+        if extra:
+            raise ValueError(f"support {k}: unexpected keys {sorted(extra)}")
+        out[k] = {}
+        for key, word in (("rows", "row"), ("cols", "col")):
+            if key not in spec:
+                continue
+            idx = np.asarray(spec[key], dtype=np.int64).reshape(-1)
+            bound = _degree(manifest, k)["dim_k"] if manifest is not None else None
+            bad = idx[(idx < 0) | (idx >= bound)] if bound is not None else idx[idx < 0]
+            if bad.size:
+                raise ValueError(f"{word} index {int(bad[0])} out of bounds for degree {k}")
+            out[k][key] = idx.tolist()
+    return out
@@ -0,0 +1,166 @@
+
+"""Per-check, per-degree instrumentation: wall time, block shapes, nonzeros, peak allocation.
+
+Checks call span(...) around their work; it does nothing unless a Recorder
+is active. Use it as a context manager:
+
+    with Recorder() as rec:
+        unit_test_generator(...)
+    rec.to_jsonl("run.jsonl"); rec.to_chrome_trace("run.trace.json")
+
+The active recorder is context-local (a ContextVar holding the stack of
+entered recorders), so a recorder only sees spans from its own thread and
+from work that explicitly runs in a copy of its context (engine.run_degrees
+does this for degree threads). Background threads, other Streamlit sessions
+and interleaved recorders never record into each other.
+
+Peak allocation comes from tracemalloc (numpy buffers are traced) and is
+relative to the allocation level when the span started. tracemalloc is
+process-global, so it is reference-counted across recorders and stops only
+when the last one exits (and never if something else started it). Nested
+spans on one thread are exact; spans on concurrent degree threads share the
+global peak, so run with workers=1 when the memory column matters.
+"""
+import contextvars, json, threading, time, tracemalloc
+from contextlib import contextmanager
+import numpy as np
+
+_ACTIVE = contextvars.ContextVar("otc_recorders", default=())
+_local = threading.local()
+_tracing = dict(users=0, owned=False)
+_tracing_lock = threading.Lock()
+
+def active():
+    """The innermost recorder entered in this context, or None."""
+    stack = _ACTIVE.get()
+    return stack[-1] if stack else None
+
+def _trace_acquire():
+    with _tracing_lock:
+        if _tracing["users"] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(); _tracing["owned"] = True
+        _tracing["users"] += 1
+
+def _trace_release():
+    with _tracing_lock:
+        _tracing["users"] -= 1
+        if _tracing["users"] == 0 and _tracing["owned"]:
+            tracemalloc.stop(); _tracing["owned"] = False
+
+def block_stats(blocks):
+    """{name: {shape, nnz}} for the matrix-like values of `blocks`."""
+    out = {}
+    for name, M in blocks.items():
+        if not hasattr(M, "shape"):
+            continue
+        nnz = M.nnz if hasattr(M, "nnz") else int(np.count_nonzero(M))
+        out[str(name)] = dict(shape=[int(x) for x in M.shape], nnz=int(nnz))
+    return out
+
+class Recorder:
+    """Collects one record per span; thread-safe. `memory=False` skips tracemalloc."""
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.records = []
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._tracing = 0
+
+    def __enter__(self):
+        if self.memory:
+            _trace_acquire(); self._tracing += 1
+        _ACTIVE.set(_ACTIVE.get() + (self,))
+        return self
+
+    def __exit__(self, *exc):
+        # drop this recorder wherever it sits, so out-of-order exits leave the others intact
+        stack = list(_ACTIVE.get())
+        if self in stack:
+            stack.reverse(); stack.remove(self); stack.reverse()
+        _ACTIVE.set(tuple(stack))
+        if self._tracing:
+            self._tracing -= 1; _trace_release()
+        return False
+
+    @contextmanager
+    def span(self, name, check=None, degree=None, blocks=None):
+        rec = dict(check=check or name, name=name, degree=None if degree is None else int(degree))
+        if blocks:
+            rec["blocks"] = block_stats(blocks)
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        tracing = self.memory and tracemalloc.is_tracing()
+        frame = None
+        if tracing:
+            cur, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            frame = [cur, cur]; stack.append(frame)
+        t = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["start"] = t - self._t0
+            rec["seconds"] = time.perf_counter() - t
+            rec["thread"] = threading.get_ident()
+            if frame is not None:
+                stack.pop()
+                top = max(frame[1], tracemalloc.get_traced_memory()[1])
+                rec["peak_bytes"] = int(top - frame[0])
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], top)
+            with self._lock:
+                self.records.append(rec)
+
+    def table(self):
+        """Records as a flat DataFrame (block stats summarised as total nnz and a shapes string)."""
+        import pandas as pd
+        rows = []
+        for r in self.records:
+            row = {k: v for k, v in r.items() if k != "blocks"}
+            b = r.get("blocks", {})
+            row["nnz"] = sum(s["nnz"] for s in b.values()) if b else None
+            row["shapes"] = " ".join(f"{n}:{s['shape'][0]}x{s['shape'][1]}" for n, s in b.items()) if b else ""
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def to_jsonl(self, path=None):
+        """One JSON object per record; returns the text when `path` is None."""
+        text = "".join(json.dumps(r) + "\n" for r in self.records)
+        if path is None:
+            return text
+        with open(path, "w") as f:
+            f.write(text)
+
+    def to_chrome_trace(self, path=None):
+        """Chrome trace-event JSON (chrome://tracing, Perfetto); one complete event per span,
+        one process per `run` label when records carry one."""
+        tids = {}; pids = {}
+        events = []
+        for r in sorted(self.records, key=lambda r: (str(r.get("run", "")), r["start"])):
+            pid = pids.setdefault(r.get("run", ""), len(pids))
+            tid = tids.setdefault(r["thread"], len(tids))
+            name = r["name"] if r["degree"] is None else f"{r['name']} [k={r['degree']}]"
+            args = {k: v for k, v in r.items() if k not in ("name", "check", "start", "seconds", "thread", "run")}
+            events.append(dict(name=name, cat=r["check"], ph="X", pid=pid, tid=tid,
+                               ts=round(r["start"] * 1e6, 3), dur=round(r["seconds"] * 1e6, 3), args=args))
+        events += [dict(name="process_name", ph="M", pid=pid, args=dict(name=str(run) or "run"))
+                   for run, pid in pids.items()]
+        text = json.dumps(dict(traceEvents=events, displayTimeUnit="ms"))
+        if path is None:
+            return text
+        with open(path, "w") as f:
+            f.write(text)
+
+@contextmanager
+def _noop():
+    yield None
+
+def span(name, check=None, degree=None, blocks=None):
+    """Recorder.span on the active recorder of this context, or a no-op yielding None."""
+    rec = active()
+    if rec is None:
+        return _noop()
+    return rec.span(name, check, degree, blocks)
@@ -0,0 +1,86 @@
+
+"""Background jobs with progress reporting and cooperative cancellation.
+
+A Job runs fn(*args, progress=job.report, **kwargs) on a daemon thread.
+Long-running functions (run_tower, build_triangle_template, novelty_sweep)
+call progress(done, total) between steps; once cancel() has been requested
+that call raises Cancelled, so the job stops at the next step boundary.
+With record=True the job runs under its own instrument.Recorder (timings
+only); since recorders are context-local, its records never mix with those
+of the thread that started it or of other jobs.
+"""
+import threading, time, uuid
+from .instrument import Recorder
+
+class Cancelled(Exception):
+    pass
+
+class Job:
+    """One background computation. state: pending, running, done, failed or cancelled."""
+    def __init__(self, fn, *args, name=None, record=False, **kwargs):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name or getattr(fn, "__name__", "job")
+        self.state = "pending"; self.result = None; self.error = None
+        self.done = 0; self.total = None
+        self.started = self.finished = None
+        self.record = record; self.records = []
+        self._fn, self._args, self._kwargs = fn, args, kwargs
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def report(self, done, total=None):
+        """Progress callback handed to fn; raises Cancelled once cancel() was requested."""
+        self.done = int(done)
+        if total is not None:
+            self.total = int(total)
+        if self._cancel.is_set():
+            raise Cancelled()
+
+    @property
+    def fraction(self):
+        if self.state == "done":
+            return 1.0
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    @property
+    def running(self):
+        return self.state in ("pending", "running")
+
+    def _run(self):
+        self.state = "running"; self.started = time.time()
+        try:
+            if self.record:
+                with Recorder(memory=False) as rec:
+                    self.records = rec.records
+                    self.result = self._fn(*self._args, progress=self.report, **self._kwargs)
+            else:
+                self.result = self._fn(*self._args, progress=self.report, **self._kwargs)
+            self.state = "done"
+        except Cancelled:
+            self.state = "cancelled"
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"; self.state = "failed"
+        finally:
+            self.finished = time.time()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"otc-job-{self.id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.running
+
+    def status(self):
+        """JSON-friendly summary (without the result)."""
+        return dict(id=self.id, name=self.name, state=self.state, done=self.done, total=self.total,
+                    fraction=self.fraction, error=self.error, started=self.started, finished=self.finished)
+
+def submit(fn, *args, name=None, record=False, **kwargs):
+    """Start fn in the background and return its Job."""
+    return Job(fn, *args, name=name, record=record, **kwargs).start()
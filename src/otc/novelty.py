@@ -0,0 +1,135 @@
+
+"""Novelty sweep: inject every candidate move at every step of a tower at once.
+
+Replacing move s by N leaves the hashes of steps < s unchanged, and the step-s
+state is N v_{s-1} where v_{s-1} is the baseline prefix state; if that state
+hashes like the baseline, every later step does too. So the first divergence
+of every (candidate, step) injection needs only the cached prefix vectors, and
+the final state needs only the cached suffix product M_S ... M_{s+1}.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .gf2 import as_gf2, matmul_gf2, to_bool, SparseGF2
+from .towers import propagate_reps, hash_vectors
+
+def suffix_products(seq, k):
+    """suffix[s-1] = M_S ... M_{s+1} in degree k (identity for s = S)."""
+    S = len(seq)
+    n = seq[-1][k].shape[0]
+    suf = [None] * S
+    suf[S-1] = SparseGF2.eye(n)
+    for s in range(S-1, 0, -1):
+        suf[s-1] = as_gf2(matmul_gf2(suf[s], seq[s][k]))
+    return suf
+
+def _sweep_chunk(task):
+    steps, prev3, prev2, suf3, suf2, base, final, cands, k3, k2 = task
+    rows = []
+    for s, p3, p2, F3, F2 in zip(steps, prev3, prev2, suf3, suf2):
+        W3 = np.hstack([to_bool(matmul_gf2(N[k3], p3)) for N in cands])
+        W2 = np.hstack([to_bool(matmul_gf2(N[k2], p2)) for N in cands])
+        E3 = to_bool(matmul_gf2(F3, W3)); E2 = to_bool(matmul_gf2(F2, W2))
+        for c in range(len(cands)):
+            h = hash_vectors(W3[:, c], W2[:, c])
+            hf = hash_vectors(E3[:, c], E2[:, c])
+            rows.append(dict(candidate=c, step=s, first_divergence=(s if h != base[s-1] else 0),
+                             step_hash=h, final_hash=hf, final_diverged=(hf != final)))
+    return rows
+
+def novelty_sweep(seq, candidates, reps, steps=None, processes=None, chunks=None, progress=None):
+    """Try every candidate novelty map at every injection step (default: all).
+    Returns a long DataFrame with one row per (candidate, step): first_divergence
+    (the step where the tower hash first differs from the baseline, 0 if never),
+    step_hash, final_hash and final_diverged. Steps are split into chunks and
+    evaluated on a process pool of `processes` workers (default: CPU count);
+    `progress(done, total)` is called after each chunk.
+    """
+    k3 = int(reps["k3"]); k2 = int(reps["k2"])
+    S = len(seq)
+    steps = list(range(1, S+1)) if steps is None else sorted(int(s) for s in steps)
+    if any(s < 1 or s > S for s in steps):
+        raise ValueError(f"novelty steps must lie in 1..{S}")
+    v3 = [to_bool(reps["c3_dom"]).reshape(-1, 1)]; v2 = [to_bool(reps["c2_dom"]).reshape(-1, 1)]
+    base = []
+    for _, a, b in propagate_reps(seq, reps):
+        v3.append(a); v2.append(b); base.append(hash_vectors(a, b))
+    suf3 = suffix_products(seq, k3); suf2 = suffix_products(seq, k2)
+    cands = [{k3: as_gf2(N[k3]), k2: as_gf2(N[k2])} for N in candidates]
+    processes = processes or os.cpu_count() or 1
+    chunks = chunks or max(1, min(len(steps), 4 * processes))
+    tasks = []
+    for part in np.array_split(np.array(steps, dtype=int), chunks):
+        if len(part) == 0:
+            continue
+        part = part.tolist()
+        tasks.append((part, [v3[s-1] for s in part], [v2[s-1] for s in part],
+                      [suf3[s-1] for s in part], [suf2[s-1] for s in part],
+                      base, base[-1], cands, k3, k2))
+    parts = []
+    if processes > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as ex:
+            futures = [ex.submit(_sweep_chunk, t) for t in tasks]
+            try:
+                for f in futures:
+                    parts.append(f.result())
+                    if progress is not None:
+                        progress(len(parts), len(tasks))
+            except BaseException:
+                for f in futures:
+                    f.cancel()
+                raise
+    else:
+        for t in tasks:
+            parts.append(_sweep_chunk(t))
+            if progress is not None:
+                progress(len(parts), len(tasks))
+    cols = ["candidate", "step", "first_divergence", "step_hash", "final_hash", "final_diverged"]
+    return pd.DataFrame([r for p in parts for r in p], columns=cols).sort_values(["candidate", "step"], ignore_index=True)
+
+def divergence_matrix(df, names=None):
+    """Pivot a sweep to candidates x injection steps of first_divergence (0 = no divergence)."""
+    M = df.pivot(index="candidate", columns="step", values="first_divergence")
+    if names is not None:
+        M.index = [names[i] for i in M.index]
+    M.index.name = "candidate"
+    return M
+
+def main(argv=None):
+    """CLI: sweep candidate novelty maps over every step of a schedule."""
+    import argparse, importlib.util, json
+    from .app_helpers import load_map_blocks
+    ap = argparse.ArgumentParser(description="Inject every candidate novelty map at every tower step.")
+    ap.add_argument("--reps", required=True, help="representatives JSON")
+    ap.add_argument("--moves", nargs="+", required=True, help="schedule move JSON files, in order")
+    ap.add_argument("--candidates", nargs="+", required=True, help="candidate novelty move JSON files")
+    ap.add_argument("-o", "--out", required=True, help="output file (.csv or .parquet)")
+    ap.add_argument("--long", action="store_true", help="write the long per-(candidate, step) table instead of the matrix")
+    ap.add_argument("--processes", type=int, default=None)
+    args = ap.parse_args(argv)
+    if args.out.endswith(".parquet") and importlib.util.find_spec("pyarrow") is None:
+        ap.error("parquet output needs pyarrow (pip install 'otc-4d-sanity-runner[parquet]'); use a .csv path")
+    def load(p):
+        with open(p) as f:
+            return json.load(f)
+    reps = load(args.reps)
+    seq = [load_map_blocks(load(p)) for p in args.moves]
+    cands = [load_map_blocks(load(p)) for p in args.candidates]
+    names = [os.path.splitext(os.path.basename(p))[0] for p in args.candidates]
+    df = novelty_sweep(seq, cands, reps, processes=args.processes)
+    if args.long:
+        df["candidate"] = [names[i] for i in df["candidate"]]
+        out, index = df, False
+    else:
+        out, index = divergence_matrix(df, names), True
+    if args.out.endswith(".parquet"):
+        out.columns = [str(c) for c in out.columns]
+        out.to_parquet(args.out, index=index)
+    else:
+        out.to_csv(args.out, index=index)
+    print(f"{len(names)} candidate(s) x {len(seq)} step(s) -> {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
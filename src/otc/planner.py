@@ -0,0 +1,112 @@
+
+"""Cost-ordered, lazy evaluation of the unit checks of one generator.
+
+Each check gets a rough cost in word operations from block shapes and nonzero
+counts, without touching block contents (boundaries still on disk, i.e. lazy
+binfmt blocks, are sized from the complex's dims and costed as dense):
+
+  support       nonzeros of every C_k (a mask test)
+  pairing       nonzeros of B (or the vector length)
+  transport_cX  C_k c_dom plus the image test against dY_{k+1}; elimination
+                of dY_{k+1} is charged unless its factor is already cached
+  boundary      the products dY_k C_k and C_{k-1} dX_k in every degree
+                (2 * rounds matrix-vector products each when Freivalds-screened)
+
+unit_checks runs them cheapest first and yields (name, ok) as each finishes;
+with fail_fast it stops at the first failure, so rejecting a bad generator
+usually costs a mask test or one solve instead of a full verification.
+"""
+import numpy as np
+from .gf2 import SparseGF2
+from .chain import check_boundary_compat, check_transport_homology, pairing_value, check_support
+from .instrument import span
+
+def _shape(M):
+    if isinstance(M, tuple):
+        return M
+    return M.shape if hasattr(M, "shape") else np.shape(M)
+
+def _nnz(M):
+    """Entries a product has to touch: nonzeros of sparse blocks, every entry otherwise."""
+    if isinstance(M, SparseGF2):
+        return M.nnz
+    return int(np.prod(_shape(M)))
+
+def _mul(A, B, signed=False):
+    (m, k), n = _shape(A), _shape(B)[1]
+    if signed:                       # float/modular BLAS, no bit packing
+        return m * k * n
+    if isinstance(A, SparseGF2):
+        return A.nnz * (-(-n // 64))
+    if isinstance(B, SparseGF2):
+        return B.nnz * (-(-m // 64))
+    return m * k * (-(-n // 64))
+
+def _boundary(CC, k):
+    """d_k when it is in memory, else its shape: a cost estimate never loads a lazy block."""
+    if isinstance(CC.boundaries, dict):
+        return CC.d(k)
+    return (CC.dims.get(k-1, 0), CC.dims.get(k, 0))
+
+def _solve(CY, k):
+    m, n = CY.dims.get(k-1, 0), CY.dims.get(k, 0)
+    if CY.has_factor(k) or CY.cache is not None:
+        return m * (-(-n // 64))
+    return m * n * (-(-min(m, n) // 64))
+
+def unit_costs(CX, CY, Cmap, reps, pairing=None, support=None, zlift=False, dX_signed=None, dY_signed=None,
+               C_signed=None, B_signed=None, rounds=None):
+    """{check: estimated cost} for the checks unit_test_generator runs."""
+    costs = {}
+    if support is not None:
+        costs["support"] = sum(_nnz(M) for M in Cmap.values())
+    B = B_signed if zlift else pairing
+    costs["pairing"] = 2 * (_nnz(B) if B is not None else len(np.ravel(reps["c3_dom"])))
+    for name, k in (("transport_c3", int(reps["k3"])), ("transport_c2", int(reps["k2"]))):
+        costs[name] = _nnz(Cmap[k]) + _solve(CY, k + 1)
+    blocks = C_signed if zlift else Cmap
+    total = 0
+    for k in (k for k in blocks if (k - 1) in blocks):
+        dY = dY_signed.get(k) if zlift else _boundary(CY, k); dX = dX_signed.get(k) if zlift else _boundary(CX, k)
+        if dY is None or dX is None:
+            continue
+        if rounds:
+            total += 2 * int(rounds) * (_nnz(dY) + _nnz(blocks[k]) + _nnz(blocks[k - 1]) + _nnz(dX))
+        else:
+            total += _mul(dY, blocks[k], zlift) + _mul(blocks[k - 1], dX, zlift)
+    costs["boundary"] = total
+    return costs
+
+def unit_plan(*args, **kwargs):
+    """Check names cheapest first (ties keep the unit_test_generator order)."""
+    order = ["boundary", "transport_c3", "transport_c2", "pairing", "support"]
+    costs = unit_costs(*args, **kwargs)
+    return sorted(costs, key=lambda name: (costs[name], order.index(name)))
+
+def unit_checks(CX, CY, Cmap, reps, pairing=None, support=None, zlift=False, dX_signed=None, dY_signed=None,
+                C_signed=None, B_signed=None, rounds=None, fail_fast=False, workers=None):
+    """Yield (check, ok) in cost order; with fail_fast stop after the first failure.
+    `workers` threads the boundary check's degrees (engine.run_degrees)."""
+    def boundary():
+        return check_boundary_compat(CX, CY, Cmap, zlift=zlift, dX_signed=dX_signed, dY_signed=dY_signed,
+                                     C_signed=C_signed, rounds=rounds, workers=workers, fail_fast=fail_fast)[0]
+    def transport(rep):
+        k = reps["k" + rep[1]]
+        with span("transport_" + rep, check="unit_test_generator", degree=k, blocks=dict(C_k=Cmap[k], dY_kp1=CY.d(k+1))):
+            return check_transport_homology(CX, CY, Cmap, reps[rep + "_dom"], reps[rep + "_cod"], k=k)[0]
+    def pairing_ok():
+        before = pairing_value(reps["c3_dom"], reps["c2_dom"], pairing, zlift=zlift, B_signed=B_signed)
+        after = pairing_value(reps["c3_cod"], reps["c2_cod"], pairing, zlift=zlift, B_signed=B_signed)
+        return before == after
+    run = dict(boundary=boundary, transport_c3=lambda: transport("c3"), transport_c2=lambda: transport("c2"),
+               pairing=pairing_ok, support=lambda: check_support(Cmap, support))
+    plan = unit_plan(CX, CY, Cmap, reps, pairing, support, zlift, dX_signed, dY_signed, C_signed, B_signed, rounds)
+    for name in plan:
+        if name.startswith("transport"):
+            ok = run[name]()
+        else:
+            with span(name, check="unit_test_generator"):
+                ok = run[name]()
+        yield name, ok
+        if fail_fast and not ok:
+            return
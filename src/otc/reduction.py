@@ -0,0 +1,201 @@
+
+"""Sparse column reduction of boundary matrices (lowest-one algorithm with clearing).
+
+Each column of d_k is a sorted array of row indices; low(j) is its largest
+row. Columns are reduced left to right by adding the earlier column that
+owns the same low, so the nonzero reduced columns of d_k have distinct lows
+and span im d_k. Degrees are reduced from the top down: every low i of the
+reduced d_{k+1} marks column i of d_k as a boundary, hence a cycle, so that
+column is cleared (set to zero) without being reduced ("twist").
+
+After reduction, with R_k = d_k V_k:
+  - rank d_k is the number of nonzero columns of R_k;
+  - the nonzero columns of R_{k+1} form a basis of B_k with distinct lows;
+  - the columns V_k[:, j] with R_k[:, j] = 0 that were not cleared are cycles
+    with low j, one per homology class, so together with B_k they form a
+    basis of Z_k with distinct lows, and betti_k is their count.
+Reducing a vector by lows against that basis decides membership in B_k and
+gives homology coordinates, with cost proportional to the nonzeros touched.
+
+Clearing is only sound when d_k d_{k+1} = 0; on other input it silently gives
+wrong ranks. Each pair is therefore Freivalds-screened once before clearing
+(SCREEN_ROUNDS random vectors, O(nnz) each) and a violation raises ValueError.
+The probes come from engine.degree_rngs(seed): fresh entropy unless a seed is given.
+"""
+import numpy as np
+from .gf2 import SparseGF2, to_bool
+from .freivalds import identity_holds
+from .engine import degree_rngs
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+SCREEN_ROUNDS = 32   # false-accept probability of the d∘d = 0 screen: 2**-32 per degree
+
+def _columns(d):
+    if not isinstance(d, SparseGF2):
+        d = SparseGF2.from_dense(to_bool(d))
+    return [d.indices[d.indptr[j]:d.indptr[j+1]] for j in range(d.shape[1])]
+
+def _xor(a, b):
+    # symmetric difference of two sorted index sets (np.setxor1d without its overhead)
+    c = np.concatenate((a, b)); c.sort()
+    dup = c[1:] == c[:-1]
+    keep = np.ones(len(c), dtype=bool); keep[1:] &= ~dup; keep[:-1] &= ~dup
+    return c[keep]
+
+def _matrix(cols, nrows):
+    indptr = np.zeros(len(cols) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in cols], out=indptr[1:])
+    return SparseGF2(indptr, np.concatenate(cols) if cols else _EMPTY, nrows)
+
+def reduce_columns(d, cleared=(), track=True):
+    """Lowest-one reduction of the columns of d. Returns dict(R, V, owner, cleared):
+    R and V are lists of sorted index arrays (V only when `track`), owner[i] is
+    the column whose reduced low is i (-1 if none). Columns in `cleared` are
+    known cycles and are zeroed without work."""
+    cols = _columns(d)
+    m = d.shape[0]
+    owner = np.full(m, -1, dtype=np.int64)
+    skip = np.zeros(len(cols), dtype=bool)
+    skip[np.asarray(list(cleared), dtype=np.int64)] = True
+    R = [None] * len(cols); V = [None] * len(cols) if track else None
+    for j, c in enumerate(cols):
+        if skip[j]:
+            R[j] = _EMPTY
+            if track:
+                V[j] = _EMPTY
+            continue
+        v = np.array([j], dtype=np.int64) if track else None
+        while len(c):
+            p = owner[c[-1]]
+            if p < 0:
+                break
+            c = _xor(c, R[p])
+            if track:
+                v = _xor(v, V[p])
+        R[j] = c
+        if track:
+            V[j] = v
+        if len(c):
+            owner[c[-1]] = j
+    return dict(R=R, V=V, owner=owner, cleared=skip)
+
+class SparseHomology:
+    """Homology of a chain complex by sparse column reduction, computed lazily
+    per degree (from the top degree down, so clearing always applies).
+    `boundaries` is {k: d_k} or a ChainComplex; `cycles=False` skips tracking
+    V, which leaves ranks, boundary bases and image membership available.
+    `seed` makes the d∘d = 0 screen reproducible."""
+    def __init__(self, boundaries, cycles=True, seed=None):
+        if hasattr(boundaries, "boundaries") and hasattr(boundaries, "dims"):
+            CX = boundaries
+            self._d = CX.d; self.dims = dict(CX.dims)
+            self.maxdeg = CX.maxdeg
+        else:
+            bd = {int(k): v for k, v in boundaries.items()}
+            self.dims = {}
+            for k, v in bd.items():
+                self.dims[k] = v.shape[1]; self.dims[k-1] = v.shape[0]
+            self._d = lambda k: bd.get(k, SparseGF2.zeros(self.dims.get(k-1, 0), self.dims.get(k, 0)))
+            self.maxdeg = max(bd) if bd else -1
+        self.cycles = cycles
+        self._red = {}; self._basis = {}
+        self._rngs = degree_rngs(sorted(self.dims), seed)
+
+    def reduced(self, k):
+        """Reduction data of d_k (see reduce_columns)."""
+        red = self._red.get(k)
+        if red is None:
+            cleared = ()
+            if k < self.maxdeg:
+                up = self.reduced(k+1)
+                if not identity_holds([(self._d(k), self._d(k+1))], [], SCREEN_ROUNDS, self._rngs[k]):
+                    raise ValueError(f"SparseHomology: d_{k} d_{k+1} != 0, not a chain complex (clearing would be wrong)")
+                cleared = np.flatnonzero(up["owner"] >= 0)
+            red = self._red[k] = reduce_columns(self._d(k), cleared, track=self.cycles)
+        return red
+
+    def rank(self, k):
+        """rank d_k."""
+        if self.dims.get(k, 0) == 0 or self.dims.get(k-1, 0) == 0:
+            return 0
+        return int(np.count_nonzero(self.reduced(k)["owner"] >= 0))
+
+    def betti(self, k):
+        return self.dims.get(k, 0) - self.rank(k) - self.rank(k+1)
+
+    def bettis(self):
+        return {k: self.betti(k) for k in sorted(self.dims)}
+
+    def boundary_basis(self, k):
+        """Basis of B_k = im d_{k+1} (n_k x rank d_{k+1}), columns with distinct lows."""
+        n = self.dims.get(k, 0)
+        if k >= self.maxdeg or n == 0:
+            return SparseGF2.zeros(n, 0)
+        red = self.reduced(k+1)
+        return _matrix([red["R"][j] for j in red["owner"][red["owner"] >= 0]], n)
+
+    def _essential(self, k):
+        if not self.cycles:
+            raise ValueError("SparseHomology: cycle bases need cycles=True")
+        if self.dims.get(k, 0) == 0:
+            return []
+        red = self.reduced(k)   # cleared columns are exactly the lows of R_{k+1}
+        return [red["V"][j] for j, c in enumerate(red["R"]) if not red["cleared"][j] and len(c) == 0]
+
+    def homology_basis(self, k):
+        """Cycles representing a basis of H_k (n_k x betti_k)."""
+        return _matrix(self._essential(k), self.dims.get(k, 0))
+
+    def cycle_basis(self, k):
+        """Basis of Z_k = ker d_k: the boundary basis followed by the homology basis."""
+        B = self.boundary_basis(k); E = self._essential(k)
+        cols = [B.indices[B.indptr[j]:B.indptr[j+1]] for j in range(B.shape[1])] + E
+        return _matrix(cols, self.dims.get(k, 0))
+
+    def _table(self, k):
+        """(owner by low, basis columns, number of boundary columns) for the Z_k basis."""
+        T = self._basis.get(k)
+        if T is None:
+            n = self.dims.get(k, 0)
+            B = self.boundary_basis(k)
+            cols = [B.indices[B.indptr[j]:B.indptr[j+1]] for j in range(B.shape[1])]
+            nb = len(cols)
+            if self.cycles:
+                cols += self._essential(k)
+            owner = np.full(n, -1, dtype=np.int64)
+            for i, c in enumerate(cols):
+                owner[c[-1]] = i
+            T = self._basis[k] = (owner, cols, nb)
+        return T
+
+    def reduce_vector(self, k, v, cycles=False):
+        """(residual, used): v (length n_k) reduced by lows against the B_k basis
+        (or the Z_k basis with `cycles=True`); `used` lists the basis columns added.
+        The residual is zero iff v lies in the span."""
+        owner, cols, nb = self._table(k)
+        limit = len(cols) if cycles else nb
+        r = np.flatnonzero(to_bool(v).ravel()).astype(np.int64)
+        used = []
+        while len(r):
+            p = owner[r[-1]]
+            if p < 0 or p >= limit:
+                break
+            r = _xor(r, cols[p]); used.append(int(p))
+        out = np.zeros(self.dims.get(k, 0), dtype=bool); out[r] = True
+        return out, used
+
+    def in_image(self, k, v):
+        """True iff v ∈ im d_{k+1}."""
+        return not self.reduce_vector(k, v)[0].any()
+
+    def homology_coords(self, k, z):
+        """H_k coordinates (length betti_k) of the cycle z; ValueError if z is not a cycle."""
+        res, used = self.reduce_vector(k, z, cycles=True)
+        if res.any():
+            raise ValueError(f"homology_coords: vector is not a cycle in degree {k}")
+        nb = self._table(k)[2]
+        out = np.zeros(len(self._table(k)[1]) - nb, dtype=bool)
+        for p in used:
+            if p >= nb:
+                out[p - nb] ^= True
+        return out
@@ -0,0 +1,318 @@
+
+"""Local HTTP job service for certificate checks (stdlib only).
+
+    POST   /jobs                  {"kind", "inputs", "params"} -> 202 {"id", "state", "deduplicated"}
+    GET    /jobs                  status of every retained job
+    GET    /jobs/<id>             status
+    GET    /jobs/<id>/result      200 result, 202 while queued/running (?wait=seconds blocks)
+    GET    /jobs/<id>/events      NDJSON stream of status changes until the job finishes
+    DELETE /jobs/<id>             cancel a queued job
+    GET    /health
+
+`kind` is one of unit, overlap, triangle, tower, build_triangle; `inputs` holds
+the JSON documents inline (same schemas as the app uploads) and `params` the
+options (rounds, fail_fast, mode = vectors|matrix|signed, novelty_step). The job id is the content hash of the
+canonical submission, so identical submissions share one job and one result.
+Jobs run on a bounded process pool; at most `max_queue` may wait at once.
+"""
+import hashlib, json, math, threading, time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+from .app_helpers import (load_complex, load_map_blocks, load_reps, load_support, load_triangle, load_signed_blocks, load_signed_reps,
+                          unit_test_generator, overlap_test, triangle_test, run_tower)
+from .triangle_builder import build_triangle_template
+from .towers import HASH_VERSION
+
+KINDS = {
+    "unit": ("X", "Y", "map", "reps"),
+    "overlap": ("complex", "m1", "m2", "H"),
+    "triangle": ("complex", "J"),
+    "tower": ("reps", "moves"),
+    "build_triangle": ("complex", "m1", "m2"),
+}
+
+def _plain(x):
+    """JSON-friendly copy: str keys, numpy scalars/arrays as Python values, tuples as lists."""
+    if isinstance(x, dict):
+        return {str(k): _plain(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [_plain(v) for v in x]
+    if isinstance(x, np.ndarray):
+        return x.tolist()
+    if isinstance(x, np.generic):
+        return x.item()
+    return x
+
+def job_id(kind, inputs, params=None):
+    """Content hash of a canonical submission."""
+    doc = json.dumps(dict(kind=kind, inputs=inputs, params=params or {}), sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(doc.encode(), digest_size=16).hexdigest()
+
+def validate(kind, inputs, params=None):
+    if kind not in KINDS:
+        raise ValueError(f"unknown job kind {kind!r} (expected one of {sorted(KINDS)})")
+    missing = [k for k in KINDS[kind] if inputs.get(k) is None]
+    if missing:
+        raise ValueError(f"{kind}: missing inputs {missing}")
+    if kind == "tower" and (params or {}).get("novelty_step") and inputs.get("novelty") is None:
+        raise ValueError("tower: novelty_step needs a 'novelty' input")
+
+def execute(kind, inputs, params=None):
+    """Run one job in the current process; returns a JSON-friendly result."""
+    params = params or {}
+    shapes = inputs.get("shapes"); rounds = params.get("rounds")
+    if kind == "unit":
+        CX = load_complex(inputs["X"], shapes=shapes); CY = load_complex(inputs["Y"], shapes=shapes)
+        support = load_support(inputs["support"], shapes) if inputs.get("support") else None
+        res = unit_test_generator(CX, CY, load_map_blocks(inputs["map"], shapes), load_reps(inputs["reps"], shapes),
+                                  inputs.get("pairing"), support, rounds=rounds,
+                                  fail_fast=bool(params.get("fail_fast")), workers=1)
+        return dict(ok=all(bool(v) for v in res.values()), checks=_plain(res))
+    if kind == "overlap":
+        CO = load_complex(inputs["complex"], shapes=shapes)
+        m1, m2, H = (load_map_blocks(inputs[k], shapes) for k in ("m1", "m2", "H"))
+        ok, res = overlap_test(CO, m1, m2, H, rounds=rounds, workers=1)
+        return dict(ok=bool(ok), degrees=_plain(res))
+    if kind == "triangle":
+        CO = load_complex(inputs["complex"], shapes=shapes)
+        ok, res = triangle_test(CO, load_triangle(inputs["J"], shapes), rounds=rounds, workers=1)
+        return dict(ok=bool(ok), degrees=_plain(res))
+    if kind == "tower":
+        mode = params.get("mode", "vectors")
+        reps = load_signed_reps(inputs["reps"]) if mode == "signed" else load_reps(inputs["reps"])
+        load = load_signed_blocks if mode == "signed" else (lambda m: load_map_blocks(m, shapes))
+        seq = [load(m) for m in inputs["moves"]]
+        out = dict(base=run_tower(None, seq, reps, mode=mode), novelty=None, hash_version=HASH_VERSION)
+        step = int(params.get("novelty_step") or 0)
+        if step:
+            nov = load(inputs["novelty"])
+            out["novelty"] = run_tower(None, [(nov if i+1 == step else C) for i, C in enumerate(seq)], reps, mode=mode)
+            out["divergence"] = next((a["step"] for a, b in zip(out["base"], out["novelty"]) if a["hash"] != b["hash"]), None)
+        return out
+    if kind == "build_triangle":
+        CX = load_complex(inputs["complex"], shapes=shapes)
+        return build_triangle_template(CX, load_map_blocks(inputs["m1"], shapes), load_map_blocks(inputs["m2"], shapes), workers=1)
+    raise ValueError(f"unknown job kind {kind!r}")
+
+class QueueFull(Exception):
+    pass
+
+class JobService:
+    """Deduplicating job table in front of a process pool. Finished jobs are kept
+    (least recently used first out) up to `max_results`."""
+    def __init__(self, processes=None, max_queue=256, max_results=1024):
+        self.pool = ProcessPoolExecutor(max_workers=processes)
+        self.max_queue = int(max_queue); self.max_results = int(max_results)
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def submit(self, kind, inputs, params=None):
+        """(job id, deduplicated). Failed or cancelled jobs are retried on resubmission."""
+        validate(kind, inputs, params)
+        jid = job_id(kind, inputs, params)
+        with self._lock:
+            job = self.jobs.get(jid)
+            if job is not None and job["state"] not in ("failed", "cancelled"):
+                job["hits"] += 1; self.jobs.move_to_end(jid)
+                return jid, True
+            if sum(j["state"] == "queued" for j in self.jobs.values()) >= self.max_queue:
+                raise QueueFull(f"{self.max_queue} jobs already queued")
+            job = self.jobs[jid] = dict(id=jid, kind=kind, state="queued", hits=1, submitted=time.time(),
+                                        finished=None, result=None, error=None, future=None)
+            job["future"] = f = self.pool.submit(execute, kind, inputs, params)
+        f.add_done_callback(lambda f, jid=jid: self._finish(jid, f))
+        return jid, False
+
+    def _finish(self, jid, f):
+        with self._changed:
+            job = self.jobs.get(jid)
+            if job is None or job["future"] is not f:
+                return
+            if f.cancelled():
+                job["state"] = "cancelled"
+            elif f.exception() is not None:
+                e = f.exception(); job["state"] = "failed"; job["error"] = f"{type(e).__name__}: {e}"
+            else:
+                job["state"] = "done"; job["result"] = f.result()
+            job["finished"] = time.time()
+            self._evict()
+            self._changed.notify_all()
+
+    def _evict(self):
+        finished = [jid for jid, j in self.jobs.items() if j["finished"] is not None]
+        for jid in finished[: max(0, len(finished) - self.max_results)]:
+            del self.jobs[jid]
+
+    def _state(self, job):
+        if job["state"] == "queued" and job["future"].running():
+            return "running"
+        return job["state"]
+
+    def _status(self, jid):
+        job = self.jobs.get(jid)
+        if job is None:
+            return None
+        return dict(id=jid, kind=job["kind"], state=self._state(job), hits=job["hits"],
+                    submitted=job["submitted"], finished=job["finished"], error=job["error"])
+
+    def status(self, jid):
+        with self._lock:
+            return self._status(jid)
+
+    def list(self):
+        return [self.status(jid) for jid in list(self.jobs)]
+
+    def result(self, jid, wait=0.0):
+        """(status, result); blocks up to `wait` seconds for the job to finish.
+        (None, None) when the job is unknown or was evicted while waiting."""
+        deadline = time.time() + max(0.0, wait)
+        with self._changed:
+            while jid in self.jobs and self.jobs[jid]["finished"] is None and time.time() < deadline:
+                self._changed.wait(deadline - time.time())
+            job = self.jobs.get(jid)
+            if job is None:
+                return None, None
+            self.jobs.move_to_end(jid)
+            return self._status(jid), job["result"]
+
+    def cancel(self, jid):
+        """True when the job was still queued and is now cancelled."""
+        with self._lock:
+            job = self.jobs.get(jid)
+            f = job and job["future"]
+        return bool(f and f.cancel())
+
+    def events(self, jid, poll=0.25):
+        """Status dicts on every change, ending with the terminal one."""
+        last = None
+        while True:
+            st = self.status(jid)
+            if st is None:
+                return
+            if st != last:
+                yield st; last = st
+            if st["finished"] is not None:
+                return
+            with self._changed:
+                self._changed.wait(poll)
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+class Handler(BaseHTTPRequestHandler):
+    service = None
+    max_body = 256 << 20
+
+    def _send(self, code, obj):
+        body = json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        u = urlparse(self.path)
+        parts = [p for p in u.path.split("/") if p]
+        return parts, parse_qs(u.query)
+
+    def do_POST(self):
+        parts, _ = self._route()
+        if parts != ["jobs"]:
+            return self._send(404, dict(error="not found"))
+        try:
+            n = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            n = -1
+        if n < 0:
+            return self._send(400, dict(error="invalid Content-Length"))
+        if n > self.max_body:
+            return self._send(413, dict(error="submission too large"))
+        try:
+            doc = json.loads(self.rfile.read(n))
+            jid, dedup = self.service.submit(doc.get("kind"), doc.get("inputs") or {}, doc.get("params"))
+        except QueueFull as e:
+            return self._send(503, dict(error=str(e)))
+        except (ValueError, AttributeError) as e:
+            return self._send(400, dict(error=str(e)))
+        self._send(202, dict(self.service.status(jid), deduplicated=dedup))
+
+    def do_GET(self):
+        parts, q = self._route()
+        if parts == ["health"]:
+            return self._send(200, dict(ok=True, jobs=len(self.service.jobs)))
+        if parts == ["jobs"]:
+            return self._send(200, self.service.list())
+        if len(parts) < 2 or parts[0] != "jobs" or self.service.status(parts[1]) is None:
+            return self._send(404, dict(error="no such job"))
+        jid = parts[1]
+        if len(parts) == 2:
+            return self._send(200, self.service.status(jid))
+        if parts[2] == "result":
+            try:
+                wait = float(q.get("wait", ["0"])[0])
+            except ValueError:
+                wait = math.nan
+            if not math.isfinite(wait):
+                return self._send(400, dict(error="wait must be a number of seconds"))
+            st, res = self.service.result(jid, wait)
+            if st is None:
+                return self._send(404, dict(error="no such job"))
+            if st["state"] == "done":
+                return self._send(200, dict(st, result=res))
+            return self._send(500 if st["state"] == "failed" else 202, st)
+        if parts[2] == "events":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for st in self.service.events(jid):
+                self.wfile.write((json.dumps(st) + "\n").encode()); self.wfile.flush()
+            return
+        self._send(404, dict(error="not found"))
+
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != "jobs" or self.service.status(parts[1]) is None:
+            return self._send(404, dict(error="no such job"))
+        ok = self.service.cancel(parts[1])
+        self._send(200 if ok else 409, dict(self.service.status(parts[1]), cancelled=ok))
+
+    def log_message(self, fmt, *args):
+        if not self.server.quiet:
+            super().log_message(fmt, *args)
+
+def make_server(host="127.0.0.1", port=8765, processes=None, max_queue=256, max_results=1024, quiet=False):
+    """A ThreadingHTTPServer bound to a fresh JobService (server.service)."""
+    service = JobService(processes, max_queue, max_results)
+    handler = type("OTCHandler", (Handler,), dict(service=service))
+    srv = ThreadingHTTPServer((host, port), handler)
+    srv.service = service; srv.quiet = quiet; srv.daemon_threads = True
+    return srv
+
+def main(argv=None):
+    """CLI: serve certificate checks over HTTP."""
+    import argparse
+    ap = argparse.ArgumentParser(description="Local HTTP job server for OTC certificate checks.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--max-queue", type=int, default=256, help="queued jobs before submissions get 503")
+    ap.add_argument("--max-results", type=int, default=1024, help="finished jobs kept for retrieval")
+    ap.add_argument("-q", "--quiet", action="store_true")
+    args = ap.parse_args(argv)
+    srv = make_server(args.host, args.port, args.processes, args.max_queue, args.max_results, args.quiet)
+    print(f"serving on http://{args.host}:{srv.server_port}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close(); srv.service.close()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
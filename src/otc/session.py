@@ -0,0 +1,266 @@
+
+"""Incremental re-verification of a certificate under block and entry edits.
+
+A VerificationSession loads the complexes and blocks once (as PackedGF2
+copies) and keeps, per checked degree, the residual of its identity
+
+  boundary    R_k = dY_k C_k + C_{k-1} dX_k
+  commutator  R_k = d_{k+1} H_k + H_{k-1} d_k + C2_k C1_k + C1_k C2_k
+  triangle    R_k = d_{k+1} J_k + J_{k-1} d_k + A_k + B_k
+
+which holds iff R_k == 0. Every editable block knows the residual terms it
+appears in. Flipping entries E of a block changes a term X Y by E Y (X side,
+one packed row XOR per entry) or X E (Y side, one column XOR per entry), so a
+rank-k edit costs O(k n) instead of the products of a full recheck. A block
+replaced wholesale is diffed against the stored one and goes through the same
+updates when the difference has at most RANK_UPDATE_MAX entries; otherwise
+the dependent residuals are recomputed from scratch on the next verify().
+Transport checks are redone only when their C_k changed, support checks keep
+a running count of entries outside the allowed rows/columns.
+
+Editable parts: "C" (the unit map Cmap), "m1", "m2", "H" (overlap), "J",
+"A", "B" (triangle template). Only GF(2) checks are tracked (no zlift).
+"""
+import numpy as np
+from .gf2 import PackedGF2, SparseGF2, gf2_column, matmul_gf2, to_bool
+from .chain import check_transport_homology, pairing_value
+from .checks import part_block
+from .instrument import span
+
+RANK_UPDATE_MAX = 512   # set_block diffs with more entries trigger a full recompute instead
+
+def _packed(M):
+    return PackedGF2(np.array(PackedGF2.coerce(M).words), M.shape[1])
+
+def _flip(P, rows, cols):
+    np.bitwise_xor.at(P.words, (rows, cols // 64), np.uint64(1) << (cols % 64).astype(np.uint64))
+
+def _entries(rows, cols):
+    rows = np.atleast_1d(np.asarray(rows, dtype=np.int64)); cols = np.atleast_1d(np.asarray(cols, dtype=np.int64))
+    if rows.shape != cols.shape:
+        raise ValueError("session: rows and cols must have the same length")
+    # an entry flipped twice is unchanged
+    S = SparseGF2.from_coo(rows, cols, (int(rows.max(initial=-1)) + 1, int(cols.max(initial=-1)) + 1))
+    return S.coo()
+
+class VerificationSession:
+    """Holds the inputs of unit_test_generator (CX, CY, Cmap, reps, pairing, support),
+    commutator_identity (C_overlap, C_m1, C_m2, H) and/or triangle_coherence_identity
+    (C_overlap or C_triangle, J); groups whose inputs are missing are not checked."""
+    def __init__(self, CX=None, CY=None, Cmap=None, reps=None, pairing=None, support=None,
+                 C_overlap=None, C_m1=None, C_m2=None, H=None, J=None, C_triangle=None):
+        self.blocks = {}; self.fixed = {}; self.terms = {}; self.deps = {}
+        self.residual = {}; self.eq = {}; self.dirty = set()
+        self.stats = dict(full=0, rank_updates=0)
+        self.unit = CX is not None and CY is not None and Cmap is not None and reps is not None
+        self.overlap = C_overlap is not None and H is not None and (C_m1 is not None or C_m2 is not None)
+        C_triangle = C_overlap if C_triangle is None else C_triangle
+        self.triangle = J is not None and C_triangle is not None
+        if self.unit:
+            self._init_unit(CX, CY, Cmap, reps, pairing, support)
+        if self.overlap:
+            self._init_overlap(C_overlap, C_m1 or {}, C_m2 or {}, H)
+        if self.triangle:
+            self._init_triangle(C_triangle, J)
+
+    # -- setup -------------------------------------------------------------------------------
+    def _d(self, name, CC, k):
+        key = (name, k)
+        if key not in self.fixed:
+            self.fixed[key] = _packed(CC.d(k))
+        return key
+
+    def _block(self, part, k, M):
+        self.blocks[(part, k)] = _packed(M)
+        return (part, k)
+
+    def _check(self, key, terms):
+        self.terms[key] = terms
+        self.dirty.add(key)
+        for t, term in enumerate(terms):
+            for pos, ref in enumerate(term):
+                if ref in self.blocks:
+                    self.deps.setdefault(ref, []).append((key, t, pos))
+
+    def _init_unit(self, CX, CY, Cmap, reps, pairing, support):
+        self.CX = CX; self.CY = CY; self.reps = reps
+        for k in sorted(Cmap):
+            self._block("C", int(k), Cmap[k])
+        for k in sorted(int(k) for k in Cmap):
+            if ("C", k - 1) in self.blocks:
+                self._check(("boundary", k), [(self._d("dY", CY, k), ("C", k)), (("C", k - 1), self._d("dX", CX, k))])
+        for name, k in (("transport_c3", int(reps["k3"])), ("transport_c2", int(reps["k2"]))):
+            self.terms[(name, k)] = []; self.dirty.add((name, k))
+            self.deps.setdefault(("C", k), []).append(((name, k), None, None))
+        self.pairing = pairing_value(reps["c3_dom"], reps["c2_dom"], pairing) == pairing_value(reps["c3_cod"], reps["c2_cod"], pairing)
+        self.support = {}
+        if support is not None:
+            for (part, k), P in list(self.blocks.items()):
+                if part != "C":
+                    continue
+                spec = [support.get(str(k), {}), support.get(k, {})]
+                m, n = P.shape
+                row_ok = np.ones(m, dtype=bool); col_ok = np.ones(n, dtype=bool)
+                for ok, name in ((row_ok, "rows"), (col_ok, "cols")):
+                    idx = np.asarray([i for s in spec for i in s.get(name, [])], dtype=np.int64)
+                    if idx.size:
+                        ok[:] = False; ok[idx[(idx >= 0) & (idx < ok.size)]] = True
+                self.support[k] = [row_ok, col_ok, self._violations(P, row_ok, col_ok)]
+
+    def _init_overlap(self, CO, C_m1, C_m2, H):
+        self.CO = CO
+        degs = sorted({int(k) for k in list(C_m1) + list(C_m2)})
+        for k in degs:
+            n_k = CO.dims.get(k, 0)
+            for part, C in (("m1", C_m1), ("m2", C_m2)):
+                self._block(part, k, C.get(k, SparseGF2.zeros(n_k, n_k)))
+            for j in (k - 1, k):
+                if ("H", j) not in self.blocks:
+                    self._block("H", j, part_block(H, j, CO.dims.get(j + 1, 0), CO.dims.get(j, 0)))
+        for k in degs:
+            self._check(("commutator", k), [(self._d("dO", CO, k + 1), ("H", k)), (("H", k - 1), self._d("dO", CO, k)),
+                                            (("m2", k), ("m1", k)), (("m1", k), ("m2", k))])
+
+    def _init_triangle(self, CT, J):
+        self.CT = CT
+        degs = [int(k) for k in J.keys()]
+        get = lambda k: J.get(str(k), J.get(k, {})) if isinstance(J, dict) else {}
+        for k in degs:
+            n_k = CT.dims.get(k, 0)
+            self._block("A", k, part_block(get(k), "A", n_k, n_k)); self._block("B", k, part_block(get(k), "B", n_k, n_k))
+            for j in (k - 1, k):
+                if ("J", j) not in self.blocks:
+                    self._block("J", j, part_block(get(j), "J", CT.dims.get(j + 1, 0), CT.dims.get(j, 0)))
+        for k in degs:
+            self._check(("triangle", k), [(self._d("dT", CT, k + 1), ("J", k)), (("J", k - 1), self._d("dT", CT, k)),
+                                          (("A", k),), (("B", k),)])
+
+    def _get(self, ref):
+        return self.blocks[ref] if ref in self.blocks else self.fixed[ref]
+
+    @staticmethod
+    def _violations(P, row_ok, col_ok):
+        D = P.to_dense()
+        return int(np.count_nonzero(D[~row_ok]) + np.count_nonzero(D[row_ok][:, ~col_ok]))
+
+    # -- residuals ---------------------------------------------------------------------------
+    def _recompute(self, key):
+        check, k = key
+        if check.startswith("transport"):
+            rep = "c3" if check == "transport_c3" else "c2"
+            Cmap = {k: self.blocks[("C", k)]}
+            self.eq[key] = bool(check_transport_homology(self.CX, self.CY, Cmap, self.reps[rep + "_dom"], self.reps[rep + "_cod"], k)[0])
+            return
+        self.stats["full"] += 1
+        with span(f"session_{check}", degree=k):
+            R = None
+            for term in self.terms[key]:
+                P = self._get(term[0])
+                for ref in term[1:]:
+                    P = matmul_gf2(P, self._get(ref))
+                P = PackedGF2.coerce(P)
+                if R is None:
+                    R = PackedGF2(P.words.copy(), P.ncols)
+                elif R.shape != P.shape:
+                    R = None; break
+                else:
+                    R.words ^= P.words
+        self.residual[key] = R
+        self.eq[key] = R is not None and not R.words.any()
+
+    def _update(self, ref, rows, cols):
+        """Apply the entry flips (rows, cols) of block `ref` to every residual it appears in."""
+        for key, t, pos in self.deps.get(ref, []):
+            if key in self.dirty or t is None:
+                self.dirty.add(key); continue
+            R = self.residual.get(key)
+            if R is None:
+                continue
+            term = self.terms[key][t]
+            if len(term) == 1:
+                _flip(R, rows, cols)
+            elif pos == 0:          # (X + E) Y = X Y + E Y: row i of R gains row j of Y
+                np.bitwise_xor.at(R.words, rows, self._get(term[1]).words[cols])
+            else:                   # X (Y + E) = X Y + X E: column j of R gains column i of X
+                X = self._get(term[0])
+                for i, j in zip(rows, cols):
+                    R.words[:, j // 64] ^= gf2_column(X, int(i)).astype(np.uint64) << np.uint64(j % 64)
+            self.stats["rank_updates"] += 1
+            self.eq[key] = not R.words.any()
+        if ref[0] == "C" and ref[1] in getattr(self, "support", {}):
+            row_ok, col_ok, _ = s = self.support[ref[1]]
+            P = self.blocks[ref]
+            now = (P.words[rows, cols // 64] >> (cols % 64).astype(np.uint64)) & np.uint64(1)
+            out = ~(row_ok[rows] & col_ok[cols])
+            s[2] += int(np.sum(np.where(now[out] == 1, 1, -1)))
+
+    # -- edits -------------------------------------------------------------------------------
+    def flip(self, part, k, rows, cols):
+        """Toggle entries (rows[i], cols[i]) of block `part` in degree k."""
+        ref = (part, int(k))
+        if ref not in self.blocks:
+            raise KeyError(f"session: no editable block {part!r} in degree {k}")
+        rows, cols = _entries(rows, cols)
+        P = self.blocks[ref]
+        if rows.size and (rows.max() >= P.shape[0] or cols.max() >= P.shape[1]):
+            raise ValueError(f"session: entry outside {part}_{k} of shape {P.shape}")
+        _flip(P, rows, cols)
+        self._update(ref, rows, cols)
+
+    def set_entries(self, part, k, rows, cols, values):
+        """Set entries of block `part` in degree k to `values` (mod 2)."""
+        P = self.blocks.get((part, int(k)))
+        if P is None:
+            raise KeyError(f"session: no editable block {part!r} in degree {k}")
+        rows = np.asarray(rows, dtype=np.int64); cols = np.asarray(cols, dtype=np.int64)
+        cur = (P.words[rows, cols // 64] >> (cols % 64).astype(np.uint64)) & np.uint64(1)
+        change = cur.astype(bool) != (np.asarray(values, dtype=np.int64) % 2).astype(bool)
+        self.flip(part, k, rows[change], cols[change])
+
+    def set_block(self, part, k, M):
+        """Replace block `part` in degree k; small differences become entry flips."""
+        ref = (part, int(k))
+        old = self.blocks.get(ref)
+        if old is None:
+            raise KeyError(f"session: no editable block {part!r} in degree {k}")
+        new = _packed(M if hasattr(M, "shape") else to_bool(M))
+        if new.shape == old.shape:
+            diff = PackedGF2(old.words ^ new.words, new.ncols)
+            if diff.nnz <= RANK_UPDATE_MAX:
+                rows, cols = np.nonzero(diff.to_dense())
+                self.flip(part, k, rows, cols)
+                return
+        self.blocks[ref] = new
+        for key, _, _ in self.deps.get(ref, []):
+            self.dirty.add(key)
+        if part == "C" and ref[1] in getattr(self, "support", {}):
+            s = self.support[ref[1]]
+            if new.shape != old.shape:
+                raise ValueError(f"session: C_{k} changed shape {old.shape} -> {new.shape}; support masks no longer apply")
+            s[2] = self._violations(new, s[0], s[1])
+
+    # -- results -----------------------------------------------------------------------------
+    def _refresh(self):
+        for key in sorted(self.dirty):
+            self._recompute(key)
+        self.dirty.clear()
+
+    def _group(self, check, CC):
+        res = {k: dict(eq=self.eq[(c, k)], n_k=int(CC.dims.get(k, 0))) for c, k in self.terms if c == check}
+        return all(r["eq"] for r in res.values()), res
+
+    def verify(self):
+        """Current results, recomputing only what edits invalidated:
+        unit -> unit_test_generator's dict, overlap/triangle -> (ok, {k: dict(eq, n_k)})."""
+        self._refresh()
+        out = {}
+        if self.unit:
+            k3 = int(self.reps["k3"]); k2 = int(self.reps["k2"])
+            out["unit"] = dict(boundary=all(self.eq[key] for key in self.terms if key[0] == "boundary"),
+                               transport_c3=self.eq[("transport_c3", k3)], transport_c2=self.eq[("transport_c2", k2)],
+                               pairing=self.pairing, support=all(s[2] == 0 for s in self.support.values()))
+        if self.overlap:
+            out["overlap"] = self._group("commutator", self.CO)
+        if self.triangle:
+            out["triangle"] = self._group("triangle", self.CT)
+        return out
@@ -0,0 +1,181 @@
+
+"""Synthetic workloads of configurable size: valid complexes, maps, homotopies and reps.
+
+The complex is the face closure of random top simplices on a vertex set, with
+the simplicial boundary mod 2 (so d∘d = 0 and every d_k has k+1 ones per
+column). Chain maps are C_i = I + d K_i + K_i d for random sparse K_i of
+degree +1 with `nnz_per_col` expected ones per column, so sizes scale
+linearly. With N_i = d K_i + K_i d one has C2 C1 ⊕ C1 C2 = d H + H d for
+H = K_2 N_1 ⊕ K_1 N_2, which gives a homotopy for the overlap identity and a
+triangle template. Representatives are genuine cycles (hollow simplex
+boundaries plus boundaries) and their codomain reps are homologous images.
+"""
+import json, os
+from itertools import combinations
+import numpy as np
+from .gf2 import SparseGF2, as_gf2, matmul_gf2, add_gf2, to_bool
+
+def _encode(S, base):
+    key = np.zeros(S.shape[0], dtype=np.int64)
+    for j in range(S.shape[1]):
+        key = key * base + S[:, j]
+    return key
+
+def simplicial_complex(n_vertices, n_top, dim, seed=None):
+    """Boundaries {k: d_k (SparseGF2)} and simplex lists of the closure of
+    `n_top` random `dim`-simplices on `n_vertices` vertices."""
+    if dim + 1 > n_vertices:
+        raise ValueError("simplicial_complex: need at least dim+1 vertices")
+    rng = np.random.default_rng(seed)
+    top = np.sort(np.array([rng.choice(n_vertices, dim + 1, replace=False) for _ in range(int(n_top))]), axis=1)
+    simplices = {}
+    for k in range(dim + 1):
+        faces = np.vstack([top[:, list(c)] for c in combinations(range(dim + 1), k + 1)])
+        simplices[k] = np.unique(faces, axis=0)
+    keys = {k: _encode(S, n_vertices) for k, S in simplices.items()}
+    boundaries = {}
+    for k in range(1, dim + 1):
+        S = simplices[k]; m = len(S)
+        rows = np.concatenate([np.searchsorted(keys[k-1], _encode(np.delete(S, j, axis=1), n_vertices))
+                               for j in range(k + 1)])
+        cols = np.tile(np.arange(m), k + 1)
+        boundaries[k] = SparseGF2.from_coo(rows, cols, (len(simplices[k-1]), m))
+    return boundaries, simplices
+
+def dims_of(boundaries):
+    dims = {}
+    for k, d in boundaries.items():
+        dims[k] = d.shape[1]; dims[k-1] = d.shape[0]
+    return dims
+
+def _d(boundaries, dims, k):
+    return boundaries.get(k, SparseGF2.zeros(dims.get(k-1, 0), dims.get(k, 0)))
+
+def random_sparse(m, n, nnz_per_col, rng):
+    nnz = rng.poisson(nnz_per_col * n) if m and n else 0
+    return SparseGF2.from_coo(rng.integers(0, m, nnz), rng.integers(0, n, nnz), (m, n))
+
+def null_homotopic(boundaries, nnz_per_col=1.0, seed=None):
+    """(K, N): random degree +1 maps K_k: C_k -> C_{k+1} and N_k = d_{k+1} K_k ⊕ K_{k-1} d_k."""
+    rng = np.random.default_rng(seed)
+    dims = dims_of(boundaries)
+    K = {k: random_sparse(dims.get(k+1, 0), dims[k], nnz_per_col, rng) for k in sorted(dims)}
+    N = {}
+    for k in sorted(dims):
+        Kkm1 = K.get(k-1, SparseGF2.zeros(dims[k], dims.get(k-1, 0)))
+        N[k] = as_gf2(add_gf2(matmul_gf2(_d(boundaries, dims, k+1), K[k]), matmul_gf2(Kkm1, _d(boundaries, dims, k))))
+    return K, N
+
+def chain_map(boundaries, nnz_per_col=1.0, seed=None):
+    """Chain map C = I + dK + Kd (homotopic to the identity) plus its K and N."""
+    K, N = null_homotopic(boundaries, nnz_per_col, seed)
+    C = {k: as_gf2(add_gf2(SparseGF2.eye(N[k].shape[0]), N[k])) for k in N}
+    return C, K, N
+
+def overlap_homotopy(K1, N1, K2, N2):
+    """H_k = K2_k N1_k ⊕ K1_k N2_k, satisfying d H ⊕ H d = C2 C1 ⊕ C1 C2."""
+    return {k: as_gf2(add_gf2(matmul_gf2(K2[k], N1[k]), matmul_gf2(K1[k], N2[k]))) for k in N1}
+
+def triangle_template(C1, C2, H):
+    return {str(k): {"A": as_gf2(matmul_gf2(C2[k], C1[k])), "B": as_gf2(matmul_gf2(C1[k], C2[k])), "J": H[k]}
+            for k in C1}
+
+def random_cycle(boundaries, simplices, k, n_hollow=4, seed=None):
+    """A k-cycle: XOR of boundaries of hollow (k+1)-simplices (all faces present)
+    plus the boundary of a random (k+1)-chain."""
+    rng = np.random.default_rng(seed)
+    dims = dims_of(boundaries); n_k = dims.get(k, 0)
+    z = np.zeros(n_k, dtype=bool)
+    if n_k == 0:
+        return z
+    S = simplices[k]; n_vertices = int(max(S.max() for S in simplices.values())) + 1
+    keys = _encode(S, n_vertices)
+    found = 0
+    for _ in range(64 * n_hollow):
+        if found >= n_hollow or k + 2 > n_vertices:
+            break
+        s = S[rng.integers(len(S))]
+        v = rng.integers(n_vertices)
+        if v in s:
+            continue
+        sigma = np.sort(np.append(s, v))
+        faces = np.array([np.delete(sigma, j) for j in range(k + 2)])
+        idx = np.searchsorted(keys, _encode(faces, n_vertices))
+        if np.all(idx < len(keys)) and np.all(keys[np.minimum(idx, len(keys) - 1)] == _encode(faces, n_vertices)):
+            z[idx] ^= True; found += 1
+    d = _d(boundaries, dims, k+1)
+    if d.shape[1]:
+        z ^= to_bool(matmul_gf2(d, rng.random(d.shape[1]) < 0.5))
+    return z
+
+def reps_for(boundaries, simplices, C, k3, k2, seed=None):
+    """Reps in degrees k3, k2 with c_cod = C_k c_dom ⊕ (a boundary), so transport holds."""
+    rng = np.random.default_rng(seed)
+    dims = dims_of(boundaries)
+    out = dict(k3=int(k3), k2=int(k2))
+    for name, k in (("c3", k3), ("c2", k2)):
+        z = random_cycle(boundaries, simplices, k, seed=rng.integers(1 << 32))
+        cod = to_bool(matmul_gf2(C[k], z))
+        d = _d(boundaries, dims, k+1)
+        if d.shape[1]:
+            cod = cod ^ to_bool(matmul_gf2(d, rng.random(d.shape[1]) < 0.5))
+        out[f"{name}_dom"] = z; out[f"{name}_cod"] = cod
+    return out
+
+def workload(n_vertices=40, n_top=60, dim=4, nnz_per_col=1.0, n_moves=2, seed=0):
+    """A consistent set of inputs: boundaries, moves C_1..C_m, H for (C_1, C_2),
+    the triangle template J, reps and the shape manifest (all as GF(2) objects)."""
+    rng = np.random.default_rng(seed)
+    boundaries, simplices = simplicial_complex(n_vertices, n_top, dim, rng.integers(1 << 32))
+    moves = [chain_map(boundaries, nnz_per_col, rng.integers(1 << 32)) for _ in range(max(2, int(n_moves)))]
+    (C1, K1, N1), (C2, K2, N2) = moves[0], moves[1]
+    H = overlap_homotopy(K1, N1, K2, N2)
+    k3 = min(3, dim); k2 = k3 - 1
+    dims = dims_of(boundaries)
+    return dict(boundaries=boundaries, moves=[m[0] for m in moves], H=H,
+                triangle=triangle_template(C1, C2, H),
+                reps=reps_for(boundaries, simplices, C1, k3, k2, rng.integers(1 << 32)),
+                shapes={"degrees": {str(k): {"dim_k": dims[k], "dim_k_minus_1": dims.get(k-1, 0)} for k in sorted(dims)}})
+
+def _lists(M):
+    return to_bool(M).astype(np.int8).tolist()
+
+def to_json_docs(w):
+    """The workload as JSON documents matching schemas/*.schema.json."""
+    docs = {"complex": {"boundaries": {str(k): _lists(d) for k, d in w["boundaries"].items()}},
+            "H": {"blocks": {str(k): _lists(M) for k, M in w["H"].items()}},
+            "triangle_J": {k: {p: _lists(M) for p, M in part.items()} for k, part in w["triangle"].items()},
+            "reps": {k: (v.astype(int).tolist() if isinstance(v, np.ndarray) else v) for k, v in w["reps"].items()},
+            "shapes": w["shapes"]}
+    for i, C in enumerate(w["moves"], 1):
+        docs[f"move_{i}"] = {"blocks": {str(k): _lists(M) for k, M in C.items()}}
+    return docs
+
+def main(argv=None):
+    """CLI: write a synthetic workload as JSON (or .otcb) documents."""
+    import argparse
+    from . import binfmt
+    ap = argparse.ArgumentParser(description="Generate a synthetic OTC workload.")
+    ap.add_argument("out", help="output directory")
+    ap.add_argument("--vertices", type=int, default=40)
+    ap.add_argument("--top", type=int, default=60, help="number of random top simplices")
+    ap.add_argument("--dim", type=int, default=4)
+    ap.add_argument("--nnz-per-col", type=float, default=1.0, help="expected ones per column of the homotopy generators K")
+    ap.add_argument("--moves", type=int, default=2)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--bin", action="store_true", help="write packed .otcb containers instead of JSON")
+    args = ap.parse_args(argv)
+    w = workload(args.vertices, args.top, args.dim, args.nnz_per_col, args.moves, args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    for name, doc in to_json_docs(w).items():
+        if args.bin:
+            binfmt.save(doc, os.path.join(args.out, name + ".otcb"))
+        else:
+            with open(os.path.join(args.out, name + ".json"), "w") as f:
+                json.dump(doc, f)
+    dims = dims_of(w["boundaries"])
+    print(f"dims {dict(sorted(dims.items()))}, {len(w['moves'])} move(s) -> {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+
+"""Persistent tower checkpoints keyed by a hash of the schedule prefix.
+
+The key of step i chains the previous key with the content hash of move i
+(key_0 covers the mode and the representatives), so two schedules share the
+checkpoints of their common prefix whatever their files are called. Every
+`every` steps, and at the last step, run_tower stores its cumulative state:
+the composed per-degree maps in matrix mode, the propagated representative
+vectors in vectors/signed mode. Each
+checkpoint holds only the hashes produced since the previous one (as raw
+16-byte digests) and that checkpoint's step, so storage grows linearly with
+the run; resume() rebuilds the full hash list by walking the chain back. A
+longer run then resumes from the longest stored prefix whose chain is intact
+and only computes the suffix; the hashes are the ones the uninterrupted run
+would produce.
+
+Entries go through homology_cache.HomologyCache (atomic .npz writes, LRU
+eviction under a lock), so a directory can be shared between processes.
+"""
+from hashlib import blake2b
+import numpy as np
+from .gf2 import PackedGF2, SparseGF2, to_bool
+from .homology_cache import HomologyCache, block_key
+from . import zmod
+from .towers import HASH_VERSION
+
+def _signed_key(M):
+    M = zmod.signed_array(M)
+    h = blake2b(digest_size=16)
+    h.update(np.array(M.shape, dtype="<i8").tobytes())
+    h.update(",".join(str(int(x)) for x in M.ravel()).encode() if M.dtype == object else M.astype("<i8").tobytes())
+    return h.hexdigest()
+
+def move_key(C, mode="matrix"):
+    """Content hash of one move (all degrees)."""
+    key = _signed_key if mode == "signed" else block_key
+    return blake2b("|".join(f"{k}:{key(C[k])}" for k in sorted(C)).encode(), digest_size=16).hexdigest()
+
+def _root_key(reps, mode):
+    h = blake2b(f"tower|v{HASH_VERSION}|{mode}|{int(reps['k3'])}|{int(reps['k2'])}".encode(), digest_size=16)
+    for name in ("c3_dom", "c2_dom"):
+        v = zmod.signed_array(reps[name]) if mode == "signed" else to_bool(reps[name]).astype(np.int64)
+        h.update(b"|" + _signed_key(v.reshape(1, -1)).encode())
+    return h.hexdigest()
+
+def prefix_keys(seq, reps, mode="matrix"):
+    """keys[i-1] identifies (mode, reps, seq[:i])."""
+    keys = []; h = _root_key(reps, mode)
+    for C in seq:
+        h = blake2b((h + move_key(C, mode)).encode(), digest_size=16).hexdigest()
+        keys.append(h)
+    return keys
+
+def _put_block(out, name, M):
+    if isinstance(M, SparseGF2):
+        out[name + "__indptr"] = M.indptr; out[name + "__indices"] = M.indices; out[name + "__nrows"] = M.nrows
+    else:
+        out[name] = PackedGF2.coerce(M)
+
+def _get_block(data, name):
+    if name + "__indptr" in data:
+        return SparseGF2(np.asarray(data[name + "__indptr"], dtype=np.int64),
+                         np.asarray(data[name + "__indices"], dtype=np.int64), int(data[name + "__nrows"]))
+    return data[name]
+
+def _put_signed(out, name, v):
+    # decimal strings: big-int entries cannot go into an .npz without pickling
+    out[name] = np.asarray([str(int(x)) for x in v.ravel()], dtype=str)
+
+def _get_signed(data, name):
+    return zmod.signed_array([int(x) for x in data[name]]).reshape(-1, 1)
+
+class TowerCheckpoints:
+    """Checkpoint store for run_tower(..., checkpoints=store)."""
+    def __init__(self, root, every=16, max_bytes=1 << 30):
+        self.store = HomologyCache(root, max_bytes)
+        self.every = max(1, int(every))
+
+    def _hashes(self, keys, data):
+        """Full hash list up to the checkpoint `data`, or None if a link of its chain was evicted."""
+        segs = [data["hashes"]]; prev = int(data["prev"])
+        while prev:
+            link = self.store.get("t-" + keys[prev-1])
+            if link is None or "prev" not in link or int(link["step"]) != prev:
+                return None
+            segs.append(link["hashes"]); prev = int(link["prev"])
+        return [bytes(h).hex() for seg in reversed(segs) for h in np.asarray(seg, dtype=np.uint8).reshape(-1, 16)]
+
+    def resume(self, keys, mode):
+        """(start, hashes, state) from the longest stored prefix; (0, [], None) if none."""
+        for i in range(len(keys), 0, -1):
+            data = self.store.get("t-" + keys[i-1])
+            if data is None or "prev" not in data or int(data["step"]) != i:
+                continue
+            hashes = self._hashes(keys, data)
+            if hashes is None or len(hashes) != i:
+                continue
+            if mode == "matrix":
+                state = {int(k): _get_block(data, f"cum_{k}") for k in data["degs"]}
+            elif mode == "signed":
+                state = (_get_signed(data, "v3"), _get_signed(data, "v2"))
+            else:
+                state = (to_bool(np.asarray(data["v3"], dtype=bool)).reshape(-1, 1),
+                         to_bool(np.asarray(data["v2"], dtype=bool)).reshape(-1, 1))
+            return i, hashes, state
+        return 0, [], None
+
+    def due(self, step, n_steps):
+        return step % self.every == 0 or step == n_steps
+
+    def save(self, key, mode, step, hashes, state, prev=0):
+        """Store the checkpoint at `step`: `hashes` are those of steps prev+1..step,
+        `prev` the step of the previous checkpoint of this run (0 for none)."""
+        digests = b"".join(bytes.fromhex(h) for h in hashes)
+        out = dict(step=step, prev=int(prev), hashes=np.frombuffer(digests, dtype=np.uint8).reshape(-1, 16))
+        if mode == "matrix":
+            out["degs"] = np.asarray(sorted(state), dtype=np.int64)
+            for k, M in state.items():
+                _put_block(out, f"cum_{k}", M)
+        elif mode == "signed":
+            _put_signed(out, "v3", state[0]); _put_signed(out, "v2", state[1])
+        else:
+            out["v3"] = to_bool(state[0]).ravel(); out["v2"] = to_bool(state[1]).ravel()
+        self.store.put("t-" + key, out)
@@ -1,17 +1,55 @@
 import numpy as np
 from hashlib import blake2b
-from .gf2 import to_bool, matmul_gf2
+from .gf2 import to_bool, matmul_gf2, as_gf2
+from . import zmod
+# Tower hash format. v1 hashed numpy bool @ bool products, which are OR/AND rather than
+# GF(2); v2 hashes exact GF(2) (and exact Z) products. The version salts every digest and
+# is reported next to the hashes, so hashes of different versions never compare equal.
+HASH_VERSION = 2
+_PERSON = f"otc-tower-v{HASH_VERSION}".encode()
 def compose_maps(seq):
     if not seq: return {}
     degs = sorted(seq[0].keys())
-    total = {k: to_bool(np.eye(seq[0][k].shape[0], dtype=bool)) for k in degs}
-    for C in seq:
+    # start from the first move rather than I @ C_1 so sparse moves stay sparse
+    total = {k: as_gf2(seq[0][k]) for k in degs}
+    for C in seq[1:]:
         for k in degs:
-            total[k] = matmul_gf2(to_bool(C[k]), to_bool(total[k]))
+            total[k] = matmul_gf2(C[k], total[k])
     return total
+def hash_vectors(v3, v2):
+    """Hash of the transported representatives C_total[k3] c3_dom, C_total[k2] c2_dom."""
+    bits = np.concatenate([to_bool(v3).flatten(), to_bool(v2).flatten()]).astype(np.uint8)
+    return blake2b(bits.tobytes(), digest_size=16, person=_PERSON).hexdigest()
 def hash_certificate(C_total, reps):
     k3 = int(reps["k3"]); k2 = int(reps["k2"])
     c3 = to_bool(reps["c3_dom"]).reshape(-1,1); c2 = to_bool(reps["c2_dom"]).reshape(-1,1)
-    v3 = to_bool(C_total[k3]) @ c3; v2 = to_bool(C_total[k2]) @ c2
-    bits = np.concatenate([v3.flatten(), v2.flatten()]).astype(np.uint8)
-    return blake2b(bits.tobytes(), digest_size=16).hexdigest()
+    v3 = matmul_gf2(C_total[k3], c3); v2 = matmul_gf2(C_total[k2], c2)
+    return hash_vectors(v3, v2)
+def propagate_reps(seq, reps, start=None):
+    """Yield (step, v3, v2) pushing only c3_dom/c2_dom through the schedule:
+    one matrix-vector product per step in degrees k3 and k2, so hash_vectors(v3, v2)
+    equals hash_certificate(compose_maps(seq[:step]), reps) at O(n^2) per step.
+    `start` = (step, v3, v2) continues from already propagated vectors."""
+    k3 = int(reps["k3"]); k2 = int(reps["k2"])
+    v3 = to_bool(reps["c3_dom"]).reshape(-1,1); v2 = to_bool(reps["c2_dom"]).reshape(-1,1)
+    i0 = 0
+    if start is not None:
+        i0, v3, v2 = start
+    for i, C in enumerate(seq[i0:], i0 + 1):
+        v3 = to_bool(matmul_gf2(C[k3], v3)); v2 = to_bool(matmul_gf2(C[k2], v2))
+        yield i, v3, v2
+def hash_signed(v3, v2):
+    """Hash of exact integer representatives (decimal digits, so int64 and big-int values agree)."""
+    text = ";".join(",".join(str(int(x)) for x in np.asarray(v).ravel()) for v in (v3, v2))
+    return blake2b(text.encode(), digest_size=16, person=_PERSON).hexdigest()
+def propagate_signed(seq, reps, start=None):
+    """Yield (step, v3, v2) pushing the representatives through signed (Z) moves exactly:
+    products go through zmod, so coefficient growth along the tower never wraps."""
+    k3 = int(reps["k3"]); k2 = int(reps["k2"])
+    v3 = zmod.signed_array(reps["c3_dom"]).reshape(-1,1); v2 = zmod.signed_array(reps["c2_dom"]).reshape(-1,1)
+    i0 = 0
+    if start is not None:
+        i0, v3, v2 = start
+    for i, C in enumerate(seq[i0:], i0 + 1):
+        v3 = zmod.matmul(C[k3], v3); v2 = zmod.matmul(C[k2], v2)
+        yield i, v3, v2
@@ -1,58 +1,154 @@
 
 import numpy as np
-from .gf2_solve import to_bool, kron_gf2, vec_gf2, unvec_gf2, solve_gf2
+from .gf2 import matmul_gf2, add_gf2
+from .gf2_solve import to_bool, factor_two_sided_gf2, solve_factored_two_sided_many
+from .engine import run_degrees
 
-def build_triangle_template(CX, C1, C2):
-    """Given ChainComplex CX (with dims, d(k)), and two move blocks C1, C2 (dict k->n_k x n_k),
-    build a J-template s.t. d_{k+1} J_k ⊕ J_{k-1} d_k = D_k where D_k = C2_k C1_k ⊕ C1_k C2_k.
-    Returns dict: k -> {A,B,J}, with A=C2C1, B=C1C2 and J as solved (zeros if trivial).
-    """
-    J = {}
-    degs = sorted(set(list(C1.keys()) + list(C2.keys())))
+def _commutator_blocks(C1, C2, k, n_k):
+    """(A_k, B_k, D_k) = (C2_k C1_k, C1_k C2_k, A_k ⊕ B_k), missing blocks read as zero."""
+    C1k = to_bool(C1.get(k, np.zeros((n_k, n_k), dtype=bool)))
+    C2k = to_bool(C2.get(k, np.zeros((n_k, n_k), dtype=bool)))
+    Ak = to_bool(matmul_gf2(C2k, C1k)); Bk = to_bool(matmul_gf2(C1k, C2k))
+    return Ak, Bk, add_gf2(Ak, Bk)
+
+def _factor_degree(CX, k):
+    """factor_two_sided_gf2(d_{k+1}, d_k) plus `im_proj` = d_k G, a projection onto im d_k
+    built from a generalized inverse G (d_k G d_k = d_k): column i of the column
+    transform Q placed at pivot row pivB[i] of the column-reduced d_k."""
+    d_kp1 = to_bool(CX.d(k+1)); d_k = to_bool(CX.d(k))
+    F = factor_two_sided_gf2(d_kp1, d_k)
+    G = np.zeros((d_k.shape[1], d_k.shape[0]), dtype=bool)
+    G[:, F["pivB"]] = F["Q"][:, :F["s"]]
+    F["im_proj"] = to_bool(matmul_gf2(d_k, G))
+    return F
+
+def _degrees(CX, keys):
+    """Every degree from the lowest to the highest move degree with n_k > 0 (J_k couples
+    neighbouring degrees, so gaps are solved too, with D_k = 0)."""
+    keys = [int(k) for k in keys]
+    return [k for k in range(min(keys), max(keys) + 1) if CX.dims.get(k, 0) > 0] if keys else []
+
+def _solve_chain(CX, degs, factors, rhs, n):
+    """Solve d_{k+1} J_k ⊕ J_{k-1} d_k = D_k for the `n` systems in `rhs` ({k: {i: D_k of
+    system i}}, systems absent from a degree are not solved there), lowest degree first. J_{k-1} from the degree below is
+    kept: degree k solves d_{k+1} X ⊕ Y d_k = D_k ⊕ J_{k-1} d_k and only adds
+    Δ = Y (d_k G) to J_{k-1}, which has Δ d_k = Y d_k and d_k Δ = 0 whenever
+    d_k Y d_k = d_k (D_k ⊕ J_{k-1} d_k) = d_k D_k ⊕ D_{k-1} d_k vanishes, so no earlier degree
+    is disturbed. When it does not (the moves are not chain maps), no choice of J_{k-1}
+    works and the degree is reported as inconsistent.
+    Returns (Js, bad): Js[i] = {k: J_k} and bad[i] = degrees without a solution."""
+    Js = [{} for _ in range(n)]; bad = [[] for _ in range(n)]
     for k in degs:
+        F = factors[k]
+        d_k = to_bool(CX.d(k))
+        todo = sorted(rhs[k])
+        E = [add_gf2(rhs[k][i], matmul_gf2(Js[i][k-1], d_k)) if (k-1) in Js[i] else rhs[k][i] for i in todo]
+        for i, sol in zip(todo, solve_factored_two_sided_many(F, E)):
+            if sol is None:
+                bad[i].append(int(k))
+                Js[i][k] = np.zeros((CX.dims.get(k+1, 0), CX.dims[k]), dtype=bool)
+                continue
+            X, Y = sol
+            delta = to_bool(matmul_gf2(Y, F["im_proj"]))
+            if to_bool(matmul_gf2(d_k, delta)).any():
+                bad[i].append(int(k))
+                Js[i][k] = np.zeros((CX.dims.get(k+1, 0), CX.dims[k]), dtype=bool)
+                continue
+            Js[i][k-1] = np.logical_xor(Js[i][k-1], delta) if (k-1) in Js[i] else delta
+            Js[i][k] = X
+    return Js, bad
+
+def _template(CX, blocks, Jk):
+    """Template dict str(k) -> {A, B, J} (int8 lists); degrees with only a J block get A = B = 0."""
+    out = {}
+    for k in sorted(set(blocks) | {k for k in Jk if CX.dims.get(k, 0) > 0}):
         n_k = CX.dims.get(k, 0)
-        n_km1 = CX.dims.get(k-1, 0)
-        n_kp1 = CX.dims.get(k+1, 0)
-        if n_k == 0:
-            continue
-        C1k = to_bool(C1.get(k, np.zeros((n_k, n_k), dtype=bool))).astype(np.int8)
-        C2k = to_bool(C2.get(k, np.zeros((n_k, n_k), dtype=bool))).astype(np.int8)
-        Dk = ((C2k @ C1k) ^ (C1k @ C2k)) % 2   # n_k x n_k
-
-        Ik = np.eye(n_k, dtype=np.int8)
-        dk = to_bool(CX.d(k)).astype(np.int8)         # (n_{k-1} x n_k)
-        dkp1 = to_bool(CX.d(k+1)).astype(np.int8)     # (n_k x n_{k+1})
-
-        # Correct row dimensions: both A1 and A2 must have rows n_k * n_k
-        # vec(d_{k+1} J_k)   = (I_k ⊗ d_{k+1}) vec(J_k)
-        # vec(J_{k-1} d_k)   = (d_k^T ⊗ I_k) vec(J_{k-1})
-        A1 = kron_gf2(Ik, dkp1)           # rows: n_k*n_k, cols: n_k*n_{k+1}
-        A2 = kron_gf2(dk.T, Ik)           # rows: n_k*n_k, cols: n_k*n_{k-1}
-
-        # Assemble system
-        import numpy as _np
-        A = _np.hstack([A1, A2]).astype(np.int8)
-        b = vec_gf2(Dk).astype(np.int8)
-
-        try:
-            x = solve_gf2(A, b)
-            # Split solution
-            n1 = n_k * n_kp1
-            x1 = x[:n1] if n1 > 0 else _np.zeros((0,1), dtype=_np.int8)
-            x2 = x[n1:] if (x.shape[0] - n1) >= 0 else _np.zeros((0,1), dtype=_np.int8)
-            Jk = unvec_gf2(x1, n_kp1, n_k) if n_kp1 > 0 else _np.zeros((0, n_k), dtype=_np.int8)
-            Jkm1 = unvec_gf2(x2, n_k, n_km1) if n_km1 > 0 else _np.zeros((n_k, 0), dtype=_np.int8)
-        except ValueError:
-            Jk = np.zeros((n_kp1, n_k), dtype=np.int8)
-            Jkm1 = np.zeros((n_k, n_km1), dtype=np.int8)
-
-        # Store
-        J[str(k)] = {"A": C2k.tolist(), "B": C1k.tolist(), "J": Jk.tolist()}
-        if n_km1 > 0:
-            if str(k-1) not in J:
-                J[str(k-1)] = {"A": [[0]*n_km1 for _ in range(n_km1)],
-                               "B": [[0]*n_km1 for _ in range(n_km1)],
-                               "J": Jkm1.tolist()}
-            else:
-                J[str(k-1)]["J"] = Jkm1.tolist()
-    return J
+        zero = np.zeros((n_k, n_k), dtype=bool)
+        Ak, Bk = blocks.get(k, (zero, zero))
+        J = Jk.get(k, np.zeros((CX.dims.get(k+1, 0), n_k), dtype=bool))
+        out[str(k)] = {"A": Ak.astype(np.int8).tolist(), "B": Bk.astype(np.int8).tolist(), "J": J.astype(np.int8).tolist()}
+    return out
+
+def build_triangle_template(CX, C1, C2, workers=None, progress=None):
+    """Given ChainComplex CX (with dims, d(k)), and two move blocks C1, C2 (dict k->n_k x n_k),
+    build a J-template s.t. d_{k+1} J_k ⊕ J_{k-1} d_k = A_k ⊕ B_k with A_k = C2_k C1_k and
+    B_k = C1_k C2_k. Returns dict: str(k) -> {A, B, J} as int8 lists, in the format
+    triangle_coherence_identity checks (and synth.triangle_template writes).
+    Each degree is factored once (factor_two_sided_gf2, in parallel on `workers` threads)
+    and solved on the matrices directly, never via the n_k^2-row Kronecker form; the
+    degrees are then solved lowest first so each J_{k-1} carries over (_solve_chain).
+    Degrees without a solution get J_k = 0. `progress(done, total)` is called as degrees are factored.
+    """
+    degs = _degrees(CX, list(C1.keys()) + list(C2.keys()))
+    def one(k):
+        return True, (_commutator_blocks(C1, C2, k, CX.dims[k]), _factor_degree(CX, k))
+    done = run_degrees(one, degs, workers, progress=progress)
+    Js, _ = _solve_chain(CX, degs, {k: done[k][1][1] for k in degs}, {k: {0: done[k][1][0][2]} for k in degs}, 1)
+    return _template(CX, {k: done[k][1][0][:2] for k in degs}, Js[0])
+
+def build_triangle_templates(CX, moves, pairs=None, workers=None, progress=None):
+    """Triangle templates for many move pairs on one complex.
+    `moves` is a list of block dicts; `pairs` defaults to every (i, j) with i < j.
+    Each degree's system is factored once and the commutators D_k of all pairs are
+    solved as one multi-RHS batch per degree. Returns (templates, inconsistent):
+    templates[(i, j)] equals build_triangle_template(CX, moves[i], moves[j]);
+    inconsistent[(i, j)] lists the degrees whose system had no solution (those J blocks are zero).
+    """
+    if pairs is None:
+        pairs = [(i, j) for i in range(len(moves)) for j in range(i+1, len(moves))]
+    pair_degs = {(i, j): _degrees(CX, list(moves[i].keys()) + list(moves[j].keys())) for i, j in pairs}
+    degs = sorted({k for ks in pair_degs.values() for k in ks})
+    done = run_degrees(lambda k: (True, _factor_degree(CX, k)), degs, workers, progress=progress)
+    blocks = {(ij, k): _commutator_blocks(moves[ij[0]], moves[ij[1]], k, CX.dims[k]) for ij in pairs for k in pair_degs[ij]}
+    rhs = {k: {i: blocks[ij, k][2] for i, ij in enumerate(pairs) if (ij, k) in blocks} for k in degs}
+    Js, bad = _solve_chain(CX, degs, {k: done[k][1] for k in degs}, rhs, len(pairs))
+    templates = {}; inconsistent = {}
+    for ij, Jk, b in zip(pairs, Js, bad):
+        templates[ij] = _template(CX, {k: blocks[ij, k][:2] for k in pair_degs[ij]}, Jk)
+        if b:
+            inconsistent[ij] = b
+    return templates, inconsistent
+
+def main(argv=None):
+    """CLI: build triangle templates for every pair of moves on one complex."""
+    import argparse, json, os
+    from .app_helpers import load_complex, load_map_blocks
+    from .checks import triangle_coherence_identity
+    ap = argparse.ArgumentParser(description="Build triangle J templates for all move pairs on one complex.")
+    ap.add_argument("complex", help="complex JSON (boundaries)")
+    ap.add_argument("moves", nargs="+", help="move block JSON files")
+    ap.add_argument("-o", "--out", required=True, help="output directory for J templates")
+    ap.add_argument("--rounds", type=int, default=20,
+                    help="Freivalds rounds for the coherence check of each template (0: exact products)")
+    args = ap.parse_args(argv)
+    with open(args.complex) as f:
+        CX = load_complex(json.load(f))
+    moves = []
+    for path in args.moves:
+        with open(path) as f:
+            moves.append(load_map_blocks(json.load(f)))
+    names = [os.path.splitext(os.path.basename(p))[0] for p in args.moves]
+    templates, inconsistent = build_triangle_templates(CX, moves)
+    os.makedirs(args.out, exist_ok=True)
+    report = []
+    for (i, j), J in templates.items():
+        fname = f"triangle_J_{names[i]}__{names[j]}.json"
+        with open(os.path.join(args.out, fname), "w") as f:
+            json.dump(J, f, indent=2)
+        # a template counts only if it passes the check it is built for, not just its per-degree solves
+        coherent, res = triangle_coherence_identity(CX, J, rounds=args.rounds or None)
+        report.append(dict(m1=names[i], m2=names[j], file=fname,
+                           consistent=coherent and (i, j) not in inconsistent, coherent=coherent,
+                           inconsistent_degrees=inconsistent.get((i, j), []),
+                           incoherent_degrees=[int(k) for k, r in res.items() if not r["eq"]]))
+    with open(os.path.join(args.out, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    bad = [r for r in report if not r["consistent"]]
+    print(f"{len(report)} templates written to {args.out}; {len(bad)} inconsistent pair(s)")
+    for r in bad:
+        print(f"  inconsistent: {r['m1']} x {r['m2']} at degrees {r['inconsistent_degrees']}"
+              f" (incoherent at {r['incoherent_degrees']})")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
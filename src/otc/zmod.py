@@ -0,0 +1,173 @@
+
+"""Exact signed (Z) arithmetic for the Z-lift path without int64 overflow.
+
+Every product chain gets an a-priori bound on its entries from the inputs:
+|(M_1 ... M_r)_ij| <= rownorm(M_1) ... rownorm(M_{r-1}) * absmax(M_r), with
+rownorm the largest absolute row sum (Python ints, so the bound never wraps).
+
+  - bound < 2**53: the product is computed with float64 BLAS, which is exact
+    because every partial sum is an integer of magnitude <= bound;
+  - otherwise it is computed modulo word-size primes p < 2**20 (float64 BLAS,
+    inner dimension chunked so sums stay below 2**53) and reconstructed by CRT
+    in the symmetric range, which is exact once the primes' product exceeds
+    2 * bound;
+  - only when even all PRIMES are too few does it fall back to object-dtype
+    (Python big integer) products.
+
+Identity checks sum(prod lhs) == sum(prod rhs) never reconstruct: with T the
+sum of the chain bounds, the difference D has |D| <= T, so D == 0 iff
+D = 0 mod every prime of a set whose product exceeds 2T. Any nonzero residue
+is a certain mismatch.
+"""
+import numpy as np
+
+_INT64_SAFE = 1 << 62
+_FLOAT_EXACT = 1 << 53
+_CHUNK = 1 << 13        # (2**20)**2 * 2**13 = 2**53
+
+def _primes_below(n, count):
+    out = []; c = n - 1
+    while len(out) < count:
+        if c % 2 and all(c % q for q in range(3, int(c ** 0.5) + 1, 2)):
+            out.append(c)
+        c -= 1
+    return tuple(out)
+
+PRIMES = _primes_below(1 << 20, 8)
+
+def signed_array(x):
+    """Integer array from nested lists: int64 when every entry fits, else object (Python ints)."""
+    if isinstance(x, np.ndarray) and (x.dtype == object or np.issubdtype(x.dtype, np.integer)):
+        return x if x.dtype == object else x.astype(np.int64, copy=False)
+    try:
+        return np.asarray(x, dtype=np.int64)
+    except OverflowError:
+        A = np.array(x, dtype=object)
+        if any(not isinstance(v, (int, np.integer)) for v in A.flat):
+            raise ValueError("signed block: entries must be integers") from None
+        return A
+
+def _narrow(A):
+    """int64 copy of an object array when it fits, else A unchanged."""
+    if A.dtype == object and (A.size == 0 or absmax(A) < _INT64_SAFE):
+        return A.astype(np.int64)
+    return A
+
+def absmax(M):
+    M = np.asarray(M)
+    if M.size == 0:
+        return 0
+    return max(-int(M.min()), int(M.max()))
+
+def rownorm(M):
+    """Largest absolute row sum (a Python int)."""
+    M = np.asarray(M)
+    if M.size == 0:
+        return 0
+    if M.dtype != object and absmax(M) * M.shape[1] < _INT64_SAFE:
+        return int(np.abs(M.astype(np.int64)).sum(axis=1).max())
+    return max(sum(abs(int(v)) for v in row) for row in M.reshape(M.shape[0], -1))
+
+def chain_bound(chain):
+    """Bound on the absolute entries of prod(chain)."""
+    b = absmax(chain[-1])
+    for M in chain[:-1]:
+        b *= rownorm(M)
+    return b
+
+def primes_needed(bound):
+    """Smallest r with prod(PRIMES[:r]) > 2 * bound, or None if PRIMES are too few."""
+    P = 1
+    for r, p in enumerate(PRIMES, 1):
+        P *= p
+        if P > 2 * bound:
+            return r
+    return None
+
+def _residue(M, p):
+    M = np.asarray(M)
+    R = np.mod(M, p)
+    return (R.astype(np.int64) if M.dtype == object else R).astype(np.float64)
+
+def _matmul_mod(A, B, p):
+    """A @ B mod p for float64 residue matrices."""
+    n = A.shape[1]
+    if n <= _CHUNK:
+        return np.fmod(A @ B, p)
+    C = np.zeros((A.shape[0], B.shape[1]))
+    for s in range(0, n, _CHUNK):
+        C = np.fmod(C + np.fmod(A[:, s:s+_CHUNK] @ B[s:s+_CHUNK], p), p)
+    return C
+
+def product_mod(chain, p):
+    """prod(chain) mod p as a float64 residue matrix."""
+    P = _residue(chain[-1], p)
+    for M in reversed(chain[:-1]):
+        P = _matmul_mod(_residue(M, p), P, p)
+    return P
+
+def crt(residues, primes):
+    """Integers in the symmetric range (-P/2, P/2] from residue arrays (Garner's algorithm)."""
+    digits = []
+    for r, p in zip(residues, primes):
+        t = np.asarray(r, dtype=np.int64) % p
+        for a, q in zip(digits, primes):
+            t = ((t - a) % p) * pow(q, -1, p) % p
+        digits.append(t)
+    x = digits[-1].astype(object)
+    for a, q in zip(digits[-2::-1], primes[-2::-1]):
+        x = x * q + a.astype(object)
+    P = 1
+    for q in primes:
+        P *= q
+    x = np.where(x > P // 2, x - P, x)
+    return _narrow(np.asarray(x, dtype=object))
+
+def matmul(A, B):
+    """Exact A @ B over Z (int64 result when it fits, object otherwise)."""
+    A = signed_array(A); B = signed_array(B)
+    if A.shape[1] != B.shape[0]:
+        raise ValueError(f"matmul shape mismatch: {A.shape} @ {B.shape}")
+    bound = rownorm(A) * absmax(B)
+    if bound < _FLOAT_EXACT:
+        return np.rint(A.astype(np.float64) @ B.astype(np.float64)).astype(np.int64)
+    r = primes_needed(bound)
+    if r is None:
+        return _narrow(A.astype(object) @ B.astype(object))
+    ps = PRIMES[:r]
+    return crt([_matmul_mod(_residue(A, p), _residue(B, p), p).astype(np.int64) for p in ps], ps)
+
+def product(chain):
+    """Exact prod(chain), evaluated right to left."""
+    P = signed_array(chain[-1])
+    for M in reversed(chain[:-1]):
+        P = matmul(M, P)
+    return P
+
+def identity(lhs, rhs):
+    """(equal, mode): exact test of sum(prod(c) for c in lhs) == sum(prod(c) for c in rhs) over Z.
+    mode is "modular" (decided by residues) or "bigint" (object-dtype fallback).
+    Mismatched shapes make the identity fail."""
+    chains = [[signed_array(M) for M in (c if isinstance(c, (tuple, list)) else (c,))] for c in list(lhs) + list(rhs)]
+    shapes = set()
+    for ch in chains:
+        if any(A.shape[1] != B.shape[0] for A, B in zip(ch, ch[1:])):
+            return False, "modular"
+        shapes.add((ch[0].shape[0], ch[-1].shape[1]))
+    if len(shapes) > 1:
+        return False, "modular"
+    if not chains:
+        return True, "modular"
+    n_lhs = len(lhs); shape = shapes.pop()
+    r = primes_needed(sum(chain_bound(ch) for ch in chains))
+    if r is None:
+        acc = sum(product([M.astype(object) for M in ch]) for ch in chains[:n_lhs]) - \
+              sum(product([M.astype(object) for M in ch]) for ch in chains[n_lhs:])
+        return not np.any(acc != 0), "bigint"
+    for p in PRIMES[:r]:
+        acc = np.zeros(shape)
+        for i, ch in enumerate(chains):
+            acc += product_mod(ch, p) if i < n_lhs else -product_mod(ch, p)
+        if np.fmod(acc, p).any():
+            return False, "modular"
+    return True, "modular"
@@ -1,23 +1,155 @@
-
 import sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 
-import streamlit as st, json, numpy as np, pandas as pd
+import streamlit as st, json, hashlib, time, numpy as np, pandas as pd
 from io import BytesIO
 
 from otc.app_helpers import (
-    load_complex, load_map_blocks, load_signed_blocks,
+    load_complex, load_map_blocks, load_signed_blocks, load_signed_reps, load_reps, load_support, load_triangle,
     unit_test_generator, overlap_test, triangle_test, run_tower
 )
-from otc.shape_validate import (
-    enforce_chain_shapes, enforce_map_shapes, enforce_rep_lengths, enforce_support_bounds
-)
 from otc.triangle_builder import build_triangle_template
+from otc.instrument import Recorder
+from otc.jobs import submit
+from otc.zmod import signed_array
+from otc.towers import HASH_VERSION
+
+# Every widget interaction reruns this script. Uploads are keyed by a content
+# digest: parsing, ingestion (ChainComplex, blocks) and check results are
+# cached on those keys, so changing one input only recomputes what depends on it.
+
+def upload(f):
+    """(content digest, bytes) of an uploaded file, or None."""
+    if f is None:
+        return None
+    raw = f.getvalue()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest(), raw
+
+def run_key(*parts):
+    """One key for a run: upload digests (None for missing inputs) and parameters."""
+    return hashlib.blake2b(json.dumps([p[0] if isinstance(p, tuple) else p for p in parts]).encode(),
+                           digest_size=16).hexdigest()
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def parse_json(key, _raw):
+    return json.loads(_raw)
+
+def _json(u):
+    return None if u is None else parse_json(u[0], u[1])
+
+LOADERS = {
+    "complex": lambda j, s: load_complex(j, shapes=s),
+    "blocks": load_map_blocks,
+    "reps": load_reps,
+    "support": load_support,
+    "triangle": load_triangle,
+    "signed": lambda j, s: load_signed_blocks(j),
+    "signed_reps": lambda j, s: load_signed_reps(j),
+}
+
+@st.cache_resource(show_spinner=False, max_entries=128)
+def _load(kind, key, shapes_key, _u, _shapes):
+    # frozen (read-only) arrays, so one instance is safely shared across reruns
+    return LOADERS[kind](_json(_u), _json(_shapes))
+
+def load(kind, u, shapes=None):
+    """Parsed and ingested upload `u` (cached on its digest and the manifest's)."""
+    if u is None:
+        return None
+    return _load(kind, u[0], shapes and shapes[0], u, shapes)
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def cached_run(name, key, _fn):
+    """_fn() under a Recorder, cached on `key`; returns dict(result, records). Recorders are
+    context-local, so concurrent sessions and background jobs never add to these records."""
+    with Recorder() as rec:
+        out = _fn()
+    return dict(result=out, records=rec.records)
+
+def log_run(records, run, key):
+    """Append per-check/per-degree records to the Runbook (once per run key)."""
+    logged = st.session_state.setdefault("logged", set())
+    if key in logged:
+        return
+    logged.add(key)
+    rec = Recorder(memory=False); rec.records = [dict(r, run=run) for r in records]
+    st.session_state.setdefault("runbook", []).extend(rec.table().to_dict("records") if rec.records else [])
+    st.session_state.setdefault("runbook_records", []).extend(rec.records)
+
+MAX_FINISHED_JOBS = 4   # per session; older finished jobs (and their results) are dropped
+
+def prune_jobs(keep):
+    """Drop finished jobs other than `keep`: those superseded by a newer job of the same
+    name, then the oldest beyond MAX_FINISHED_JOBS."""
+    jobs = st.session_state.setdefault("jobs", {}); seen = st.session_state.setdefault("jobs_seen", {})
+    finished = sorted((j.finished or 0, k) for k, j in jobs.items() if not j.running and k != keep)
+    names = {j.name for k, j in jobs.items() if k == keep}
+    drop = [k for _, k in finished if jobs[k].name in names] + [k for _, k in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]]
+    for k in set(drop):
+        jobs.pop(k, None); seen.pop(k, None)
+
+def start_job(key, fn, *args, name=None, **kwargs):
+    """Start fn in the background (under its own Recorder) unless a job for `key` is
+    running or already done."""
+    jobs = st.session_state.setdefault("jobs", {})
+    job = jobs.get(key)
+    if job is None or job.state in ("failed", "cancelled"):
+        jobs[key] = submit(fn, *args, name=name, record=True, **kwargs)
+    prune_jobs(key)
+
+def _job_status(key):
+    job = st.session_state.get("jobs", {}).get(key)
+    if job is None:
+        return
+    if job.running:
+        st.progress(job.fraction, text=f"{job.name}: {job.done}/{job.total or '?'}")
+        if st.button("Cancel", key=f"cancel_{key}"):
+            job.cancel()
+    elif job.state == "failed":
+        st.error(f"{job.name} failed: {job.error}")
+    elif job.state == "cancelled":
+        st.warning(f"{job.name} cancelled after {job.done}/{job.total or '?'}.")
+    seen = st.session_state.setdefault("jobs_seen", {})
+    if not job.running and seen.get(key) != job.id:
+        seen[key] = job.id
+        st.rerun()          # redraw the page with the finished result
+
+if hasattr(st, "fragment"):
+    job_status = st.fragment(run_every=0.5)(_job_status)
+else:
+    def job_status(key):
+        _job_status(key)
+        job = st.session_state.get("jobs", {}).get(key)
+        if job is not None and job.running:
+            time.sleep(0.5); st.rerun()
+
+def job_result(key, run):
+    """The finished job's result (logged to the Runbook once), or None."""
+    job = st.session_state.get("jobs", {}).get(key)
+    if job is None or job.state != "done":
+        return None
+    rec = dict(check=job.name, name="job", degree=None, start=0.0,
+               seconds=job.finished - job.started, thread=0)
+    log_run(job.records + [rec], run, job.id)
+    return job.result
+
+def tower_job(seq, repsd, mode, novelty_step=0, nov=None, progress=None):
+    """Baseline tower hashes and, with a novelty map, the injected tower's."""
+    n = len(seq) * (2 if nov is not None else 1)
+    out = dict(base=run_tower(None, seq, repsd, mode=mode, progress=lambda i, _: progress(i, n)), novelty=None)
+    if nov is not None:
+        seq_nov = [(nov if i+1 == novelty_step else C) for i, C in enumerate(seq)]
+        out["novelty"] = run_tower(None, seq_nov, repsd, mode=mode, progress=lambda i, _: progress(len(seq) + i, n))
+    return out
 
 st.set_page_config(page_title="OTC 4D Sanity Runner (v3.4)", layout="wide")
 st.title("Odd-Tetra Certificate — 4D Sanity Runner (v3.4)")
 st.caption("Triangle builder: derive A,B,J from two moves. Keeps all previous features.")
 
+fv_rounds = st.sidebar.number_input("Randomized screening rounds (0 = exact checks)", min_value=0, max_value=64, value=0, step=1,
+                                    help="Freivalds test: a pass is wrong with probability <= 2^-rounds per degree; failures are re-checked exactly.")
+fv_rounds = int(fv_rounds) or None
+
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["Unit tests", "Overlaps & Triangle", "Towers & Novelty", "Runbook", "Notes"])
 
 with tab1:
@@ -33,7 +165,7 @@ with tab1:
     with col2:
         reps = st.file_uploader("Representatives & degrees (JSON)", type=["json"], key="u_reps")
         pairing = st.file_uploader("Pairing matrix (optional, GF2 JSON)", type=["json"], key="u_pair")
-        dX = dY = C_signed = B_signed = None
+        dX = dY = Csig = Bsig = None
         if zlift:
             dX = st.file_uploader("Signed d_k(X) blocks (JSON)", type=["json"], key="u_dX")
             dY = st.file_uploader("Signed d_k(Y) blocks (JSON)", type=["json"], key="u_dY")
@@ -44,22 +176,20 @@ with tab1:
     if st.button("Run unit checks", type="primary"):
         try:
             assert cx and cy and cmap and reps, "Upload X, Y, Cmap, reps"
-            CXj = json.load(cx); CYj = json.load(cy)
-            Cmapj = json.load(cmap); repsd = json.load(reps)
-            supp = json.load(support) if support else None
-            shapesj = json.load(shapes) if shapes else None
-            if shapesj:
-                enforce_chain_shapes(CXj, shapesj); enforce_chain_shapes(CYj, shapesj)
-                enforce_map_shapes(Cmapj, shapesj, side="X"); enforce_rep_lengths(repsd, shapesj)
-                if supp: enforce_support_bounds(supp, shapesj)
-            CX = load_complex(CXj); CY = load_complex(CYj)
-            Cmapb = load_map_blocks(Cmapj)
-            pair = json.load(pairing) if pairing else None
-            dX_signed = load_signed_blocks(json.load(dX)) if (zlift and dX) else None
-            dY_signed = load_signed_blocks(json.load(dY)) if (zlift and dY) else None
-            C_signed = load_signed_blocks(json.load(Csig)) if (zlift and Csig) else None
-            B_signed = np.array(json.load(Bsig), dtype=int) if (zlift and Bsig) else None
-            unit_result = unit_test_generator(CX, CY, Cmapb, repsd, pair, supp, zlift, dX_signed, dY_signed, C_signed, B_signed)
+            ups = [upload(f) for f in (cx, cy, cmap, reps, support, shapes, pairing, dX, dY, Csig, Bsig)]
+            ucx, ucy, ucmap, ureps, usupp, ushapes, upair, udX, udY, uCsig, uBsig = ups
+            CX = load("complex", ucx, ushapes); CY = load("complex", ucy, ushapes)
+            Cmapb = load("blocks", ucmap, ushapes); repsd = load("reps", ureps, ushapes)
+            supp = load("support", usupp, ushapes)
+            pair = _json(upair)
+            dX_signed = load("signed", udX) if zlift else None
+            dY_signed = load("signed", udY) if zlift else None
+            C_signed = load("signed", uCsig) if zlift else None
+            B_signed = signed_array(_json(uBsig)) if (zlift and uBsig) else None
+            key = run_key("unit", *ups, fv_rounds, zlift)
+            out = cached_run("unit", key, lambda: unit_test_generator(CX, CY, Cmapb, repsd, pair, supp, zlift, dX_signed, dY_signed, C_signed, B_signed, rounds=fv_rounds))
+            log_run(out["records"], f"unit:{cmap.name}", key)
+            unit_result = out["result"]
             st.success("Unit checks completed."); st.json(unit_result)
         except Exception as e:
             st.error(f"Validation or run error: {e}")
@@ -76,14 +206,14 @@ with tab2:
         if st.button("Run overlap test"):
             try:
                 assert c_overlap and cm1 and cm2 and H, "Upload overlap complex, C(m1), C(m2), H"
-                COj = json.load(c_overlap); C1j = json.load(cm1); C2j = json.load(cm2); Hj = json.load(H)
-                shapesj = json.load(shapes) if shapes else None
-                if shapesj:
-                    enforce_chain_shapes(COj, shapesj)
-                    enforce_map_shapes(C1j, shapesj, side="X"); enforce_map_shapes(C2j, shapesj, side="X")
-                    enforce_map_shapes(Hj, shapesj, side="X")
-                CO = load_complex(COj); C1 = load_map_blocks(C1j); C2 = load_map_blocks(C2j); Hb = load_map_blocks(Hj)
-                ok, res = overlap_test(CO, C1, C2, Hb)
+                ups = [upload(f) for f in (c_overlap, cm1, cm2, H, shapes)]
+                uco, u1, u2, uH, ushapes = ups
+                CO = load("complex", uco, ushapes)
+                C1 = load("blocks", u1, ushapes); C2 = load("blocks", u2, ushapes); Hb = load("blocks", uH, ushapes)
+                key = run_key("overlap", *ups, fv_rounds)
+                out = cached_run("overlap", key, lambda: overlap_test(CO, C1, C2, Hb, rounds=fv_rounds))
+                log_run(out["records"], f"overlap:{H.name}", key)
+                ok, res = out["result"]
                 st.write("PASS" if ok else "FAIL"); st.json(res)
             except Exception as e:
                 st.error(f"Validation or run error: {e}")
@@ -94,15 +224,13 @@ with tab2:
         if st.button("Run triangle coherence test"):
             try:
                 assert c_overlap and Jfile, "Upload overlap complex and J template"
-                COj = json.load(c_overlap); Jj = json.load(Jfile); shapesj = json.load(shapes) if shapes else None
-                if shapesj:
-                    enforce_chain_shapes(COj, shapesj)
-                    for k, part in Jj.items():
-                        for key in ("A","B","J"):
-                            if key in part:
-                                enforce_map_shapes({"blocks": {k: part[key]}}, shapesj, side="X")
-                CO = load_complex(COj)
-                ok, res = triangle_test(CO, Jj)
+                ups = [upload(f) for f in (c_overlap, Jfile, shapes)]
+                uco, uJ, ushapes = ups
+                CO = load("complex", uco, ushapes); Jj = load("triangle", uJ, ushapes)
+                key = run_key("triangle", *ups, fv_rounds)
+                out = cached_run("triangle", key, lambda: triangle_test(CO, Jj, rounds=fv_rounds))
+                log_run(out["records"], f"triangle:{Jfile.name}", key)
+                ok, res = out["result"]
                 st.write("PASS" if ok else "FAIL"); st.json(res)
             except Exception as e:
                 st.error(f"Validation or run error: {e}")
@@ -112,73 +240,85 @@ with tab2:
         cm1 = st.file_uploader("Blocks C(m1) (JSON)", type=["json"], key="tb_m1")
         cm2 = st.file_uploader("Blocks C(m2) (JSON)", type=["json"], key="tb_m2")
         shapes = st.file_uploader("Shape manifest (JSON)", type=["json"], key="tb_shapes")
+        ups = [upload(f) for f in (cx, cm1, cm2, shapes)]
+        key = run_key("build_triangle", *ups)
         if st.button("Build template"):
             try:
                 assert cx and cm1 and cm2, "Upload X, C(m1), C(m2)"
-                CXj = json.load(cx); C1j = json.load(cm1); C2j = json.load(cm2)
-                shapesj = json.load(shapes) if shapes else None
-                if shapesj:
-                    enforce_chain_shapes(CXj, shapesj); enforce_map_shapes(C1j, shapesj, side="X"); enforce_map_shapes(C2j, shapesj, side="X")
-                from otc.app_helpers import load_complex, load_map_blocks
-                CX = load_complex(CXj); C1 = load_map_blocks(C1j); C2 = load_map_blocks(C2j)
-                Jbuilt = build_triangle_template(CX, C1, C2)
-                st.json(Jbuilt)
-                import json as _json
-                bytes_out = _json.dumps(Jbuilt, indent=2).encode("utf-8")
-                st.download_button("Download triangle_J_built.json", bytes_out, "triangle_J_built.json", "application/json")
+                ucx, u1, u2, ushapes = ups
+                CX = load("complex", ucx, ushapes); C1 = load("blocks", u1, ushapes); C2 = load("blocks", u2, ushapes)
+                start_job(key, build_triangle_template, CX, C1, C2, name="build_triangle")
             except Exception as e:
                 st.error(f"Builder error: {e}")
+        job_status(key)
+        Jbuilt = job_result(key, "build_triangle")
+        if Jbuilt is not None:
+            st.json(Jbuilt)
+            bytes_out = json.dumps(Jbuilt, indent=2).encode("utf-8")
+            st.download_button("Download triangle_J_built.json", bytes_out, "triangle_J_built.json", "application/json")
 
 with tab3:
     st.header("Towers & Novelty (GF2)")
     st.markdown("Upload schedule moves and a manifest; get per-step hashes and CSV export.")
     reps = st.file_uploader("Representatives & degrees (JSON)", type=["json"], key="tw_reps")
     shapes = st.file_uploader("Shape manifest (JSON)", type=["json"], key="tw_shapes")
-    num = st.number_input("Number of steps in schedule", min_value=1, max_value=200, value=5, step=1)
+    vec_mode = st.checkbox("Propagate representatives only (same hashes, much faster)", value=True)
+    signed_mode = st.checkbox("Signed (Z) moves: exact integer propagation of the representatives", value=False)
+    max_steps = 10000 if (vec_mode or signed_mode) else 200
+    num = st.number_input("Number of steps in schedule", min_value=1, max_value=max_steps, value=5, step=1)
     move_files = st.file_uploader("Upload move blocks for each step (JSON, in order)", type=["json"], accept_multiple_files=True, key="tw_moves")
-    novelty_step = st.number_input("Novelty step (optional; 0 = none)", min_value=0, max_value=200, value=0, step=1)
+    novelty_step = st.number_input("Novelty step (optional; 0 = none)", min_value=0, max_value=max_steps, value=0, step=1)
     novelty_map = st.file_uploader("Novelty move blocks (JSON)", type=["json"], key="tw_nov")
+    tower_mode = "signed" if signed_mode else ("vectors" if vec_mode else "matrix")
+    move_kind = "signed" if signed_mode else "blocks"
+    ureps, ushapes, unov = upload(reps), upload(shapes), upload(novelty_map)
+    umoves = [upload(f) for f in (move_files or [])[:num]]
+    key = run_key("tower", ureps, ushapes, *umoves, tower_mode, int(novelty_step), unov if novelty_step > 0 else None)
     if st.button("Run tower"):
         try:
             assert reps and move_files and len(move_files) >= num, "Upload reps and moves"
-            repsd = json.load(reps); shapesj = json.load(shapes) if shapes else None
-            seq = []
-            for f in move_files[:num]:
-                Cj = json.load(f)
-                if shapesj: enforce_map_shapes(Cj, shapesj, side="X")
-                from otc.app_helpers import load_map_blocks
-                seq.append(load_map_blocks(Cj))
-            from otc.app_helpers import run_tower
-            base_hashes = run_tower(None, seq, repsd)
-            df = pd.DataFrame(base_hashes)
-            st.subheader("Baseline tower hashes"); st.dataframe(df)
-            st.download_button("Download tower-hashes.csv", df.to_csv(index=False).encode("utf-8"),
-                               "tower-hashes.csv", "text/csv")
+            repsd = load("signed_reps" if signed_mode else "reps", ureps)
+            seq = [load(move_kind, u, ushapes) for u in umoves]
+            nov = None
             if novelty_step > 0:
                 assert novelty_map, "Upload novelty map"
-                novj = json.load(novelty_map)
-                if shapesj: enforce_map_shapes(novj, shapesj, side="X")
-                from otc.app_helpers import load_map_blocks
-                nov = load_map_blocks(novj)
-                seq_nov = [(nov if i+1 == novelty_step else C) for i, C in enumerate(seq)]
-                dfn = pd.DataFrame(run_tower(None, seq_nov, repsd))
-                st.subheader("Tower with novelty injection"); st.dataframe(dfn)
-                st.download_button("Download tower-novelty-hashes.csv", dfn.to_csv(index=False).encode("utf-8"),
-                                   "tower-novelty-hashes.csv", "text/csv")
-                div = None
-                for i in range(min(len(df), len(dfn))):
-                    if df.loc[i, "hash"] != dfn.loc[i, "hash"]:
-                        div = i+1; break
-                if div: st.error(f"Novelty detected at step {div}.")
-                else: st.info("No divergence detected in hashes.")
+                nov = load(move_kind, unov, ushapes)
+            start_job(key, tower_job, seq, repsd, tower_mode, int(novelty_step), nov, name="tower")
         except Exception as e:
             st.error(f"Validation or run error: {e}")
+    job_status(key)
+    tower = job_result(key, "tower")
+    if tower is not None:
+        df = pd.DataFrame(tower["base"]).assign(hash_version=HASH_VERSION)
+        st.subheader("Baseline tower hashes"); st.dataframe(df)
+        st.download_button("Download tower-hashes.csv", df.to_csv(index=False).encode("utf-8"),
+                           f"tower-hashes-v{HASH_VERSION}.csv", "text/csv")
+        if tower["novelty"] is not None:
+            dfn = pd.DataFrame(tower["novelty"]).assign(hash_version=HASH_VERSION)
+            st.subheader("Tower with novelty injection"); st.dataframe(dfn)
+            st.download_button("Download tower-novelty-hashes.csv", dfn.to_csv(index=False).encode("utf-8"),
+                               f"tower-novelty-hashes-v{HASH_VERSION}.csv", "text/csv")
+            div = None
+            for i in range(min(len(df), len(dfn))):
+                if df.loc[i, "hash"] != dfn.loc[i, "hash"]:
+                    div = i+1; break
+            if div: st.error(f"Novelty detected at step {div}.")
+            else: st.info("No divergence detected in hashes.")
 
 with tab4:
     st.header("Runbook")
     st.markdown("Same as previous versions — download JSON and export all CSVs from here.")
     if "runbook" in st.session_state and len(st.session_state.runbook)>0:
         df = pd.DataFrame(st.session_state.runbook); st.dataframe(df, use_container_width=True)
+        st.markdown("Time per check (sum over degrees):")
+        st.dataframe(df.groupby(["run", "check", "name"], sort=False)["seconds"].sum().reset_index(), use_container_width=True)
+        rb = Recorder(memory=False); rb.records = st.session_state.runbook_records
+        c1, c2, c3 = st.columns(3)
+        c1.download_button("Download runbook.csv", df.to_csv(index=False).encode("utf-8"), "runbook.csv", "text/csv")
+        c2.download_button("Download runbook.jsonl", rb.to_jsonl().encode("utf-8"), "runbook.jsonl", "application/json")
+        c3.download_button("Download Chrome trace", rb.to_chrome_trace().encode("utf-8"), "runbook.trace.json", "application/json")
+        if st.button("Clear runbook"):
+            st.session_state.runbook = []; st.session_state.runbook_records = []; st.session_state.logged = set()
 
 with tab5:
     st.markdown("Notes: v3.4 adds a Triangle Template Builder from two maps (commutator-based).")
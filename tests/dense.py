@@ -0,0 +1,39 @@
+"""Slow, obviously-correct GF(2) references the fast kernels are checked against."""
+import numpy as np
+
+def mat(M):
+    """0/1 int64 copy of any GF(2) block (PackedGF2/SparseGF2 via their dense form)."""
+    if hasattr(M, "to_dense"):
+        M = M.to_dense()
+    return np.asarray(M).astype(np.int64) % 2
+
+def matmul(A, B):
+    return (mat(A) @ mat(B)) % 2
+
+def rank(A):
+    """Row-by-row Gaussian elimination on an int array."""
+    A = mat(A).copy()
+    if A.ndim == 1:
+        A = A.reshape(1, -1)
+    r = 0
+    for c in range(A.shape[1]):
+        hit = np.flatnonzero(A[r:, c])
+        if not hit.size:
+            continue
+        p = r + hit[0]
+        A[[r, p]] = A[[p, r]]
+        for i in np.flatnonzero(A[:, c]):
+            if i != r:
+                A[i] ^= A[r]
+        r += 1
+        if r == A.shape[0]:
+            break
+    return r
+
+def in_span(B, v):
+    """v in the column span of B."""
+    B = mat(B).reshape(len(v), -1)
+    return rank(np.hstack([B, mat(v).reshape(-1, 1)])) == rank(B)
+
+def random(rng, m, n, density=0.5):
+    return rng.random((m, n)) < density
@@ -0,0 +1,14 @@
+import pytest
+from otc.app_helpers import load_signed_blocks, load_signed_reps, run_tower
+from otc.towers import hash_signed
+
+def test_signed_reps_in_signed_tower():
+    reps = load_signed_reps(dict(k3=1, k2=0, c3_dom=[-3, 2**70], c3_cod=[0, 0], c2_dom=[-1], c2_cod=[0]))
+    assert reps["c3_dom"].dtype == object and reps["c2_dom"].tolist() == [-1]
+    move = load_signed_blocks(dict(blocks={"1": [[1, 1], [0, -1]], "0": [[-2]]}))
+    out = run_tower(None, [move, move], reps, mode="signed")
+    assert [h["hash"] for h in out] == [hash_signed([2**70 - 3, -2**70], [2]), hash_signed([-3, 2**70], [-4])]
+
+def test_signed_reps_missing_keys():
+    with pytest.raises(ValueError, match="missing"):
+        load_signed_reps(dict(k3=1, k2=0, c3_dom=[1]))
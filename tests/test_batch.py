@@ -0,0 +1,42 @@
+import json
+import numpy as np
+import pytest
+from otc import batch, chain, synth
+from otc.app_helpers import load_complex, load_map_blocks, load_reps, unit_test_generator
+
+@pytest.fixture
+def catalogue(tmp_path):
+    w = synth.workload(n_vertices=14, n_top=20, dim=4, n_moves=3, seed=4)
+    docs = synth.to_json_docs(w)
+    bad = {k: np.array(M) for k, M in docs["move_1"]["blocks"].items()}
+    bad["2"][0, 0] ^= 1                              # no longer a chain map
+    docs["move_bad"] = {"blocks": {k: M.tolist() for k, M in bad.items()}}
+    for name, doc in docs.items():
+        (tmp_path / f"{name}.json").write_text(json.dumps(doc))
+    entries = [dict(id=name, map=str(tmp_path / f"{name}.json"), reps=str(tmp_path / "reps.json"))
+               for name in ("move_1", "move_2", "move_3", "move_bad")]
+    return tmp_path, docs, entries
+
+def test_results_match_direct_checks(catalogue):
+    tmp_path, docs, entries = catalogue
+    CX, CY = batch.prepare_complexes(str(tmp_path / "complex.json"), str(tmp_path / "complex.json"),
+                                     degrees=batch.transport_degrees(entries))
+    got = {r["id"]: r for r in batch.run_batch(CX, CY, entries, processes=2)}
+    CZ = load_complex(docs["complex"]); reps = load_reps(docs["reps"])
+    for e in entries:
+        ref = unit_test_generator(CZ, CZ, load_map_blocks(docs[e["id"]]), reps)
+        assert got[e["id"]]["checks"] == {k: bool(v) for k, v in ref.items()}
+    assert got["move_1"]["ok"] and not got["move_bad"]["ok"]
+
+def test_prepare_warms_only_transport_degrees(catalogue, monkeypatch):
+    tmp_path, docs, entries = catalogue
+    path = str(tmp_path / "complex.json")
+    degs = batch.transport_degrees(entries)
+    assert degs == sorted({int(docs["reps"]["k3"]), int(docs["reps"]["k2"])})
+    _, CY = batch.prepare_complexes(path, path, degrees=degs)
+    assert not CY.sparse
+    assert {k for k in CY.dims if CY.has_factor(k)} == {k + 1 for k in degs}
+    monkeypatch.setattr(chain, "SPARSE_MIN_CELLS", 0)
+    _, CY = batch.prepare_complexes(path, path, degrees=degs)
+    assert CY.sparse and not any(CY.has_factor(k) for k in CY.dims)
+    assert set(CY.sparse_homology()._red) >= {k + 1 for k in degs}
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from otc import binfmt, synth
+from otc.gf2 import to_bool
+
+@pytest.fixture(scope="module")
+def docs():
+    return synth.to_json_docs(synth.workload(n_vertices=14, n_top=20, dim=4, n_moves=2, seed=2))
+
+def test_materialize_round_trip(docs, tmp_path):
+    for name, doc in docs.items():
+        binfmt.save(doc, tmp_path / f"{name}.otcb")
+        assert binfmt.CertificateFile(tmp_path / f"{name}.otcb").materialize() == doc, name
+
+def test_open_round_trip(docs, tmp_path):
+    p = tmp_path / "x.otcb"
+    binfmt.save(docs["complex"], p)
+    B = binfmt.open_blocks(p, "boundaries")
+    assert B.shapes == {int(k): np.array(M).reshape(len(M), -1).shape for k, M in docs["complex"]["boundaries"].items()}
+    for k, M in docs["complex"]["boundaries"].items():
+        assert to_bool(B[int(k)]).astype(int).tolist() == M
+    binfmt.save(docs["move_1"], p)
+    assert {k: to_bool(v).astype(int).tolist() for k, v in binfmt.open_blocks(p, "blocks").items()} == \
+        {int(k): M for k, M in docs["move_1"]["blocks"].items()}
+    binfmt.save(docs["triangle_J"], p)
+    assert {k: {q: to_bool(v).astype(int).tolist() for q, v in part.items()} for k, part in binfmt.open_triangle(p).items()} == docs["triangle_J"]
+    binfmt.save(docs["reps"], p)
+    reps = binfmt.open_reps(p)
+    assert {k: (v.astype(int).tolist() if isinstance(v, np.ndarray) else v) for k, v in reps.items()} == docs["reps"]
+
+def test_signed_round_trip(tmp_path):
+    doc = {"blocks": {"1": [[1, -2], [300, 0]], "2": [[-(2**40)], [7]], "3": [[0, 0, 0]]}}
+    binfmt.save(doc, tmp_path / "s.otcb")
+    assert binfmt.CertificateFile(tmp_path / "s.otcb").kind == "map_signed"
+    assert {k: v.tolist() for k, v in binfmt.open_blocks(tmp_path / "s.otcb", "blocks").items()} == \
+        {int(k): M for k, M in doc["blocks"].items()}
+
+def test_rejects_foreign_file(tmp_path):
+    (tmp_path / "x.otcb").write_bytes(b"JSON" + bytes(40))
+    with pytest.raises(ValueError, match="not an OTC"):
+        binfmt.CertificateFile(tmp_path / "x.otcb")
@@ -0,0 +1,29 @@
+import numpy as np
+import dense
+from otc.chain import ChainComplex, check_transport_homology
+from otc.synth import simplicial_complex
+
+def test_factor_is_eliminated_once():
+    B = simplicial_complex(10, 15, 3, seed=1)[0]
+    CX = ChainComplex(B, engine="dense")
+    for k in B:
+        F = CX.factor(k)
+        assert CX.factor(k) is F and F["rank"] == dense.rank(B[k])
+
+def test_in_image_many_matches_single_columns():
+    rng = np.random.default_rng(5)
+    B = simplicial_complex(12, 25, 4, seed=2)[0]
+    CX = ChainComplex(B, engine="dense")
+    for k, d in B.items():
+        d = dense.mat(d)
+        V = np.hstack([dense.matmul(d, dense.random(rng, d.shape[1], 6)), dense.random(rng, d.shape[0], 6)])
+        got = CX.in_image_many(k, V)
+        assert list(got) == [dense.in_span(d, V[:, j]) for j in range(V.shape[1])]
+        assert list(got) == [bool(CX.in_image_many(k, V[:, j])[0]) for j in range(V.shape[1])]
+
+def test_transport_matches_image_membership():
+    B = simplicial_complex(10, 15, 3, seed=0)[0]
+    CX = ChainComplex(B, engine="dense"); k = 1
+    I = {k: np.eye(CX.dims[k], dtype=bool)}; zero = np.zeros(CX.dims[k], dtype=bool)
+    for e in np.eye(CX.dims[k], dtype=bool):
+        assert check_transport_homology(CX, CX, I, zero, e, k)[0] == dense.in_span(dense.mat(B[k+1]), e)
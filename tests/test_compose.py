@@ -0,0 +1,33 @@
+from functools import partial
+import pytest
+from otc.app_helpers import run_tower
+from otc.compose import compose_parallel, prefix_products, tower_step
+from otc.gf2 import PackedGF2, SparseGF2, eq_gf2
+from otc.synth import workload
+from otc.towers import compose_maps
+
+@pytest.fixture(scope="module")
+def tower():
+    w = workload(n_vertices=12, n_top=15, dim=4, n_moves=3, seed=6)
+    stores = [lambda M: M, PackedGF2.from_dense, SparseGF2.from_dense]
+    seq = [{k: stores[i % 3](M) for k, M in w["moves"][i % 3].items()} for i in range(7)]
+    return seq, w["reps"]
+
+def same(P, Q):
+    return P.keys() == Q.keys() and all(eq_gf2(P[k], Q[k]) for k in P)
+
+@pytest.mark.parametrize("processes", [1, 3])
+def test_compose_parallel(tower, processes):
+    seq, _ = tower
+    assert same(compose_parallel(seq, processes), compose_maps(seq))
+
+@pytest.mark.parametrize("processes", [1, 3])
+def test_prefix_products(tower, processes):
+    seq, reps = tower
+    got = list(prefix_products(seq, processes))
+    assert len(got) == len(seq) and all(same(P, compose_maps(seq[:i])) for i, P in enumerate(got, 1))
+    start = compose_maps(seq[:2])
+    assert all(same(P, compose_maps(seq[:i])) for i, P in enumerate(prefix_products(seq[2:], processes, start), 3))
+    hashes = [h for h, _ in prefix_products(seq, processes, each=partial(tower_step, reps=reps))]
+    assert hashes == [h["hash"] for h in run_tower(None, seq, reps)]
+    assert run_tower(None, seq, reps, processes=processes) == run_tower(None, seq, reps)
@@ -0,0 +1,31 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pytest
+import dense
+from otc.engine import default_workers, fused_identity, run_degrees
+from otc.gf2 import PackedGF2, SparseGF2
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_run_degrees(workers):
+    seen = []
+    out = run_degrees(lambda k: (k != 2, k * k), range(5), workers, progress=lambda i, n: seen.append((i, n)))
+    assert out == {k: (k != 2, k * k) for k in range(5)}
+    assert seen[-1] == (5, 5)
+    out = run_degrees(lambda k: (k != 2, k), range(5), workers, fail_fast=True)
+    assert out[2] == (False, 2) and all(out[k] == (k != 2, k) for k in out)
+    if workers == 1:
+        assert sorted(out) == [0, 1, 2]
+
+def test_one_worker_inside_a_process_pool():
+    with ProcessPoolExecutor(max_workers=1) as ex:
+        assert ex.submit(default_workers, 8).result() == 1
+
+@pytest.mark.parametrize("store", [np.asarray, PackedGF2.from_dense, SparseGF2.from_dense], ids=["dense", "packed", "sparse"])
+def test_fused_identity_matches_dense(store):
+    rng = np.random.default_rng(2)
+    A, B, C = (dense.random(rng, 30, 30, 0.2).astype(bool) for _ in range(3))
+    D = (dense.matmul(A, B) + dense.matmul(C, C)) % 2 == 1
+    assert fused_identity([(store(A), store(B))], [(C, store(C)), D])
+    D[5, 7] ^= True
+    assert not fused_identity([(store(A), store(B))], [(C, store(C)), store(D)])
+    assert not fused_identity([store(A)], [store(A[:, :10])])
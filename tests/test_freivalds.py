@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+import dense
+from otc import synth
+from otc.chain import ChainComplex, check_boundary_compat
+from otc.checks import commutator_identity
+from otc.freivalds import identity_holds
+from otc.gf2 import to_bool
+
+def test_identity_holds():
+    rng = np.random.default_rng(0)
+    A, B, C = (dense.random(rng, 20, 20).astype(bool) for _ in range(3))
+    AB = (dense.matmul(A, B) + C) % 2
+    assert identity_holds([(A, B), C], [AB], 32, np.random.default_rng(1))
+    AB[3, 4] ^= 1
+    assert not identity_holds([(A, B), C], [AB], 32, np.random.default_rng(1))
+    assert not identity_holds([(A, B)], [A[:, :5]], 32)        # shape mismatch reads as a failure
+    S, T = rng.integers(-9, 10, (8, 8)), rng.integers(-9, 10, (8, 8))
+    assert identity_holds([(S, T)], [S @ T], 32, signed=True)
+    assert not identity_holds([(S, T)], [S @ T + np.eye(8, dtype=int)], 32, signed=True)
+
+@pytest.fixture(scope="module")
+def w():
+    return synth.workload(n_vertices=14, n_top=20, dim=4, n_moves=2, seed=1)
+
+def test_screen_falls_back_to_exact(w):
+    CX = ChainComplex(w["boundaries"])
+    H = {k: to_bool(M).copy() for k, M in w["H"].items()}
+    ok, res = commutator_identity(CX, *w["moves"], H, rounds=32, seed=0)
+    assert ok and all(r["mode"] == "freivalds" for r in res.values())
+    k = max(k for k, M in H.items() if M.size)
+    H[k][0, 0] ^= 1
+    ok, res = commutator_identity(CX, *w["moves"], H, rounds=32, seed=0)
+    exact = commutator_identity(CX, *w["moves"], H)[1]
+    assert not ok
+    assert {j: r["eq"] for j, r in res.items()} == {j: r["eq"] for j, r in exact.items()}
+    assert all(r["mode"] == ("freivalds" if r["eq"] else "exact") for r in res.values())
+
+def test_boundary_compat_screened_equals_exact(w):
+    CX = ChainComplex(w["boundaries"])
+    C = {k: to_bool(M).copy() for k, M in w["moves"][0].items()}
+    C[2][0, 0] ^= 1
+    got = check_boundary_compat(CX, CX, C, rounds=32, seed=0)
+    assert got == check_boundary_compat(CX, CX, C) and not got[0]
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+import dense
+from otc.gf2 import PackedGF2, _mul_m4r, _mul_popcount, add_gf2, eq_gf2, matmul_gf2, to_bool
+
+SHAPES = [(1, 1, 1), (3, 70, 5), (17, 64, 129), (64, 200, 63), (130, 96, 260), (300, 300, 300)]
+
+@pytest.mark.parametrize("m,k,n", SHAPES)
+@pytest.mark.parametrize("density", [0.02, 0.5])
+def test_matmul_dense_and_packed(m, k, n, density):
+    rng = np.random.default_rng(m * 1000 + k + n)
+    A = dense.random(rng, m, k, density); B = dense.random(rng, k, n, density)
+    ref = dense.matmul(A, B)
+    for a in (A, PackedGF2.from_dense(A)):
+        for b in (B, PackedGF2.from_dense(B)):
+            assert np.array_equal(dense.mat(matmul_gf2(a, b)), ref), (type(a).__name__, type(b).__name__)
+
+@pytest.mark.parametrize("m,k,n", SHAPES)
+def test_popcount_and_m4r_kernels(m, k, n):
+    rng = np.random.default_rng(k)
+    A = dense.random(rng, m, k); B = dense.random(rng, k, n)
+    Ap, Bp = PackedGF2.from_dense(A), PackedGF2.from_dense(B)
+    ref = dense.matmul(A, B)
+    assert np.array_equal(dense.mat(_mul_m4r(Ap, Bp)), ref)
+    assert np.array_equal(dense.mat(_mul_popcount(Ap, Bp.T)), ref)
+
+def test_packed_layout_and_ops():
+    rng = np.random.default_rng(1)
+    A = dense.random(rng, 90, 150); B = dense.random(rng, 90, 150); v = rng.random(150) < 0.5
+    P = PackedGF2.from_dense(A)
+    assert np.array_equal(P.to_dense(), A) and np.array_equal(P.T.to_dense(), A.T) and P.nnz == A.sum()
+    assert not (P.words[:, -1] >> np.uint64(150 % 64)).any()        # padding bits stay zero
+    assert np.array_equal(to_bool(matmul_gf2(P, v)), dense.matmul(A, v).astype(bool))
+    S = add_gf2(P, B)
+    assert np.array_equal(dense.mat(S), (dense.mat(A) + dense.mat(B)) % 2)
+    assert eq_gf2(S, add_gf2(B, P)) and eq_gf2(P, A) and not eq_gf2(P, B)
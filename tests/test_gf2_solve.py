@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+import dense
+from otc.gf2_solve import factor_two_sided_gf2, solve_factored_two_sided_many, solve_gf2, solve_two_sided_gf2
+
+def kron_system(A, B):
+    """K with vec(A X + Y B) = K [vec X; vec Y] (row-major vec), X: p x c, Y: n x q."""
+    n, c = A.shape[0], B.shape[1]
+    return np.hstack([np.kron(dense.mat(A), np.eye(c, dtype=np.int64)), np.kron(np.eye(n, dtype=np.int64), dense.mat(B).T)]) % 2
+
+@pytest.mark.parametrize("n,p,q,c", [(3, 2, 2, 3), (6, 4, 5, 6), (8, 8, 8, 8), (10, 3, 4, 9)])
+def test_two_sided_matches_kronecker_solve(n, p, q, c):
+    rng = np.random.default_rng(n * p * q * c)
+    A = dense.matmul(dense.random(rng, n, 2), dense.random(rng, 2, p))     # rank-deficient on purpose
+    B = dense.random(rng, q, c, 0.3)
+    K = kron_system(A, B)
+    Ds = [dense.random(rng, n, c) for _ in range(6)]
+    Ds += [(dense.matmul(A, dense.random(rng, p, c)) + dense.matmul(dense.random(rng, n, q), B)) % 2 for _ in range(6)]
+    sols = solve_factored_two_sided_many(factor_two_sided_gf2(A, B), Ds)
+    for D, sol in zip(Ds, sols):
+        d = D.reshape(-1).astype(np.int64)
+        assert (sol is not None) == dense.in_span(K, d)
+        if sol is None:
+            with pytest.raises(ValueError):
+                solve_two_sided_gf2(A, B, D)
+            continue
+        X, Y = sol
+        assert np.array_equal((dense.matmul(A, X) + dense.matmul(Y, B)) % 2, dense.mat(D))
+        x = solve_gf2(K, d)
+        assert np.array_equal(dense.matmul(K, x).ravel(), d)
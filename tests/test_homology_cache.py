@@ -0,0 +1,41 @@
+import os
+import numpy as np
+import pytest
+import dense
+from otc import homology_cache, synth
+from otc.app_helpers import unit_test_generator
+from otc.chain import ChainComplex
+from otc.gf2 import PackedGF2, SparseGF2, eq_gf2
+from otc.homology_cache import HomologyCache, block_key, boundary_data
+
+def test_block_key_ignores_storage():
+    M = dense.random(np.random.default_rng(0), 9, 70).astype(bool)
+    assert block_key(M) == block_key(PackedGF2.from_dense(M)) == block_key(SparseGF2.from_dense(M))
+    M[0, 0] ^= True
+    assert block_key(M) != block_key(PackedGF2.from_dense(~M))
+
+def test_put_get_round_trip(tmp_path):
+    d = dense.random(np.random.default_rng(1), 12, 20).astype(bool)
+    C = HomologyCache(str(tmp_path)); ref = boundary_data(d)
+    C.put("x", ref); got = C.get("x")
+    assert got["rank"] == ref["rank"] and list(got["pivots"]) == ref["pivots"]
+    assert eq_gf2(got["coker"], ref["coker"]) and eq_gf2(got["kernel"], ref["kernel"])
+    assert C.get("missing") is None
+
+def test_cached_runs_match_uncached(tmp_path, monkeypatch):
+    w = synth.workload(n_vertices=14, n_top=20, dim=4, n_moves=2, seed=0)
+    ref = unit_test_generator(ChainComplex(w["boundaries"]), ChainComplex(w["boundaries"]), w["moves"][0], w["reps"])
+    run = lambda: unit_test_generator(*(ChainComplex(w["boundaries"], cache=HomologyCache(str(tmp_path))) for _ in "XY"),
+                                      w["moves"][0], w["reps"])
+    assert run() == ref
+    monkeypatch.setattr(homology_cache, "boundary_data", lambda d: pytest.fail("cache miss"))
+    assert run() == ref
+
+def test_bettis_and_eviction(tmp_path):
+    B = synth.simplicial_complex(10, 15, 3, seed=1)[0]
+    CX = ChainComplex(B, cache=HomologyCache(str(tmp_path), max_bytes=4096))
+    rank = lambda k: dense.rank(B[k]) if k in B else 0
+    for k in range(max(B)):
+        assert CX.homology(k)["betti"] == CX.dims[k] - rank(k) - rank(k+1)
+    size = sum(os.path.getsize(tmp_path / f) for f in os.listdir(tmp_path) if f.endswith(".npz"))
+    assert size <= 4096
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from otc import ingest, synth
+from otc.gf2 import to_bool
+
+@pytest.fixture(scope="module")
+def docs():
+    return synth.to_json_docs(synth.workload(n_vertices=12, n_top=15, dim=4, n_moves=2, seed=0))
+
+def test_ingested_blocks_are_canonical(docs):
+    B = ingest.ingest_boundaries(docs["complex"], docs["shapes"])
+    for k, M in docs["complex"]["boundaries"].items():
+        D = B[int(k)]
+        assert to_bool(D).astype(int).tolist() == M
+        if isinstance(D, np.ndarray):
+            assert not D.flags.writeable and to_bool(D) is D
+    reps = ingest.ingest_reps(docs["reps"], docs["shapes"])
+    assert reps["c3_dom"].dtype == bool and reps["c3_dom"].astype(int).tolist() == docs["reps"]["c3_dom"]
+
+def test_empty_block_takes_manifest_columns(docs):
+    k = next(iter(docs["move_1"]["blocks"]))
+    C = ingest.ingest_blocks({"blocks": {k: []}}, docs["shapes"])[int(k)]
+    assert C.shape == (0, docs["shapes"]["degrees"][k]["dim_k"])
+
+@pytest.mark.parametrize("bad, match", [
+    (lambda d: {"blocks": {"1": [[0, 1], [1]]}}, "ragged"),
+    (lambda d: {"blocks": {"1": [[0, 2]]}}, "0 or 1"),
+    (lambda d: {"blocks": {"x": [[0, 1]]}}, "non-negative integer"),
+    (lambda d: {"blocks": {"1": [[0, 1]]}}, "cols"),
+])
+def test_rejects_bad_blocks(docs, bad, match):
+    with pytest.raises(ValueError, match=match):
+        ingest.ingest_blocks(bad(docs), docs["shapes"])
+
+def test_rejects_bad_reps_and_support(docs):
+    with pytest.raises(ValueError, match="0 or 1"):
+        ingest.ingest_reps(dict(docs["reps"], c2_dom=[-1] * len(docs["reps"]["c2_dom"])))
+    with pytest.raises(ValueError, match="length mismatch"):
+        ingest.ingest_reps(dict(docs["reps"], c2_dom=docs["reps"]["c2_dom"] + [0]), docs["shapes"])
+    with pytest.raises(ValueError, match="missing"):
+        ingest.ingest_reps({"k3": 3})
+    with pytest.raises(ValueError, match="out of bounds"):
+        ingest.ingest_support({"1": {"rows": [10**6]}}, docs["shapes"])
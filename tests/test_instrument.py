@@ -0,0 +1,50 @@
+import json, threading, tracemalloc
+from otc import synth
+from otc.chain import ChainComplex
+from otc.checks import commutator_identity
+from otc.instrument import Recorder, active, span
+
+def test_span_is_a_noop_without_recorder():
+    with span("x") as rec:
+        assert rec is None
+
+def test_degree_threads_record_into_caller():
+    w = synth.workload(n_vertices=12, n_top=15, dim=4, n_moves=2, seed=0)
+    CX = ChainComplex(w["boundaries"])
+    with Recorder() as rec:
+        ok, res = commutator_identity(CX, *w["moves"], w["H"], workers=3)
+    assert sorted(r["degree"] for r in rec.records if r["check"] == "commutator_identity") == sorted(res)
+    for r in rec.records:
+        assert r["seconds"] >= 0 and r["peak_bytes"] >= 0
+        assert all(set(s) == {"shape", "nnz"} for s in r.get("blocks", {}).values())
+    events = json.loads(rec.to_chrome_trace())["traceEvents"]
+    assert sum(e["ph"] == "X" for e in events) == len(rec.records) == len(rec.to_jsonl().splitlines())
+    assert not tracemalloc.is_tracing()
+
+def test_recorders_are_isolated():
+    outer = Recorder(memory=False); inner = Recorder(memory=False); other = []
+    def background():
+        with span("background"):
+            pass
+        with Recorder(memory=False) as r:
+            with span("own"):
+                pass
+        other.append(r)
+    with outer:
+        with inner:
+            t = threading.Thread(target=background); t.start(); t.join()
+            with span("a"):
+                pass
+        with span("b"):
+            pass
+    assert [r["name"] for r in inner.records] == ["a"]
+    assert [r["name"] for r in outer.records] == ["b"]
+    assert [r["name"] for r in other[0].records] == ["own"]
+    assert active() is None
+
+def test_out_of_order_exit():
+    a = Recorder(memory=False).__enter__(); b = Recorder(memory=False).__enter__()
+    a.__exit__(None, None, None)
+    assert active() is b
+    b.__exit__(None, None, None)
+    assert active() is None
@@ -0,0 +1,28 @@
+import importlib.util
+import pytest
+from otc import novelty
+from otc.app_helpers import run_tower
+from otc.novelty import novelty_sweep
+from otc.synth import workload
+
+@pytest.fixture(scope="module")
+def tower():
+    w = workload(n_vertices=12, n_top=15, dim=4, n_moves=5, seed=1)
+    return w["moves"][:4], [w["moves"][4], w["moves"][0]], w["reps"]
+
+def test_sweep_matches_injected_towers(tower):
+    seq, cands, reps = tower
+    df = novelty_sweep(seq, cands, reps, processes=1, chunks=2)
+    base = [h["hash"] for h in run_tower(None, seq, reps, mode="vectors")]
+    for r in df.itertuples():
+        inj = [h["hash"] for h in run_tower(None, [cands[r.candidate] if i == r.step else C for i, C in enumerate(seq, 1)], reps, mode="vectors")]
+        diverged = [i for i, (a, b) in enumerate(zip(base, inj), 1) if a != b]
+        assert r.first_divergence == (diverged[0] if diverged else 0)
+        assert (r.step_hash, r.final_hash, r.final_diverged) == (inj[r.step-1], inj[-1], inj[-1] != base[-1])
+
+def test_parquet_needs_pyarrow_before_sweep(monkeypatch, tmp_path):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *a: None if name == "pyarrow" else find_spec(name, *a))
+    monkeypatch.setattr(novelty, "novelty_sweep", lambda *a, **k: pytest.fail("sweep started"))
+    with pytest.raises(SystemExit):
+        novelty.main(["--reps", "r.json", "--moves", "m.json", "--candidates", "c.json", "-o", str(tmp_path / "out.parquet")])
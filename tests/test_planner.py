@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from otc import binfmt, synth
+from otc.app_helpers import load_complex_bin, unit_test_generator
+from otc.chain import ChainComplex
+from otc.planner import unit_checks, unit_costs, unit_plan
+
+@pytest.fixture
+def unit():
+    w = synth.workload(n_vertices=14, n_top=20, dim=4, n_moves=2, seed=7)
+    CX = ChainComplex(w["boundaries"])
+    support = {str(k): {"rows": list(range(M.shape[0]))} for k, M in w["moves"][0].items()}
+    return w, CX, support
+
+def test_cost_order(unit):
+    w, CX, support = unit
+    args = (CX, CX, w["moves"][0], w["reps"], None, support)
+    costs = unit_costs(*args); plan = unit_plan(*args)
+    assert [n for n, _ in unit_checks(*args)] == plan
+    assert sorted(plan) == sorted(costs) and [costs[n] for n in plan] == sorted(costs.values())
+
+@pytest.mark.parametrize("broken", ["support", "transport_c3", "boundary"])
+def test_fail_fast_stops_at_first_failure(unit, broken):
+    w, CX, support = unit
+    C = {k: np.array(M, dtype=bool) for k, M in w["moves"][0].items()}; reps = dict(w["reps"])
+    if broken == "support":
+        k = next(k for k, M in C.items() if M.size)
+        support = dict(support, **{str(k): {"cols": [1]}}); C[k][0, 0] = True
+    elif broken == "transport_c3":
+        reps["c3_cod"] = ~np.asarray(reps["c3_cod"], dtype=bool)
+    else:
+        C[2][0, 0] ^= True
+    args = (CX, CX, C, reps, None, support)
+    full = dict(unit_checks(*args))
+    assert not full[broken]
+    plan = unit_plan(*args); first = next(i for i, n in enumerate(plan) if not full[n])
+    assert list(unit_checks(*args, fail_fast=True)) == [(n, full[n]) for n in plan[:first + 1]]
+    res = unit_test_generator(CX, CX, C, reps, None, support, fail_fast=True)
+    assert all(res[n] is None for n in plan[first + 1:])
+
+def test_factor_cost_and_lazy_blocks(unit, tmp_path):
+    w, CX, _ = unit
+    k = int(w["reps"]["k3"]) + 1
+    before = unit_costs(CX, CX, w["moves"][0], w["reps"])["transport_c3"]
+    assert not CX.has_factor(k)
+    CX.factor(k)
+    assert CX.has_factor(k) and unit_costs(CX, CX, w["moves"][0], w["reps"])["transport_c3"] < before
+    binfmt.save(synth.to_json_docs(w)["complex"], tmp_path / "x.otcb")
+    CB = load_complex_bin(tmp_path / "x.otcb")
+    assert unit_plan(CB, CB, w["moves"][0], w["reps"]) and not CB.boundaries._cache
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+import dense
+from otc.chain import ChainComplex
+from otc.reduction import SparseHomology
+from otc.synth import simplicial_complex
+
+@pytest.fixture(params=[(8, 6, 3, 0), (10, 15, 3, 1), (12, 25, 4, 2)], ids=lambda p: f"v{p[0]}-t{p[1]}-d{p[2]}")
+def complex_(request):
+    n_vertices, n_top, dim, seed = request.param
+    return simplicial_complex(n_vertices, n_top, dim, seed=seed)[0]
+
+def test_ranks_and_bettis(complex_):
+    S = SparseHomology(complex_)
+    for k, d in complex_.items():
+        assert S.rank(k) == dense.rank(d)
+    rank = lambda k: dense.rank(complex_[k]) if k in complex_ else 0
+    assert S.bettis() == {k: n - rank(k) - rank(k+1) for k, n in sorted(S.dims.items())}
+
+def test_bases(complex_):
+    S = SparseHomology(complex_)
+    for k in range(1, max(complex_)):
+        d, up = dense.mat(complex_[k]), dense.mat(complex_[k+1])
+        B, E, Z = dense.mat(S.boundary_basis(k)), dense.mat(S.homology_basis(k)), dense.mat(S.cycle_basis(k))
+        assert dense.rank(B) == B.shape[1] == dense.rank(up)
+        assert dense.rank(np.hstack([up, B])) == dense.rank(up)
+        assert not dense.matmul(d, Z).any()
+        assert dense.rank(Z) == Z.shape[1] == d.shape[1] - dense.rank(d)
+        assert E.shape[1] == S.betti(k)
+
+def test_membership_and_coords(complex_):
+    rng = np.random.default_rng(3)
+    S = SparseHomology(complex_); CX = ChainComplex(complex_, engine="dense")
+    for k in range(1, max(complex_)):
+        up = dense.mat(complex_[k+1]); n = up.shape[0]
+        V = np.hstack([dense.matmul(up, dense.random(rng, up.shape[1], 4)), dense.random(rng, n, 4)])
+        ref = [dense.in_span(up, V[:, j]) for j in range(V.shape[1])]
+        assert [S.in_image(k, V[:, j]) for j in range(V.shape[1])] == ref
+        assert list(CX.in_image_many(k + 1, V)) == ref
+        E = dense.mat(S.homology_basis(k))
+        if E.shape[1]:
+            c = dense.random(rng, E.shape[1], 1).ravel()
+            z = (dense.matmul(E, c) + dense.matmul(up, dense.random(rng, up.shape[1], 1)).ravel()) % 2
+            assert np.array_equal(S.homology_coords(k, z).astype(np.int64), c)
+
+def test_sparse_engine_agrees_with_dense(complex_):
+    rng = np.random.default_rng(4)
+    CS = ChainComplex(complex_, engine="sparse"); CD = ChainComplex(complex_, engine="dense")
+    for k in range(1, max(complex_) + 1):
+        V = dense.random(rng, CS.dims[k-1], 8)
+        assert np.array_equal(CS.in_image_many(k, V), CD.in_image_many(k, V))
+
+def test_rejects_non_complex(complex_):
+    bad = {k: dense.mat(d).astype(bool) for k, d in complex_.items()}
+    k = max(bad)
+    bad[k][:, 0] = ~bad[k][:, 0]          # break d_{k-1} d_k = 0
+    for seed in (None, 0, 1):
+        S = SparseHomology(bad, seed=seed)
+        assert S.rank(k) == dense.rank(bad[k])
+        with pytest.raises(ValueError, match="not a chain complex"):
+            S.rank(k - 1)
+    with pytest.raises(ValueError, match="not a chain complex"):
+        ChainComplex(bad, engine="sparse").in_image_many(k - 1, np.zeros((ChainComplex(bad).dims[k-2], 1), dtype=bool))
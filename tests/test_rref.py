@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+import dense
+from otc.gf2 import gaussian_elim_rank, image_factor_gf2, in_image, in_image_factored, rref_gf2
+from otc.gf2_solve import solve_gf2
+
+@pytest.mark.parametrize("m,n,r", [(5, 9, 2), (64, 64, 40), (100, 70, 70), (150, 300, 90)])
+def test_rref_rank_and_row_space(m, n, r):
+    rng = np.random.default_rng(m + n)
+    A = dense.matmul(dense.random(rng, m, r), dense.random(rng, r, n))      # rank <= r
+    rank, pivots, R = rref_gf2(A)
+    assert rank == dense.rank(A) == gaussian_elim_rank(A)[0]
+    R = dense.mat(R)
+    assert not R[rank:].any()
+    assert np.array_equal(R[:rank, pivots], np.eye(rank, dtype=np.int64))
+    assert dense.rank(np.vstack([A, R])) == rank
+
+@pytest.mark.parametrize("m,n", [(6, 4), (70, 40), (128, 200)])
+def test_image_membership(m, n):
+    rng = np.random.default_rng(m * n)
+    B = dense.matmul(dense.random(rng, m, n // 2), dense.random(rng, n // 2, n))
+    V = np.hstack([dense.matmul(B, dense.random(rng, n, 5)), dense.random(rng, m, 5)])
+    ref = [dense.in_span(B, V[:, j]) for j in range(V.shape[1])]
+    F = image_factor_gf2(B)
+    assert F["rank"] == dense.rank(B)
+    assert list(in_image_factored(F, V)) == ref
+    assert [in_image(B, V[:, j]) for j in range(V.shape[1])] == ref
+
+@pytest.mark.parametrize("m,n", [(7, 5), (90, 130)])
+def test_solve_gf2(m, n):
+    rng = np.random.default_rng(m)
+    A = dense.matmul(dense.random(rng, m, 4), dense.random(rng, 4, n))
+    b = dense.matmul(A, dense.random(rng, n, 1)).ravel()
+    assert np.array_equal(dense.matmul(A, solve_gf2(A, b)).ravel(), b)
+    while dense.in_span(A, b):
+        b = dense.random(rng, m, 1).ravel()
+    with pytest.raises(ValueError):
+        solve_gf2(A, b)
@@ -0,0 +1,62 @@
+import http.client, json, threading
+import numpy as np
+import pytest
+from otc.server import JobService, execute, make_server
+from otc.towers import hash_signed
+
+REPS = dict(k3=3, k2=2, c3_dom=[1, -2, 0], c3_cod=[0, 0, 0], c2_dom=[-1, 3], c2_cod=[0, 0])
+MOVES = [dict(blocks={"3": [[1, 0, -1], [2, 1, 0], [0, -1, 3]], "2": [[0, 1], [-1, 2]]}),
+         dict(blocks={"3": [[-1, 1, 0], [0, 2, 1], [1, 0, 0]], "2": [[3, 0], [1, -1]]})]
+
+def test_signed_tower_keeps_negative_reps():
+    out = execute("tower", dict(reps=REPS, moves=MOVES), dict(mode="signed"))
+    v3, v2 = np.array(REPS["c3_dom"]), np.array(REPS["c2_dom"])
+    want = []
+    for m in MOVES:
+        v3 = np.array(m["blocks"]["3"]) @ v3; v2 = np.array(m["blocks"]["2"]) @ v2
+        want.append(hash_signed(v3, v2))
+    assert [h["hash"] for h in out["base"]] == want
+
+def test_binary_tower_rejects_negative_reps():
+    with pytest.raises(ValueError):
+        execute("tower", dict(reps=REPS, moves=[dict(blocks={"3": np.eye(3, dtype=int).tolist(), "2": np.eye(2, dtype=int).tolist()})]))
+
+@pytest.fixture(scope="module")
+def server():
+    srv = make_server(port=0, processes=1, quiet=True)
+    t = threading.Thread(target=srv.serve_forever, daemon=True); t.start()
+    yield srv
+    srv.shutdown(); srv.server_close(); srv.service.close()
+
+def request(srv, method, path, body=None, headers=None):
+    c = http.client.HTTPConnection("127.0.0.1", srv.server_port, timeout=60)
+    c.request(method, path, body=body, headers=headers or {})
+    r = c.getresponse(); out = r.status, json.loads(r.read() or b"null")
+    c.close()
+    return out
+
+def test_http_dedup_and_result(server):
+    doc = json.dumps(dict(kind="tower", inputs=dict(reps=REPS, moves=MOVES), params=dict(mode="signed")))
+    code, first = request(server, "POST", "/jobs", doc)
+    assert code == 202 and not first["deduplicated"]
+    code, again = request(server, "POST", "/jobs", doc)
+    assert code == 202 and again["deduplicated"] and again["id"] == first["id"]
+    code, res = request(server, "GET", f"/jobs/{first['id']}/result?wait=60")
+    assert code == 200 and res["hits"] == 2
+    assert res["result"] == json.loads(json.dumps(execute("tower", dict(reps=REPS, moves=MOVES), dict(mode="signed"))))
+
+def test_http_errors(server):
+    assert request(server, "POST", "/jobs", "{}", {"Content-Length": "abc"})[0] == 400
+    assert request(server, "POST", "/jobs", json.dumps(dict(kind="nope", inputs={})))[0] == 400
+    assert request(server, "GET", "/jobs/0123/result")[0] == 404
+    code, st = request(server, "POST", "/jobs", json.dumps(dict(kind="tower", inputs=dict(reps=REPS, moves=MOVES[:1]), params=dict(mode="signed"))))
+    for wait in ("nan", "x", "inf"):
+        assert request(server, "GET", f"/jobs/{st['id']}/result?wait={wait}")[0] == 400
+
+def test_result_of_evicted_job():
+    service = JobService(processes=1, max_results=0)
+    try:
+        jid, _ = service.submit("tower", dict(reps=REPS, moves=MOVES), dict(mode="signed"))
+        assert service.result(jid, wait=60) == (None, None)
+    finally:
+        service.close()
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from otc import synth
+from otc.app_helpers import unit_test_generator
+from otc.chain import ChainComplex
+from otc.checks import commutator_identity, triangle_coherence_identity
+from otc.gf2 import to_bool
+from otc.session import VerificationSession
+
+def copy(blocks):
+    return {k: to_bool(v).copy() for k, v in blocks.items()}
+
+def fresh(CX, Cmap, reps, C1, C2, H, J):
+    strip = lambda r: (r[0], {k: dict(eq=v["eq"], n_k=v["n_k"]) for k, v in r[1].items()})
+    return dict(unit=unit_test_generator(CX, CX, Cmap, reps), overlap=strip(commutator_identity(CX, C1, C2, H)),
+                triangle=strip(triangle_coherence_identity(CX, J)))
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_edits_match_fresh_recheck(seed):
+    w = synth.workload(n_vertices=14, n_top=20, dim=4, n_moves=2, seed=seed)
+    CX = ChainComplex(w["boundaries"])
+    Cmap, C1, C2, H = copy(w["moves"][0]), copy(w["moves"][0]), copy(w["moves"][1]), copy(w["H"])
+    J = {k: copy(part) for k, part in w["triangle"].items()}
+    S = VerificationSession(CX=CX, CY=CX, Cmap=Cmap, reps=w["reps"], C_overlap=CX, C_m1=C1, C_m2=C2, H=H, J=J)
+    assert S.verify() == fresh(CX, Cmap, w["reps"], C1, C2, H, J)
+    rng = np.random.default_rng(seed)
+    for it in range(40):
+        part = ["C", "m1", "m2", "H", "J", "A", "B"][it % 7]
+        k = int(rng.choice([k for p, k in S.blocks if p == part]))
+        m, n = S.blocks[(part, k)].shape
+        if m * n == 0:
+            continue
+        if part in ("J", "A", "B"):
+            M = J.setdefault(str(k), {}).setdefault(part, np.zeros((m, n), dtype=bool))
+        else:
+            M = dict(C=Cmap, m1=C1, m2=C2, H=H)[part].setdefault(k, np.zeros((m, n), dtype=bool))
+        r, c = rng.integers(0, m, 3), rng.integers(0, n, 3)
+        if it % 3 == 0:
+            S.flip(part, k, r, c); np.logical_xor.at(M, (r, c), True)
+        elif it % 3 == 1:
+            vals = rng.integers(0, 2, 3)
+            for i, j, v in zip(r, c, vals):
+                S.set_entries(part, k, [i], [j], [v]); M[i, j] = bool(v)
+        else:
+            M[r[0], c[0]] ^= True; S.set_block(part, k, M)
+        assert S.verify() == fresh(CX, Cmap, w["reps"], C1, C2, H, J), (it, part, k)
+    assert S.stats["rank_updates"] > 0
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import dense
+from otc.gf2 import PackedGF2, SparseGF2, add_gf2, as_gf2, eq_gf2, matmul_gf2, to_bool
+
+SHAPES = [(1, 1, 1), (3, 70, 5), (17, 64, 129), (130, 96, 260)]
+
+def forms(M):
+    return [to_bool(M), PackedGF2.from_dense(M), SparseGF2.from_dense(M)]
+
+@pytest.mark.parametrize("m,k,n", SHAPES)
+@pytest.mark.parametrize("density", [0.02, 0.5])
+def test_matmul_every_storage_pair(m, k, n, density):
+    rng = np.random.default_rng(m * 1000 + k + n)
+    A = dense.random(rng, m, k, density); B = dense.random(rng, k, n, density)
+    ref = dense.matmul(A, B)
+    for a in forms(A):
+        for b in forms(B):
+            assert np.array_equal(dense.mat(matmul_gf2(a, b)), ref), (type(a).__name__, type(b).__name__)
+
+def test_matvec_and_add_eq():
+    rng = np.random.default_rng(1)
+    A = dense.random(rng, 90, 150, 0.1); B = dense.random(rng, 90, 150, 0.1); v = rng.random(150) < 0.5
+    u = rng.random(90) < 0.5
+    for a in forms(A):
+        assert np.array_equal(dense.mat(matmul_gf2(a, v)), dense.matmul(A, v))
+        assert np.array_equal(dense.mat(matmul_gf2(u, a)), dense.matmul(u, A))
+        for b in forms(B):
+            S = add_gf2(a, b)
+            assert np.array_equal(dense.mat(S), (dense.mat(A) + dense.mat(B)) % 2)
+            assert eq_gf2(S, add_gf2(b, a)) and not eq_gf2(a, b)
+
+def test_from_coo_cancels_pairs():
+    S = SparseGF2.from_coo(np.array([0, 2, 0, 1]), np.array([1, 0, 1, 1]), (3, 2))
+    assert np.array_equal(S.to_dense(), [[0, 0], [0, 1], [1, 0]])
+    assert np.array_equal(S.T.to_dense(), S.to_dense().T)
+
+def test_as_gf2_picks_storage_by_density():
+    rng = np.random.default_rng(2)
+    sparse, full = dense.random(rng, 100, 100, 0.01), dense.random(rng, 100, 100, 0.5)
+    assert isinstance(as_gf2(sparse), SparseGF2) and eq_gf2(as_gf2(sparse), SparseGF2.from_dense(sparse))
+    assert isinstance(as_gf2(full), np.ndarray)
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from otc.app_helpers import run_tower
+from otc.synth import workload
+from otc.tower_store import TowerCheckpoints
+
+def schedule(mode):
+    w = workload(n_vertices=12, n_top=15, dim=4, n_moves=3, seed=5)
+    reps = w["reps"]
+    if mode != "signed":
+        return (w["moves"] * 3)[:9], reps
+    rng = np.random.default_rng(0); k3, k2 = int(reps["k3"]), int(reps["k2"])
+    n = {k: len(reps[f"c{i}_dom"]) for i, k in ((3, k3), (2, k2))}
+    reps = dict(reps, c3_dom=rng.integers(-3, 4, n[k3]).tolist(), c2_dom=rng.integers(-3, 4, n[k2]).tolist())
+    return [{k: rng.integers(-1, 2, (n[k], n[k])) for k in (k3, k2)} for _ in range(9)], reps
+
+@pytest.mark.parametrize("mode", ["matrix", "vectors", "signed"])
+def test_resume_matches_fresh_run(mode, tmp_path):
+    seq, reps = schedule(mode)
+    fresh = lambda s: run_tower(None, s, reps, mode=mode)
+    store = TowerCheckpoints(str(tmp_path), every=2)
+    assert run_tower(None, seq[:5], reps, mode=mode, checkpoints=store) == fresh(seq[:5])
+    starts = []
+    got = run_tower(None, seq, reps, mode=mode, checkpoints=store, progress=lambda i, n: starts.append(i))
+    assert got == fresh(seq) and starts[0] == 5
+    edited = seq[:3] + [seq[5]] + seq[4:]
+    starts.clear()
+    got = run_tower(None, edited, reps, mode=mode, checkpoints=store, progress=lambda i, n: starts.append(i))
+    assert got == fresh(edited) and starts[0] == 2
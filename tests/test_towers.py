@@ -0,0 +1,23 @@
+import pytest
+from otc.app_helpers import run_tower
+from otc.gf2 import SparseGF2
+from otc.synth import workload
+from otc.towers import compose_maps, hash_certificate
+
+@pytest.fixture(scope="module")
+def tower():
+    w = workload(n_vertices=12, n_top=15, dim=4, n_moves=3, seed=3)
+    seq = w["moves"] * 3
+    seq[1] = {k: SparseGF2.from_dense(M) for k, M in seq[1].items()}   # mixed storage along the schedule
+    return seq, w["reps"]
+
+def test_vector_hashes_match_matrix_hashes(tower):
+    seq, reps = tower
+    hashes = lambda mode: [h["hash"] for h in run_tower(None, seq, reps, mode=mode)]
+    ref = [hash_certificate(compose_maps(seq[:i]), reps) for i in range(1, len(seq) + 1)]
+    assert hashes("vectors") == hashes("matrix") == ref
+    assert len(set(ref)) > 1
+
+def test_unknown_mode(tower):
+    with pytest.raises(ValueError, match="unknown mode"):
+        run_tower(None, *tower, mode="vector")
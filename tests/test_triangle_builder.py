@@ -0,0 +1,56 @@
+import json
+import numpy as np
+import pytest
+import dense
+from otc import synth
+from otc.app_helpers import triangle_test
+from otc.chain import ChainComplex
+from otc import triangle_builder
+from otc.triangle_builder import build_triangle_template, build_triangle_templates
+
+@pytest.fixture(params=[0, 1, 2])
+def workload(request):
+    return synth.workload(n_vertices=14, n_top=20, dim=4, n_moves=3, seed=request.param)
+
+def test_built_template_is_coherent(workload):
+    CX = ChainComplex(workload["boundaries"])
+    C1, C2 = workload["moves"][:2]
+    J = build_triangle_template(CX, C1, C2)
+    assert triangle_test(CX, workload["triangle"])[0]
+    ok, res = triangle_test(CX, J)
+    assert ok and set(res) == {int(k) for k in J}
+    for k in C1:
+        assert np.array_equal(dense.mat(J[str(k)]["A"]), dense.matmul(C2[k], C1[k]))
+        assert np.array_equal(dense.mat(J[str(k)]["B"]), dense.matmul(C1[k], C2[k]))
+
+def test_inconsistent_degree_gets_zero_J():
+    # d_2 J_1 = 0 and J_2 d_3 = 0 leave d_3 J_2 ⊕ J_1 d_2 rank one, so D_2 = I has no solution
+    CX = ChainComplex({2: np.array([[1, 1], [1, 1]]), 3: np.array([[1, 0, 1], [1, 0, 1]])})
+    I3 = np.eye(3, dtype=bool)
+    J = build_triangle_template(CX, {2: np.array([[1, 1], [0, 1]]), 3: I3}, {2: np.array([[0, 1], [1, 0]]), 3: I3})
+    assert not np.any(J["2"]["J"]) and "1" not in J
+    ok, res = triangle_test(CX, J)
+    assert not ok and not res[2]["eq"] and res[3]["eq"]
+
+def test_batch_equals_single_builds(workload):
+    CX = ChainComplex(workload["boundaries"])
+    moves = workload["moves"]
+    templates, inconsistent = build_triangle_templates(CX, moves)
+    assert not inconsistent and set(templates) == {(0, 1), (0, 2), (1, 2)}
+    for (i, j), J in templates.items():
+        assert J == build_triangle_template(CX, moves[i], moves[j])
+
+def test_batch_report_flags_incoherent_pairs(tmp_path, workload):
+    docs = synth.to_json_docs(workload)
+    bad = {k: np.array(M) for k, M in docs["move_1"]["blocks"].items()}
+    bad["2"][0] ^= 1                                 # no longer a chain map
+    docs["move_bad"] = {"blocks": {k: M.tolist() for k, M in bad.items()}}
+    paths = []
+    for name in ("complex", "move_1", "move_2", "move_bad"):
+        paths.append(str(tmp_path / f"{name}.json"))
+        (tmp_path / f"{name}.json").write_text(json.dumps(docs[name]))
+    assert triangle_builder.main([paths[0], *paths[1:], "-o", str(tmp_path / "out")]) == 1
+    report = {(r["m1"], r["m2"]): r for r in json.loads((tmp_path / "out" / "report.json").read_text())}
+    assert report["move_1", "move_2"]["consistent"] and report["move_1", "move_2"]["coherent"]
+    for pair in (("move_1", "move_bad"), ("move_2", "move_bad")):
+        assert not report[pair]["consistent"] and not report[pair]["coherent"] and report[pair]["incoherent_degrees"]
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from otc import zmod
+
+def ints(rng, shape, bits):
+    """Object array of signed Python ints below 2**bits in magnitude."""
+    hi = 1 << bits
+    return np.array([[int(rng.integers(-(1 << 30), 1 << 30)) * hi // (1 << 30) + int(rng.integers(-3, 4))
+                      for _ in range(shape[1])] for _ in range(shape[0])], dtype=object)
+
+def exact(chain):
+    P = np.asarray(chain[-1], dtype=object)
+    for M in reversed(chain[:-1]):
+        P = np.asarray(M, dtype=object).dot(P)
+    return P
+
+# 10 bits: float path; 30 bits: CRT over a few primes; 90 bits: big-int fallback
+@pytest.mark.parametrize("bits", [10, 30, 90])
+def test_matmul_and_product_match_bigint(bits):
+    rng = np.random.default_rng(bits)
+    A, B, C = ints(rng, (7, 9), bits), ints(rng, (9, 5), bits), ints(rng, (5, 6), bits)
+    for chain in ([A, B], [A, B, C]):
+        got = zmod.product([zmod.signed_array(M.tolist()) for M in chain])
+        assert np.array_equal(np.asarray(got, dtype=object), exact(chain))
+
+def test_crt_symmetric_range():
+    rng = np.random.default_rng(0)
+    primes = zmod.PRIMES[:4]
+    P = 1
+    for p in primes:
+        P *= p
+    x = np.array([int(rng.integers(0, 1 << 62)) * (P // (1 << 62)) % P - P // 2 for _ in range(200)] + [P // 2, -(P // 2) + 1, 0],
+                 dtype=object)
+    got = zmod.crt([np.array([int(v) % p for v in x], dtype=np.int64) for p in primes], primes)
+    assert np.array_equal(np.asarray(got, dtype=object), x)
+
+@pytest.mark.parametrize("bits", [10, 30, 90])
+def test_identity_exact(bits):
+    rng = np.random.default_rng(bits + 1)
+    A, B, C = ints(rng, (6, 6), bits), ints(rng, (6, 6), bits), ints(rng, (6, 6), bits)
+    AB = exact([A, B])
+    assert zmod.identity([(A, B), (C,)], [(AB + C,)])[0]
+    off = AB + C; off[2, 3] += 1
+    assert not zmod.identity([(A, B), (C,)], [(off,)])[0]
+    assert not zmod.identity([(A, B)], [(np.zeros((6, 5), dtype=np.int64),)])[0]